@@ -0,0 +1,254 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+asyncio interface to :class:`rospkg.RosPack` and
+:class:`rospkg.RosStack`, for Python 3.5 and newer.  Crawling and
+parsing run on an executor so that they do not block the event loop.
+
+Example::
+  from rospkg.aio import AsyncRosPack
+  rp = AsyncRosPack()
+  path = await rp.get_path('rospy')
+  async for name in rp.iter_list():
+      print(name)
+"""
+
+import asyncio
+import functools
+
+from .rospack import RosPack, RosStack
+
+# end of the names queued by a crawl
+_DONE = object()
+
+
+class _ResourceIterator(object):
+    """
+    Asynchronous iterator over the names of resources, in the order
+    in which a crawl finds them.  Names are only yielded once.
+    """
+
+    def __init__(self, async_manager):
+        self._async_manager = async_manager
+        self._queue = asyncio.Queue()
+        self._seen = set()
+        self._future = None
+
+    def _start(self):
+        loop = asyncio.get_event_loop()
+        manager = self._async_manager.manager
+        queue = self._queue
+
+        def crawl():
+            manager._update_location_cache(
+                found=lambda name, d: loop.call_soon_threadsafe(queue.put_nowait, name))
+            # the cache may have been populated without crawling, e.g.
+            # from the disk cache or by another thread
+            for name in list(manager._location_cache):
+                loop.call_soon_threadsafe(queue.put_nowait, name)
+        self._future = loop.run_in_executor(self._async_manager._executor, crawl)
+        self._future.add_done_callback(lambda future: queue.put_nowait(_DONE))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._future is None:
+            self._start()
+        while True:
+            name = await self._queue.get()
+            if name is _DONE:
+                # raise errors of the crawl
+                self._future.result()
+                self._queue.put_nowait(_DONE)
+                raise StopAsyncIteration
+            if name not in self._seen:
+                self._seen.add(name)
+                return name
+
+
+class AsyncManifestManager(object):
+    """
+    Base class of :class:`AsyncRosPack` and :class:`AsyncRosStack`,
+    wrapping a synchronous :class:`rospkg.rospack.ManifestManager`.
+    Concurrent requests for the same query share a single call on the
+    executor.
+    """
+
+    _manager_class = None
+
+    def __init__(self, ros_paths=None, executor=None, manager=None, **kwargs):
+        """
+        :param ros_paths: Ordered list of paths to search for
+          resources. If `None` (default), use environment ROS path.
+        :param executor: :class:`concurrent.futures.Executor` to run
+          blocking calls on.  If `None` (default), use the default
+          executor of the event loop.
+        :param manager: (optional) existing synchronous manager to
+          wrap, instead of creating one from *ros_paths* and *kwargs*
+
+        Additional keyword arguments are passed to the synchronous
+        manager.
+        """
+        if manager is None:
+            manager = self._manager_class(ros_paths, **kwargs)
+        self.manager = manager
+        self._executor = executor
+        # (method name, args) -> future of the call in progress
+        self._in_flight = {}
+
+    def get_ros_paths(self):
+        return self.manager.get_ros_paths()
+    ros_paths = property(get_ros_paths, doc="Get ROS paths of this instance")
+
+    async def _call(self, method, *args):
+        key = (method,) + args
+        future = self._in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_event_loop()
+            func = functools.partial(getattr(self.manager, method), *args)
+            future = self._in_flight[key] = loop.run_in_executor(self._executor, func)
+
+            def done(f):
+                if self._in_flight.get(key) is f:
+                    del self._in_flight[key]
+            future.add_done_callback(done)
+        # a cancelled caller must not cancel the call for the others
+        return await asyncio.shield(future)
+
+    async def list(self):
+        """
+        :returns: complete list of resource names, ``[str]``
+        """
+        return list(await self._call('list'))
+
+    def iter_list(self):
+        """
+        Iterate over resource names as the ROS paths are crawled,
+        i.e. ``async for name in manager.iter_list()``.
+
+        :returns: asynchronous iterator of resource names
+        """
+        return _ResourceIterator(self)
+
+    async def get_path(self, name):
+        """
+        :param name: resource name, ``str``
+        :returns: filesystem path of resource
+        :raises: :exc:`ResourceNotFound`
+        """
+        manager = self.manager
+        # the cache is filled while holding the lock, so it must not
+        # be read while another thread holds it
+        if manager._watcher is None and manager._lock.acquire(False):
+            try:
+                cache = manager._location_cache
+                if cache is not None and name in cache:
+                    return cache[name]
+            finally:
+                manager._lock.release()
+        return await self._call('get_path', name)
+
+    async def get_manifest(self, name):
+        """
+        :raises: :exc:`InvalidManifest`
+        """
+        manifest = self.manager._manifests.get(name)
+        if manifest is not None and self.manager._watcher is None:
+            return manifest
+        return await self._call('get_manifest', name)
+
+    async def get_depends(self, name, implicit=True):
+        """
+        :returns: list of names of dependencies, ``[str]``
+        :raises: :exc:`InvalidManifest`
+        """
+        return await self._call('get_depends', name, implicit)
+
+    async def get_depends_on(self, name, implicit=True):
+        """
+        :returns: list of names of resources depending on *name*, ``[str]``
+        """
+        return await self._call('get_depends_on', name, implicit)
+
+    async def refresh(self):
+        """
+        :returns: names of resources whose cached information was dropped, ``set``
+        """
+        return await self._call('refresh')
+
+
+class AsyncRosPack(AsyncManifestManager):
+    """
+    Awaitable :class:`rospkg.RosPack`.
+    """
+
+    _manager_class = RosPack
+
+    async def get_rosdeps(self, package, implicit=True):
+        """
+        :returns: list of rosdep names, ``[str]``
+        """
+        return await self._call('get_rosdeps', package, implicit)
+
+    async def stack_of(self, package):
+        """
+        :returns: name of stack that package is in, or None if package is not part of a stack, ``str``
+        """
+        return await self._call('stack_of', package)
+
+    async def get_licenses(self, pkg_name, implicit=True, sortbylicense=True):
+        """
+        :returns: see :meth:`rospkg.RosPack.get_licenses`
+        """
+        return await self._call('get_licenses', pkg_name, implicit, sortbylicense)
+
+
+class AsyncRosStack(AsyncManifestManager):
+    """
+    Awaitable :class:`rospkg.RosStack`.
+    """
+
+    _manager_class = RosStack
+
+    async def packages_of(self, stack):
+        """
+        :returns: name of packages that are part of stack, ``[str]``
+        """
+        return await self._call('packages_of', stack)
+
+    async def get_stack_version(self, stack):
+        """
+        :returns: version number of stack, or None if stack is unversioned, ``str``
+        """
+        return await self._call('get_stack_version', stack)
@@ -0,0 +1,427 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Persistent on-disk caches stored in :envvar:`ROS_HOME`.
+
+Resource location caches are line based: ``#KEY=value`` header
+lines followed by one ``name path`` line per resource.  Additional
+``#MTIME <mtime> <path>`` lines record the modification times of the
+crawled directories so that a cache can be revalidated without
+re-crawling.  The format is not compatible with the C++ ``rospack``
+cache, which lists one bare package path per line; the reader still
+accepts such lines, taking the basename as the package name, but
+``rospack`` cannot read the files written here.
+
+Manifest caches store parsed manifests of one list of ROS paths as
+:mod:`marshal` records, keyed by the path of the manifest file and
+valid as long as its modification time and size are unchanged.  Rosdep caches store the
+rosdep classification of dependency names, valid as long as the
+rosdep sources cache is unchanged.
+"""
+
+import atexit
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from threading import Lock
+import time
+
+from .environment import get_ros_home
+
+LOCATION_CACHE_PREFIX = 'rospkg_cache_'
+MANIFEST_CACHE_PREFIX = 'rospkg_manifests_'
+ROSDEP_CACHE_PREFIX = 'rospkg_rosdeps_'
+
+_MANIFEST_CACHE_VERSION = 1
+_ROSDEP_CACHE_VERSION = 1
+
+# modification times this close to the time of the crawl may not
+# reflect changes made within the same timestamp tick.
+_RACY_MTIME_WINDOW = 2.0
+
+
+def get_mtime(path):
+    """
+    :returns: modification time of *path*, or ``-1.0`` if *path* does not exist, ``float``
+    """
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return -1.0
+
+
+def get_location_cache_file(manifest_name, ros_paths, env=None):
+    """
+    :param manifest_name: MANIFEST_FILE, STACK_FILE or PACKAGE_FILE, ``str``
+    :param ros_paths: Ordered list of paths the cache is for, ``[str]``
+    :param env: override ``os.environ`` dictionary, ``dict``
+    :returns: path of the location cache file in :envvar:`ROS_HOME`, ``str``
+    """
+    key = '%s\n%s' % (manifest_name, os.pathsep.join(ros_paths))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(get_ros_home(env), LOCATION_CACHE_PREFIX + digest)
+
+
+def read_location_cache(filename):
+    """
+    Read a location cache file.
+
+    :param filename: path of cache file, ``str``
+    :returns: (header, locations, mtimes). *header* maps header keys
+      to values, *locations* maps resource names to directory paths
+      and *mtimes* maps crawled paths to their recorded modification
+      times, ``({str: str}, {str: str}, {str: float})``
+    :raises: :exc:`IOError`
+    :raises: :exc:`ValueError` If the file is malformed
+    """
+    header = {}
+    locations = {}
+    mtimes = {}
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            if line.startswith('#'):
+                line = line[1:]
+                if line.startswith('MTIME '):
+                    _, mtime, path = line.split(' ', 2)
+                    mtimes[path] = float(mtime)
+                elif '=' in line and ' ' not in line.split('=', 1)[0]:
+                    key, value = line.split('=', 1)
+                    header[key] = value
+                # other lines starting with '#' are comments
+                continue
+            if line.startswith(os.sep):
+                # legacy format: bare path
+                path = line.strip()
+                locations[os.path.basename(path)] = path
+            else:
+                name, path = line.split(' ', 1)
+                locations[name] = path
+    return header, locations, mtimes
+
+
+def write_location_cache(filename, header, locations, mtimes):
+    """
+    Atomically write a location cache file.  Errors are not raised as
+    the cache is only an optimization, i.e. a missing or read-only
+    :envvar:`ROS_HOME` disables it.
+
+    :param filename: path of cache file, ``str``
+    :param header: header keys and values, ``{str: str}``
+    :param locations: resource name to directory path, ``{str: str}``
+    :param mtimes: crawled path to modification time, ``{str: float}``
+    :returns: ``True`` if the cache was written, ``bool``
+    """
+    dirname = os.path.dirname(filename)
+    tmp = None
+    try:
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(filename), dir=dirname)
+        with os.fdopen(fd, 'w') as f:
+            for key in sorted(header):
+                f.write('#%s=%s\n' % (key, header[key]))
+            for path in sorted(mtimes):
+                f.write('#MTIME %r %s\n' % (mtimes[path], path))
+            for name in sorted(locations):
+                f.write('%s %s\n' % (name, locations[name]))
+        os.rename(tmp, filename)
+    except (IOError, OSError):
+        _remove_temp_file(tmp)
+        return False
+    return True
+
+
+def _remove_temp_file(tmp):
+    """
+    Remove the temporary file of a failed cache write, if it was created.
+
+    :param tmp: path of temporary file or ``None``, ``str``
+    """
+    if tmp is not None:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def is_location_cache_valid(mtimes):
+    """
+    Check recorded modification times against the filesystem.
+
+    :param mtimes: crawled path to modification time, ``{str: float}``
+    :returns: ``True`` if none of the crawled paths changed, ``bool``
+    """
+    if not mtimes:
+        # legacy caches cannot be revalidated
+        return False
+    for path, mtime in mtimes.items():
+        if get_mtime(path) != mtime:
+            return False
+    return True
+
+
+def has_racy_mtimes(mtimes, crawl_time):
+    """
+    :param mtimes: crawled path to modification time, ``{str: float}``
+    :param crawl_time: time the crawl started, ``float``
+    :returns: ``True`` if any modification time is too close to
+      *crawl_time* to detect later changes within the same timestamp
+      tick, ``bool``
+    """
+    return any(mtime > crawl_time - _RACY_MTIME_WINDOW for mtime in mtimes.values())
+
+
+def _get_marshal_file(prefix, key, env):
+    # the marshal format depends on the Python version
+    key = '%s\n%d.%d' % (key, sys.version_info[0], sys.version_info[1])
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(get_ros_home(env), prefix + digest)
+
+
+def _read_marshal_file(filename, version):
+    try:
+        with open(filename, 'rb') as f:
+            file_version, data = marshal.load(f)
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+    if file_version != version:
+        return None
+    return data
+
+
+def _write_marshal_file(filename, version, data):
+    dirname = os.path.dirname(filename)
+    tmp = None
+    try:
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(filename), dir=dirname)
+        with os.fdopen(fd, 'wb') as f:
+            marshal.dump((version, data), f)
+        os.rename(tmp, filename)
+    except (IOError, OSError, ValueError):
+        _remove_temp_file(tmp)
+        return False
+    return True
+
+
+def get_manifest_cache_file(manifest_name, ros_paths, env=None):
+    """
+    :param manifest_name: MANIFEST_FILE or STACK_FILE, ``str``
+    :param ros_paths: Ordered list of paths the cache is for, ``[str]``
+    :param env: override ``os.environ`` dictionary, ``dict``
+    :returns: path of the manifest cache file in :envvar:`ROS_HOME`, ``str``
+    """
+    key = '%s\n%s' % (manifest_name, os.pathsep.join(ros_paths))
+    return _get_marshal_file(MANIFEST_CACHE_PREFIX, key, env)
+
+
+def get_file_key(path):
+    """
+    :returns: ``(mtime, size)`` of *path*, or ``None`` if *path* does
+      not exist, ``(float, int)``
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+def read_manifest_cache(filename):
+    """
+    Read a manifest cache file.
+
+    :param filename: path of cache file, ``str``
+    :returns: path of manifest file to its ``(mtime, size)`` and
+      record, or an empty dictionary if the file is missing or
+      malformed, ``{str: ((float, int), tuple)}``
+    """
+    entries = _read_marshal_file(filename, _MANIFEST_CACHE_VERSION)
+    return entries if isinstance(entries, dict) else {}
+
+
+def write_manifest_cache(filename, entries):
+    """
+    Atomically write a manifest cache file.  Errors are not raised as
+    the cache is only an optimization.
+
+    :param filename: path of cache file, ``str``
+    :param entries: path of manifest file to its ``(mtime, size)`` and
+      record, ``{str: ((float, int), tuple)}``
+    :returns: ``True`` if the cache was written, ``bool``
+    """
+    return _write_marshal_file(filename, _MANIFEST_CACHE_VERSION, entries)
+
+
+class ManifestCache(object):
+    """
+    Parsed manifest records, read from a manifest cache file on first
+    use and written back by :meth:`save`, which is also called when
+    the process exits.  The records are opaque to the cache; see
+    :func:`rospkg.manifest.parse_manifest_file`.
+    """
+
+    def __init__(self, filename):
+        """
+        :param filename: path of cache file, ``str``
+        """
+        self.filename = filename
+        self._lock = Lock()
+        self._entries = None
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = read_manifest_cache(self.filename)
+
+    def get(self, path):
+        """
+        :param path: path of manifest file, ``str``
+        :returns: current ``(mtime, size)`` of *path*, or ``None`` if it
+          does not exist, and the record stored for it, or ``None`` if
+          there is none or the file changed since, ``((float, int), tuple)``
+        """
+        key = get_file_key(path)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(path)
+        if key is None or entry is None or tuple(entry[0]) != key:
+            return key, None
+        return key, entry[1]
+
+    def put(self, path, key, record):
+        """
+        :param path: path of manifest file, ``str``
+        :param key: ``(mtime, size)`` returned by :meth:`get` before the file was parsed
+        :param record: record of the parsed manifest, ``tuple``
+        """
+        # changes within the same timestamp tick would go unnoticed
+        if key is None or key[0] > time.time() - _RACY_MTIME_WINDOW:
+            return
+        with self._lock:
+            self._load()
+            self._entries[path] = (key, record)
+            self._dirty = True
+
+    def save(self):
+        """
+        Write the cache file if records were added, keeping records
+        other processes added meanwhile.  Records of manifest files
+        which were modified, moved or deleted are dropped.
+
+        :returns: ``True`` unless writing the file failed, ``bool``
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            entries = read_manifest_cache(self.filename)
+            entries.update(self._entries)
+            entries = dict((path, entry) for path, entry in entries.items()
+                           if get_file_key(path) == tuple(entry[0]))
+            self._entries = entries
+            self._dirty = False
+        return write_manifest_cache(self.filename, entries)
+
+
+# cache file -> ManifestCache
+_manifest_caches = {}
+_manifest_caches_lock = Lock()
+
+
+def get_manifest_cache(manifest_name, ros_paths, env=None):
+    """
+    :param manifest_name: MANIFEST_FILE or STACK_FILE, ``str``
+    :param ros_paths: Ordered list of paths the cache is for, ``[str]``
+    :param env: override ``os.environ`` dictionary, ``dict``
+    :returns: the :class:`ManifestCache` of *manifest_name* and
+      *ros_paths* in :envvar:`ROS_HOME`, shared within the process
+    """
+    filename = get_manifest_cache_file(manifest_name, ros_paths, env)
+    with _manifest_caches_lock:
+        cache = _manifest_caches.get(filename)
+        if cache is None:
+            cache = _manifest_caches[filename] = ManifestCache(filename)
+    return cache
+
+
+@atexit.register
+def _save_manifest_caches():
+    with _manifest_caches_lock:
+        caches = list(_manifest_caches.values())
+    for cache in caches:
+        cache.save()
+
+
+def get_rosdep_cache_file(env=None):
+    """
+    :param env: override ``os.environ`` dictionary, ``dict``
+    :returns: path of the rosdep cache file in :envvar:`ROS_HOME`, ``str``
+    """
+    return _get_marshal_file(ROSDEP_CACHE_PREFIX, 'rosdep', env)
+
+
+def read_rosdep_cache(filename, stamp):
+    """
+    Read a rosdep cache file.
+
+    :param filename: path of cache file, ``str``
+    :param stamp: identifies the current state of the rosdep database, ``str``
+    :returns: dependency name to ``(is_ros_package,
+      is_system_dependency)``, or an empty dictionary if the file is
+      missing, malformed or was written for another *stamp*,
+      ``{str: (bool, bool)}``
+    """
+    data = _read_marshal_file(filename, _ROSDEP_CACHE_VERSION)
+    if not isinstance(data, tuple) or len(data) != 2 or data[0] != stamp:
+        return {}
+    return data[1]
+
+
+def write_rosdep_cache(filename, stamp, classes):
+    """
+    Atomically write a rosdep cache file.  Errors are not raised as
+    the cache is only an optimization.
+
+    :param filename: path of cache file, ``str``
+    :param stamp: identifies the current state of the rosdep database, ``str``
+    :param classes: dependency name to ``(is_ros_package,
+      is_system_dependency)``, ``{str: (bool, bool)}``
+    :returns: ``True`` if the cache was written, ``bool``
+    """
+    return _write_marshal_file(filename, _ROSDEP_CACHE_VERSION, (stamp, classes))
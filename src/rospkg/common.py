@@ -34,12 +34,19 @@
 Common definitions for rospkg modules.
 """
 
+import os
+
 MANIFEST_FILE = 'manifest.xml'
 PACKAGE_FILE = 'package.xml'
 STACK_FILE = 'stack.xml'
 ROS_STACK = 'ros'
 
 
+def _normalize_path(path):
+    # compare ROS paths after expanding ~ and resolving symlinks
+    return os.path.realpath(os.path.expanduser(path))
+
+
 class ResourceNotFound(Exception):
     """
     A ROS filesystem resource was not found.
@@ -0,0 +1,541 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Crawler for ROS resources (packages, stacks and catkin packages)
+below a filesystem path.
+"""
+
+import fnmatch
+import os
+import re
+from threading import Lock
+import time
+
+try:
+    from xml.etree.cElementTree import ElementTree
+except ImportError:
+    from xml.etree.ElementTree import ElementTree
+
+from .cache import _RACY_MTIME_WINDOW, get_mtime
+from .common import MANIFEST_FILE, PACKAGE_FILE, STACK_FILE
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+CATKIN_IGNORE = 'CATKIN_IGNORE'
+COLCON_IGNORE = 'COLCON_IGNORE'
+AMENT_IGNORE = 'AMENT_IGNORE'
+ROSPACK_NOSUBDIRS = 'rospack_nosubdirs'
+
+# package index of ament install prefixes, relative to the prefix
+AMENT_PACKAGES_INDEX = os.path.join('share', 'ament_index', 'resource_index', 'packages')
+# marker file of catkin workspaces, empty in install spaces
+CATKIN_MARKER = '.catkin'
+
+# files which exclude a directory and its subdirectories from the crawl
+_IGNORE_MARKERS = frozenset([CATKIN_IGNORE, COLCON_IGNORE, AMENT_IGNORE])
+# files which decide whether a directory is a leaf of the crawl
+_MARKERS = frozenset([MANIFEST_FILE, PACKAGE_FILE, STACK_FILE, ROSPACK_NOSUBDIRS]) | _IGNORE_MARKERS
+
+
+_COMMENT_RE = re.compile(br'<!--.*?-->', re.DOTALL)
+_ROOT_RE = re.compile(br'\s*(?:<\?.*?\?>\s*)*<package[\s>]', re.DOTALL)
+_NAME_RE = re.compile(br'<name\s*>([^<&]*)</name\s*>')
+_EXPORT_RE = re.compile(br'<export(?:\s[^>]*)?>(.*?)</export\s*>', re.DOTALL)
+_TAG_RE = re.compile(br'<(/?)([^\s/>!?]+)[^>]*?(/?)>')
+
+
+def _compile_prune(patterns):
+    """
+    :returns: function telling whether to prune a directory given its
+      name and path, or ``None`` if there is nothing to prune
+    """
+    name_patterns = [fnmatch.translate(p) for p in patterns if os.sep not in p]
+    path_patterns = [fnmatch.translate(p) for p in patterns if os.sep in p]
+    if not name_patterns and not path_patterns:
+        return None
+    match_name = re.compile('|'.join(name_patterns)).match if name_patterns else None
+    match_path = re.compile('|'.join(path_patterns)).match if path_patterns else None
+
+    def prune(name, path):
+        return (match_name is not None and match_name(name) is not None) or \
+            (match_path is not None and match_path(path) is not None)
+    return prune
+
+
+def _sniff_package_xml(data):
+    """
+    :raises: :exc:`ValueError` If *data* is not simple enough to be sniffed
+    """
+    if b'<!--' in data:
+        data = _COMMENT_RE.sub(b'', data)
+    if b'<![CDATA[' in data or b'<!DOCTYPE' in data or not _ROOT_RE.match(data):
+        raise ValueError('unsupported package.xml structure')
+    if not data.rstrip().endswith(b'</package>'):
+        raise ValueError('truncated package.xml')
+    names = _NAME_RE.findall(data)
+    if len(names) != 1 or data.count(b'<name') != 1:
+        raise ValueError('package.xml must contain a single simple name tag')
+    name = names[0].decode('utf-8').strip(' \n\r\t')
+    is_metapackage = False
+    if b'<metapackage' in data:
+        exports = _EXPORT_RE.findall(data)
+        if len(exports) > 1:
+            raise ValueError('package.xml must contain a single export tag')
+        is_metapackage = bool(exports) and _has_child(exports[0], b'metapackage')
+    return name, is_metapackage
+
+
+def _has_child(body, tag):
+    """
+    :returns: ``True`` if *tag* is a direct child of the element with
+      contents *body*, ``bool``
+    """
+    depth = 0
+    for closing, name, empty in _TAG_RE.findall(body):
+        if closing:
+            depth -= 1
+        else:
+            if depth == 0 and name == tag:
+                return True
+            if not empty:
+                depth += 1
+    return False
+
+
+def sniff_package_xml(filename):
+    """
+    Get the name of a catkin package and whether it is a metapackage
+    without building an XML tree.  Files which cannot be sniffed
+    reliably (e.g. with entities or CDATA sections) are fully parsed.
+
+    :param filename: path of ``package.xml``, ``str``
+    :returns: package name and metapackage flag, ``(str, bool)``
+    :raises: :exc:`IOError`
+    :raises: :exc:`SyntaxError` If the file is not valid XML
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    try:
+        return _sniff_package_xml(data)
+    except ValueError:
+        pass
+    root = ElementTree(None, filename)
+    return root.findtext('name').strip(' \n\r\t'), root.find('./export/metapackage') is not None
+
+
+class _DirEntry(object):
+    """
+    Minimal stand-in for ``os.DirEntry`` if ``scandir`` is not available.
+    """
+    __slots__ = ['name', 'path']
+
+    def __init__(self, dirpath, name):
+        self.name = name
+        self.path = os.path.join(dirpath, name)
+
+    def is_dir(self):
+        return os.path.isdir(self.path)
+
+
+def _scandir(path):
+    if scandir is not None:
+        return scandir(path)
+    return [_DirEntry(path, name) for name in os.listdir(path)]
+
+
+class _DirNode(object):
+    __slots__ = ['mtime', 'package_mtime', 'resource_name', 'subdirs']
+
+    def __init__(self, mtime, package_mtime, resource_name, subdirs):
+        self.mtime = mtime
+        self.package_mtime = package_mtime
+        self.resource_name = resource_name
+        self.subdirs = subdirs
+
+
+class CrawlTree(object):
+    """
+    Results of visiting directories during a crawl, keyed by directory
+    path and stamped with the modification times of the directory and
+    of its ``package.xml``.  A crawl with a tree created from a
+    previous tree only lists directories which changed since the
+    previous crawl, and reuses the recorded results for all others.
+    """
+
+    def __init__(self, previous=None):
+        """
+        :param previous: (optional) tree of a previous crawl, :class:`CrawlTree`
+        """
+        self.nodes = {}
+        self._previous = previous.nodes if previous is not None else {}
+        # changes within the same timestamp tick as a recorded
+        # modification time would go unnoticed
+        self._racy_after = time.time() - _RACY_MTIME_WINDOW
+
+    def lookup(self, d, mtime, stats=None):
+        """
+        :param d: directory path, ``str``
+        :param mtime: current modification time of *d*, ``float``
+        :param stats: (optional) counters to update, :class:`CrawlStats`
+        :returns: recorded node of *d* if still valid, or ``None``
+        """
+        node = self.nodes.get(d)
+        if node is None:
+            node = self._previous.get(d)
+        if node is None or node.mtime is None or node.mtime != mtime:
+            return None
+        if node.package_mtime is not None:
+            if stats is not None:
+                stats.stat_calls += 1
+            if get_mtime(os.path.join(d, PACKAGE_FILE)) != node.package_mtime:
+                return None
+        self.nodes[d] = node
+        return node
+
+    def record(self, d, mtime, package_mtime, resource_name, subdirs):
+        if mtime < 0 or mtime >= self._racy_after or \
+                (package_mtime is not None and package_mtime >= self._racy_after):
+            mtime = None
+        self.nodes[d] = _DirNode(mtime, package_mtime, resource_name, list(subdirs))
+
+
+class CrawlStats(object):
+    """
+    Counters of one or more crawls.
+    """
+    __slots__ = ['directories', 'aliases', 'pruned', 'listings', 'stat_calls', 'manifests_sniffed', 'wall_time']
+
+    def __init__(self):
+        # directories visited
+        self.directories = 0
+        # directories skipped because they were already visited
+        # through another path
+        self.aliases = 0
+        # directory entries skipped by prune patterns
+        self.pruned = 0
+        # directories listed, i.e. not reused from a previous crawl
+        self.listings = 0
+        # explicit stat calls, not counting those made while listing
+        self.stat_calls = 0
+        # package.xml files read to find the package name
+        self.manifests_sniffed = 0
+        # seconds spent crawling
+        self.wall_time = 0.0
+
+    def update(self, other):
+        """
+        Add the counters of *other*.
+
+        :param other: :class:`CrawlStats`
+        """
+        for attr in self.__slots__:
+            setattr(self, attr, getattr(self, attr) + getattr(other, attr))
+
+    def __repr__(self):
+        return 'CrawlStats(%s)' % ', '.join('%s=%r' % (attr, getattr(self, attr)) for attr in self.__slots__)
+
+
+class VisitClaims(object):
+    """
+    Visited directories shared by crawlers which split up the crawl of
+    a single path.  Each crawler crawls one subtree; a directory
+    reachable from several subtrees is claimed by the subtree which
+    comes first in directory order, so that the resources found are
+    the same as those found by a single crawler.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        # (st_dev, st_ino) -> owner of the claim
+        self._owners = {}
+
+    def claim(self, key, owner):
+        """
+        Claim a directory for a subtree.
+
+        :param key: ``(st_dev, st_ino)`` of the directory
+        :param owner: position of the subtree, ``int``
+        :returns: ``False`` if the directory was already claimed by
+          *owner* or by a subtree which comes first, ``bool``
+        """
+        with self._lock:
+            current = self._owners.get(key)
+            if current is not None and current <= owner:
+                return False
+            self._owners[key] = owner
+            return True
+
+
+class Crawler(object):
+    """
+    Finds resources below a path, depth first and in directory order.
+    Directories containing a manifest, a ``CATKIN_IGNORE``,
+    ``COLCON_IGNORE``, ``AMENT_IGNORE`` or ``rospack_nosubdirs`` file
+    are leaves of the crawl.  Hidden directories and directories
+    matching a prune pattern are skipped without being stat'ed.  Each
+    directory is visited at most once, even if it can be reached
+    through several symlinks.
+    """
+
+    def __init__(self, manifest_name, mtimes=None, tree=None, stats=None, prune=None, claims=None,
+                 owner=0):
+        """
+        :param manifest_name: MANIFEST_FILE, STACK_FILE or PACKAGE_FILE, ``str``
+        :param mtimes: (optional) updated with the modification times
+          of all crawled directories and parsed ``package.xml`` files,
+          ``{str: float}``
+        :param tree: (optional) records the visited directories, and
+          is used to skip listing directories which did not change,
+          :class:`CrawlTree`
+        :param stats: (optional) counters to update, :class:`CrawlStats`
+        :param prune: (optional) glob patterns of directories to skip.
+          Patterns containing a path separator are matched against the
+          directory path, others against its name, ``[str]``
+        :param claims: (optional) visited directories shared with
+          the crawlers of other subtrees of the same path,
+          :class:`VisitClaims`
+        :param owner: position of the subtree crawled by this crawler
+          among those sharing *claims*, ``int``
+        """
+        self.manifest_name = manifest_name
+        self._prune = _compile_prune(prune) if prune else None
+        self.mtimes = mtimes
+        self.tree = tree
+        self.stats = stats if stats is not None else CrawlStats()
+        # (st_dev, st_ino) of visited directories
+        self._visited = set()
+        self._claims = claims
+        self._owner = owner
+
+    def visit(self, d):
+        """
+        Check a single directory.
+
+        :param d: directory path, ``str``
+        :returns: name of the resource in *d* or ``None``, and the
+          subdirectories of *d* which need to be crawled, ``(str, [str])``
+        """
+        mtimes = self.mtimes
+        tree = self.tree
+        record = mtimes is not None or tree is not None
+        package_mtime = None
+        stats = self.stats
+        # stat before listing, so that changes made while listing
+        # invalidate the recorded time
+        stats.stat_calls += 1
+        try:
+            st = os.stat(d)
+        except OSError:
+            mtime = -1.0
+        else:
+            mtime = st.st_mtime
+            # skip directories already crawled through another path,
+            # i.e. symlinked aliases and symlink loops
+            key = (st.st_dev, st.st_ino)
+            if self._claims is not None:
+                if not self._claims.claim(key, self._owner):
+                    stats.aliases += 1
+                    return None, []
+            elif key in self._visited:
+                stats.aliases += 1
+                return None, []
+            else:
+                self._visited.add(key)
+        stats.directories += 1
+        if record:
+            if mtimes is not None:
+                mtimes[d] = mtime
+            if tree is not None:
+                node = tree.lookup(d, mtime, stats)
+                if node is not None:
+                    if mtimes is not None and node.package_mtime is not None:
+                        mtimes[os.path.join(d, PACKAGE_FILE)] = node.package_mtime
+                    return node.resource_name, node.subdirs
+        markers = set()
+        subdirs = []
+        prune = self._prune
+        stats.listings += 1
+        try:
+            entries = _scandir(d)
+        except OSError:
+            if tree is not None:
+                tree.record(d, mtime, None, None, subdirs)
+            return None, subdirs
+        try:
+            for entry in entries:
+                name = entry.name
+                if name[0] == '.':
+                    # skip hidden dirs (esp. .svn/.git)
+                    continue
+                if prune is not None and name not in _MARKERS and prune(name, entry.path):
+                    stats.pruned += 1
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    subdirs.append(entry.path)
+                elif name in _MARKERS:
+                    markers.add(name)
+        finally:
+            close = getattr(entries, 'close', None)
+            if close is not None:
+                close()
+        if markers:
+            if PACKAGE_FILE in markers and record:
+                stats.stat_calls += 1
+                package_mtime = get_mtime(os.path.join(d, PACKAGE_FILE))
+                if mtimes is not None:
+                    mtimes[os.path.join(d, PACKAGE_FILE)] = package_mtime
+            resource_name, subdirs = self._check_markers(d, markers, subdirs)
+        else:
+            resource_name = None
+        if tree is not None:
+            tree.record(d, mtime, package_mtime, resource_name, subdirs)
+        return resource_name, subdirs
+
+    def _check_markers(self, d, markers, subdirs):
+        """
+        :returns: name of the resource in *d* or ``None``, and the
+          subdirectories of *d* which need to be crawled, ``(str, [str])``
+        """
+        if not _IGNORE_MARKERS.isdisjoint(markers):
+            return None, []  # leaf
+        manifest_name = self.manifest_name
+        if PACKAGE_FILE in markers:
+            # parse package.xml and decide if it matches the search criteria
+            package_file = os.path.join(d, PACKAGE_FILE)
+            self.stats.manifests_sniffed += 1
+            resource_name, is_metapackage = sniff_package_xml(package_file)
+            if (
+                (manifest_name == STACK_FILE and is_metapackage) or
+                (manifest_name == MANIFEST_FILE and not is_metapackage) or
+                manifest_name == PACKAGE_FILE
+            ):
+                return resource_name, []  # leaf
+        if manifest_name in markers:
+            return os.path.basename(d), []  # leaf
+        elif MANIFEST_FILE in markers or PACKAGE_FILE in markers:
+            # noop if manifest_name==MANIFEST_FILE, but a good
+            # optimization for stacks.
+            return None, []  # leaf
+        elif ROSPACK_NOSUBDIRS in markers:
+            return None, []  # leaf
+        return None, subdirs
+
+    def find_install_space(self, path):
+        """
+        Check whether *path* is an install space prefix, or the
+        ``share`` directory of one.  Install spaces have a package
+        index (ament) or an empty ``.catkin`` file (catkin) in the
+        prefix, and every package in ``share/<name>``.
+
+        :param path: absolute path, ``str``
+        :returns: ``share`` directory and the ament package index
+          directory, if any, or ``None`` if *path* is not an install
+          space, ``(str, str)``
+        """
+        if os.path.basename(path) == 'share':
+            prefix, share = os.path.dirname(path), path
+        else:
+            prefix, share = path, os.path.join(path, 'share')
+        index = os.path.join(prefix, AMENT_PACKAGES_INDEX)
+        self.stats.stat_calls += 1
+        if os.path.isdir(index):
+            return share, index
+        self.stats.stat_calls += 1
+        try:
+            if os.path.getsize(os.path.join(prefix, CATKIN_MARKER)) != 0:
+                # devel space, which does not contain package manifests
+                return None
+        except OSError:
+            return None
+        self.stats.stat_calls += 1
+        if os.path.isdir(share):
+            return share, None
+        return None
+
+    def crawl(self, path):
+        """
+        Crawl *path* for resources.  Resources which occur more than
+        once are yielded each time they are found.  Install spaces
+        are not crawled recursively; only the package directories in
+        their ``share`` directory are checked.
+
+        :param path: path to crawl, ``str``
+        :returns: iterator of resource name and directory path, ``(str, str)``
+        """
+        path = os.path.abspath(path)
+        install_space = self.find_install_space(path)
+        if install_space is not None:
+            found = self._crawl_install_space(*install_space)
+        else:
+            found = self._crawl(path)
+        for resource in found:
+            yield resource
+
+    def _crawl_install_space(self, share, index):
+        """
+        :param share: ``share`` directory of the install space, ``str``
+        :param index: ament package index directory or ``None``, ``str``
+        """
+        if index is not None:
+            # visited to record its modification time
+            self.visit(index)
+            try:
+                names = set(n for n in os.listdir(index) if n[0] != '.')
+            except OSError:
+                names = set()
+        _, subdirs = self.visit(share)
+        for d in subdirs:
+            if index is not None and os.path.basename(d) not in names:
+                continue
+            resource_name, _ = self.visit(d)
+            if resource_name is not None:
+                yield resource_name, d
+
+    def _crawl(self, path):
+        stack = [path]
+        while stack:
+            d = stack.pop()
+            resource_name, subdirs = self.visit(d)
+            if resource_name is not None:
+                yield resource_name, d
+            stack.extend(reversed(subdirs))
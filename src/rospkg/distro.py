@@ -616,7 +616,7 @@ def _current_distro_electric(env=None):
     if env is None:
         env = os.environ
     from . import RosPack, get_ros_paths
-    rospack = RosPack(get_ros_paths(env))
+    rospack = RosPack(get_ros_paths(env), lazy=True)
     # there's some chance that the location of this file changes in the future
     try:
         roscore_file = os.path.join(rospack.get_path('roslaunch'), 'roscore.xml')
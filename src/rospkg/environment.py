@@ -51,6 +51,11 @@ ROS_LOG_DIR = "ROS_LOG_DIR"
 # directory in which test result files are written
 ROS_TEST_RESULTS_DIR = "ROS_TEST_RESULTS_DIR"
 
+# enable the resource location cache in ROS_HOME
+ROSPKG_DISK_CACHE = "ROSPKG_DISK_CACHE"
+# glob patterns of directories to skip when crawling
+ROSPKG_PRUNE = "ROSPKG_PRUNE"
+
 
 # Utilities
 def _resolve_path(p):
@@ -117,6 +122,19 @@ def get_ros_package_path(env=None):
     return env.get(ROS_PACKAGE_PATH, None)
 
 
+def get_prune_patterns(env=None):
+    """
+    Get the glob patterns of directories to skip when crawling for
+    resources, from :envvar:`ROSPKG_PRUNE`.
+
+    :param env: override ``os.environ`` dictionary, ``dict``
+    :returns: prune patterns, ``[str]``
+    """
+    if env is None:
+        env = os.environ
+    return [p for p in env.get(ROSPKG_PRUNE, '').split(os.pathsep) if p]
+
+
 def get_ros_home(env=None):
     """
     Get directory location of '.ros' directory (aka ROS home).
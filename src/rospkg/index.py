@@ -0,0 +1,259 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Index of all resources on the ROS paths, built with a single crawl
+and shared by :class:`rospkg.RosPack`, :class:`rospkg.RosStack` and
+managers of catkin packages.
+"""
+
+import collections
+import os
+from threading import Lock
+import time
+
+from .common import _normalize_path, MANIFEST_FILE, PACKAGE_FILE, STACK_FILE
+from .crawler import _IGNORE_MARKERS, Crawler, CrawlStats, CrawlTree, \
+    ROSPACK_NOSUBDIRS, sniff_package_xml
+
+# kinds of resources
+DRY_PACKAGE = 'dry_package'
+WET_PACKAGE = 'wet_package'
+METAPACKAGE = 'metapackage'
+STACK = 'stack'
+
+
+class IndexEntry(collections.namedtuple('IndexEntry', ['kind', 'package', 'stack', 'catkin'])):
+    """
+    Resource found in a directory.  *package*, *stack* and *catkin* are
+    the names under which the resource is found when crawling for
+    ``manifest.xml``, ``stack.xml`` and ``package.xml`` respectively, or
+    ``None``.
+    """
+    __slots__ = ()
+
+
+# IndexEntry field for each manifest type
+_VIEWS = {
+    MANIFEST_FILE: 'package',
+    STACK_FILE: 'stack',
+    PACKAGE_FILE: 'catkin',
+}
+
+
+class IndexCrawler(Crawler):
+    """
+    Crawler which classifies resources for all manifest types at once.
+    Its results match separate crawls for ``manifest.xml``,
+    ``stack.xml`` and ``package.xml``: stacks are crawled for the
+    packages they contain, but resources within a stack are not
+    visible as stacks themselves.
+    """
+
+    def __init__(self, mtimes=None, tree=None, stats=None, prune=None):
+        super(IndexCrawler, self).__init__(None, mtimes, tree, stats, prune)
+
+    def _check_markers(self, d, markers, subdirs):
+        if not _IGNORE_MARKERS.isdisjoint(markers):
+            return None, []  # leaf
+        basename = os.path.basename(d)
+        if PACKAGE_FILE in markers:
+            self.stats.manifests_sniffed += 1
+            name, is_metapackage = sniff_package_xml(os.path.join(d, PACKAGE_FILE))
+            dry_name = basename if MANIFEST_FILE in markers else None
+            stack_name = basename if STACK_FILE in markers else None
+            if is_metapackage:
+                return IndexEntry(METAPACKAGE, dry_name, name, name), []  # leaf
+            return IndexEntry(WET_PACKAGE, name, stack_name, name), []  # leaf
+        if MANIFEST_FILE in markers:
+            stack_name = basename if STACK_FILE in markers else None
+            return IndexEntry(DRY_PACKAGE, basename, stack_name, None), []  # leaf
+        if STACK_FILE in markers:
+            # leaf when crawling for stacks only
+            entry = IndexEntry(STACK, None, basename, None)
+            return entry, [] if ROSPACK_NOSUBDIRS in markers else subdirs
+        if ROSPACK_NOSUBDIRS in markers:
+            return None, []  # leaf
+        return None, subdirs
+
+    def crawl(self, path):
+        """
+        :returns: iterator of resource and directory path, ``(IndexEntry, str)``
+        """
+        return super(IndexCrawler, self).crawl(path)
+
+    def _crawl(self, path):
+        stack = [(path, False)]
+        while stack:
+            d, in_stack = stack.pop()
+            entry, subdirs = self.visit(d)
+            if entry is not None:
+                if in_stack and entry.stack is not None:
+                    entry = entry._replace(stack=None)
+                yield entry, d
+                in_stack = in_stack or entry.kind == STACK
+            stack.extend((s, in_stack) for s in reversed(subdirs))
+
+
+class WorkspaceIndex(object):
+    """
+    Resources on a list of ROS paths, classified as dry packages, wet
+    packages, metapackages and stacks with a single crawl.  Use
+    :meth:`get_instance` to share an index between managers.
+    """
+
+    # number of indexes kept by get_instance()
+    max_instances = 16
+
+    _instances_lock = Lock()
+
+    def __init__(self, ros_paths, prune=None):
+        """
+        :param ros_paths: Ordered list of paths to index, ``[str]``
+        :param prune: (optional) glob patterns of directories to skip, ``[str]``
+        """
+        self._ros_paths = list(ros_paths)
+        self._prune = list(prune) if prune else []
+        self._lock = Lock()
+        # path -> [(IndexEntry, str)] in crawl order
+        self._entries = None
+        self._tree = None
+        self._stats = {}
+
+    @classmethod
+    def get_instance(cls, ros_paths, prune=None):
+        """
+        Reuse an existing index for the specified ros_paths and prune
+        patterns.  Paths are compared after expanding ``~`` and
+        resolving symlinks.  At most :attr:`max_instances` indexes are
+        kept, dropping the least recently used one.
+
+        :param ros_paths: Ordered list of paths to index, ``[str]``
+        :param prune: (optional) glob patterns of directories to skip, ``[str]``
+        """
+        key = (tuple(_normalize_path(p) for p in ros_paths), tuple(prune or ()))
+        with cls._instances_lock:
+            # not inherited from base classes
+            instances = cls.__dict__.get('_instances')
+            if instances is None:
+                instances = cls._instances = collections.OrderedDict()
+            instance = instances.pop(key, None)
+            if instance is None:
+                instance = cls(ros_paths, prune)
+            # most recently used last
+            instances[key] = instance
+            while len(instances) > cls.max_instances:
+                instances.popitem(last=False)
+        return instance
+
+    def get_ros_paths(self):
+        return self._ros_paths[:]
+    ros_paths = property(get_ros_paths, doc="Get ROS paths of this index")
+
+    def _crawl(self):
+        tree = self._tree = CrawlTree(self._tree)
+        entries = {}
+        stats = {}
+        for path in self._ros_paths:
+            if path in entries:
+                continue
+            crawler = IndexCrawler(tree=tree, stats=stats.setdefault(path, CrawlStats()), prune=self._prune)
+            start = time.time()
+            entries[path] = list(crawler.crawl(path))
+            crawler.stats.wall_time += time.time() - start
+        self._entries = entries
+        self._stats = stats
+
+    def _get_entries(self):
+        with self._lock:
+            if self._entries is None:
+                self._crawl()
+            return self._entries
+
+    def refresh(self):
+        """
+        Crawl again, listing only directories which changed since the
+        last crawl.
+        """
+        with self._lock:
+            if self._entries is not None:
+                self._crawl()
+
+    def get_crawl_stats(self):
+        """
+        :returns: counters of the last crawl of each ROS path, ``{str: rospkg.crawler.CrawlStats}``
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _resolve(self, field):
+        """
+        Resolve precedence: earlier ROS paths shadow later ones, and
+        within a path the first resource found wins.
+
+        :returns: name -> (IndexEntry, directory path)
+        """
+        entries = self._get_entries()
+        resolved = {}
+        for path in reversed(self._ros_paths):
+            seen = set()
+            for entry, d in entries[path]:
+                name = getattr(entry, field)
+                if name is not None and name not in seen:
+                    seen.add(name)
+                    resolved[name] = (entry, d)
+        return resolved
+
+    def get_locations(self, manifest_name):
+        """
+        :param manifest_name: MANIFEST_FILE, STACK_FILE or PACKAGE_FILE, ``str``
+        :returns: resource name to directory path, as found by a crawl
+          for *manifest_name*, ``{str: str}``
+        """
+        return dict((name, d) for name, (_, d) in self._resolve(_VIEWS[manifest_name]).items())
+
+    def list(self, kind=None):
+        """
+        :param kind: (optional) DRY_PACKAGE, WET_PACKAGE, METAPACKAGE
+          or STACK, ``str``
+        :returns: names and kinds of resources, ``[(str, str)]``
+        """
+        resources = set()
+        for name, (entry, _) in self._resolve('catkin').items():
+            resources.add((name, entry.kind))
+        for name, (entry, _) in self._resolve('package').items():
+            if entry.kind == DRY_PACKAGE:
+                resources.add((name, DRY_PACKAGE))
+        for name, (entry, _) in self._resolve('stack').items():
+            if entry.kind != METAPACKAGE:
+                resources.add((name, STACK))
+        return sorted(r for r in resources if kind is None or r[1] == kind)
@@ -35,10 +35,33 @@ Library for processing 'manifest' files, i.e. manifest.xml and
 stack.xml.
 """
 
+import atexit
+try:
+    from collections.abc import Set
+except ImportError:
+    from collections import Set
 import os
 import sys
+try:
+    from sys import intern
+except ImportError:
+    # builtin in Python 2
+    pass
+from threading import Lock, Thread
+import weakref
 import xml.dom.minidom as dom
-
+try:
+    import xml.etree.cElementTree as etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+from xml.etree.ElementTree import TreeBuilder
+
+try:
+    _text_type = unicode
+except NameError:
+    _text_type = str
+
+from .cache import get_mtime, get_rosdep_cache_file, read_rosdep_cache, write_rosdep_cache
 from .common import MANIFEST_FILE, PACKAGE_FILE, STACK_FILE
 
 # stack.xml and manifest.xml have the same internal tags right now
@@ -55,8 +78,130 @@ class InvalidManifest(Exception):
     pass
 
 
+class _CommentTreeBuilder(TreeBuilder):
+    """
+    Tree builder which keeps comments and processing instructions
+    inside the root element, for Python versions where
+    :class:`TreeBuilder` cannot do so.
+    """
+
+    def __init__(self):
+        TreeBuilder.__init__(self)
+        self._depth = 0
+
+    def start(self, tag, attrs):
+        self._depth += 1
+        return TreeBuilder.start(self, tag, attrs)
+
+    def end(self, tag):
+        self._depth -= 1
+        return TreeBuilder.end(self, tag)
+
+    def comment(self, data):
+        self._insert(etree.Comment, data)
+
+    def pi(self, target, data=None):
+        self._insert(etree.PI, target + ' ' + data if data else target)
+
+    def _insert(self, tag, text):
+        if self._depth:
+            TreeBuilder.start(self, tag, {})
+            TreeBuilder.data(self, text)
+            TreeBuilder.end(self, tag)
+
+
+def _parse_xml(string):
+    """
+    Parse XML using :mod:`xml.etree`, which is much faster than
+    :mod:`xml.dom.minidom`.  CDATA sections and namespace prefixes
+    are only preserved by the latter, so it is still used for
+    documents containing them.  The helpers below accept the nodes
+    of either.
+
+    :param string: XML document, ``str`` or ``bytes``
+    :returns: :mod:`xml.dom.minidom` document, or list containing the
+      :mod:`xml.etree` root element
+    """
+    if isinstance(string, bytes):
+        cdata, xmlns = b'<![CDATA[', b'xmlns'
+    else:
+        cdata, xmlns = '<![CDATA[', 'xmlns'
+    if cdata in string or xmlns in string:
+        return dom.parseString(string)
+    try:
+        builder = etree.TreeBuilder(insert_comments=True, insert_pis=True)
+    except TypeError:
+        builder = _CommentTreeBuilder()
+    parser = etree.XMLParser(target=builder)
+    parser.feed(string)
+    return [parser.close()]
+
+
 def _get_nodes_by_name(n, name):
-    return [t for t in n.childNodes if t.nodeType == t.ELEMENT_NODE and t.tagName == name]
+    if isinstance(n, dom.Node):
+        return [t for t in n.childNodes if t.nodeType == t.ELEMENT_NODE and t.tagName == name]
+    return [t for t in n if t.tag == name]
+
+
+def _get_elements(n):
+    if isinstance(n, dom.Node):
+        return [t for t in n.childNodes if t.nodeType == t.ELEMENT_NODE]
+    return [t for t in n if t.tag is not etree.Comment and t.tag is not etree.PI]
+
+
+# xml.etree returns byte strings for ASCII text in Python 2, unlike
+# xml.dom.minidom, so text is converted to return the same types
+
+def _get_tag(n):
+    if isinstance(n, dom.Node):
+        return n.tagName
+    return _text_type(n.tag)
+
+
+def _get_attrs(n):
+    if isinstance(n, dom.Node):
+        attrs = {}
+        for k in n.attributes.keys():
+            attrs[k] = n.attributes.get(k).value
+        return attrs
+    return dict((_text_type(k), _text_type(v)) for k, v in n.attrib.items())
+
+
+def _get_text(n):
+    """
+    Utility routine for getting contents of text nodes
+    """
+    if isinstance(n, dom.Node):
+        return "".join([c.data for c in n.childNodes if c.nodeType == c.TEXT_NODE])
+    return _text_type((n.text or '') + ''.join([c.tail or '' for c in n]))
+
+
+def _to_dom(doc, n):
+    if n.tag is etree.Comment:
+        return doc.createComment(n.text or '')
+    if n.tag is etree.PI:
+        target, _, data = n.text.partition(' ')
+        return doc.createProcessingInstruction(target, data)
+    node = doc.createElement(n.tag)
+    for k, v in n.attrib.items():
+        node.setAttribute(k, v)
+    if n.text:
+        node.appendChild(doc.createTextNode(n.text))
+    for c in n:
+        node.appendChild(_to_dom(doc, c))
+        if c.tail:
+            node.appendChild(doc.createTextNode(c.tail))
+    return node
+
+
+def _get_xml(n):
+    """
+    Utility routine for getting the XML contents of a node, serialized
+    by :mod:`xml.dom.minidom`.
+    """
+    if not isinstance(n, dom.Node):
+        n = _to_dom(dom.Document(), n)
+    return ''.join([x.toxml() for x in n.childNodes])
 
 
 def _check_optional(name, allowXHTML=False, merge_multiple=False):
@@ -73,9 +218,9 @@ def _check_optional(name, allowXHTML=False, merge_multiple=False):
             values = []
             for child in n:
                 if allowXHTML:
-                    values.append(''.join([x.toxml() for x in child.childNodes]))
+                    values.append(_get_xml(child))
                 else:
-                    values.append(_get_text(child.childNodes).strip())
+                    values.append(_get_text(child).strip())
             return ', '.join(values)
     return check
 
@@ -95,9 +240,9 @@ def _check_required(name, allowXHTML=False, merge_multiple=False):
         values = []
         for child in n:
             if allowXHTML:
-                values.append(''.join([x.toxml() for x in child.childNodes]))
+                values.append(_get_xml(child))
             else:
-                values.append(_get_text(child.childNodes).strip())
+                values.append(_get_text(child).strip())
         return ', '.join(values)
     return check
 
@@ -109,7 +254,7 @@ def _check_platform(n, filename):
     """
     platforms = _get_nodes_by_name(n, 'platform')
     try:
-        vals = [(p.attributes['os'].value, p.attributes['version'].value, p.getAttribute('notes')) for p in platforms]
+        vals = [(a['os'], a['version'], a.get('notes', '')) for a in map(_get_attrs, platforms)]
     except KeyError as e:
         raise InvalidManifest("<platform> tag is missing required '%s' attribute" % str(e))
     return [Platform(*v) for v in vals]
@@ -126,9 +271,9 @@ def _check_depends(type_, n, filename):
     # which is confusing this subroutine with
     # KeyError: 'package'
     # for now, explicitly don't consider thirdparty depends
-    depends = [e.attributes for e in nodes if 'thirdparty' not in e.attributes.keys()]
+    depends = [a for a in map(_get_attrs, nodes) if 'thirdparty' not in a]
     try:
-        depend_names = [d[type_].value for d in depends]
+        depend_names = [d[type_] for d in depends]
     except KeyError:
         raise InvalidManifest("Invalid manifest file [%s]: depends is missing '%s' attribute" % (filename, type_))
 
@@ -143,25 +288,17 @@ def _check_rosdeps(n, filename):
     """
     try:
         nodes = _get_nodes_by_name(n, 'rosdep')
-        rosdeps = [e.attributes for e in nodes]
-        names = [d['name'].value for d in rosdeps]
+        rosdeps = [_get_attrs(e) for e in nodes]
+        names = [d['name'] for d in rosdeps]
         return [RosDep(n) for n in names]
     except KeyError:
         raise InvalidManifest("invalid rosdep tag in [%s]" % (filename))
 
 
-def _attrs(node):
-    attrs = {}
-    for k in node.attributes.keys():
-        attrs[k] = node.attributes.get(k).value
-    return attrs
-
-
 def _check_exports(n, filename):
     ret_val = []
     for e in _get_nodes_by_name(n, 'export'):
-        elements = [c for c in e.childNodes if c.nodeType == c.ELEMENT_NODE]
-        ret_val.extend([Export(t.tagName, _attrs(t), _get_text(t.childNodes)) for t in elements])
+        ret_val.extend([Export(_get_tag(t), _get_attrs(t), _get_text(t)) for t in _get_elements(e)])
     return ret_val
 
 
@@ -253,7 +390,8 @@ class Depend(object):
     """
     Manifest 'depend' tag
     """
-    __slots__ = ['name', 'type']
+    # weak references for the flyweights of compacted manifests
+    __slots__ = ['name', 'type', '__weakref__']
 
     def __init__(self, name, type_):
         """
@@ -296,7 +434,7 @@ class RosDep(object):
     """
     Manifest 'rosdep' tag
     """
-    __slots__ = ['name']
+    __slots__ = ['name', '__weakref__']
 
     def __init__(self, name):
         """
@@ -362,23 +500,410 @@ class Manifest(object):
         return vals
 
 
-def _get_text(nodes):
+# flyweights shared by compacted manifests, as long as any of them uses it
+_depend_flyweights = weakref.WeakValueDictionary()
+_rosdep_flyweights = weakref.WeakValueDictionary()
+
+
+def _intern(s):
+    try:
+        return intern(s)
+    except TypeError:
+        # unicode in Python 2
+        return s
+
+
+def _get_depend_flyweight(d):
+    flyweight = _depend_flyweights.get((d.name, d.type))
+    if flyweight is None:
+        flyweight = _depend_flyweights.setdefault((d.name, d.type), Depend(_intern(d.name), _intern(d.type)))
+    return flyweight
+
+
+def _get_rosdep_flyweight(d):
+    flyweight = _rosdep_flyweights.get(d.name)
+    if flyweight is None:
+        flyweight = _rosdep_flyweights.setdefault(d.name, RosDep(_intern(d.name)))
+    return flyweight
+
+
+def compact_manifest(manifest):
     """
-    DOM utility routine for getting contents of text nodes
+    Reduce the memory used by a manifest, e.g. when holding the
+    manifests of a large workspace: names are interned, and
+    ``depends`` and ``rosdeps`` become tuples of :class:`Depend` and
+    :class:`RosDep` instances shared by all compacted manifests, which
+    must not be modified.
+
+    :param manifest: :class:`Manifest`, modified in place
+    :returns: *manifest*
+    """
+    def get(field):
+        # fields which are not parsed or split up yet stay so
+        try:
+            return object.__getattribute__(manifest, field)
+        except AttributeError:
+            return None
+
+    for field in ('name', 'type', 'license', 'status', 'version'):
+        value = get(field)
+        if value:
+            setattr(manifest, field, _intern(value))
+    depends = get('depends')
+    if depends is not None:
+        manifest.depends = tuple([_get_depend_flyweight(d) for d in depends])
+    elif isinstance(manifest, _CatkinManifest):
+        manifest._compact = True
+    rosdeps = get('rosdeps')
+    if rosdeps is not None:
+        manifest.rosdeps = tuple([_get_rosdep_flyweight(d) for d in rosdeps])
+    for e in get('exports') or ():
+        e.tag = _intern(e.tag)
+        e.attrs = dict((_intern(k), v) for k, v in e.attrs.items())
+    return manifest
+
+
+# serializes splitting the dependencies of _CatkinManifest instances
+_split_lock = Lock()
+
+
+class _CatkinManifest(Manifest):
     """
-    return "".join([n.data for n in nodes if n.nodeType == n.TEXT_NODE])
+    :class:`Manifest` of a ``package.xml`` file whose ``depends`` and
+    ``rosdeps`` are only split up using rosdep on first access, so
+    that the rosdep database is not loaded for other fields.
+    """
+    __slots__ = ['_depend_names', '_local_names', '_persist', '_compact']
+
+    def __init__(self, manifest, depend_names, rospack, persist):
+        """
+        :param manifest: parsed fields other than ``depends`` and ``rosdeps``, :class:`Manifest`
+        :param depend_names: unclassified dependencies, ``[str]``
+        :param rospack: a RosPack instance to identify local packages as ROS packages
+        :param persist: see :func:`_split_depends`
+        """
+        for slot in Manifest.__slots__:
+            if slot not in ('depends', 'rosdeps') and hasattr(manifest, slot):
+                setattr(self, slot, getattr(manifest, slot))
+        self._depend_names = depend_names
+        # the manager is not kept, as it may be gone on first access
+        self._local_names = _get_local_names(depend_names, rospack)
+        self._persist = persist
+        self._compact = False
+
+    def __getattr__(self, name):
+        # only called for fields which are not set yet
+        if name not in ('depends', 'rosdeps'):
+            raise AttributeError(name)
+        with _split_lock:
+            if self._depend_names is not None:
+                m = Manifest()
+                _classify_depends(m, self._depend_names, self._local_names, self._persist)
+                if self._compact:
+                    compact_manifest(m)
+                self.rosdeps = m.rosdeps
+                self.depends = m.depends
+                self._depend_names = self._local_names = None
+        return object.__getattribute__(self, name)
+
+    def __getstate__(self):
+        # pickle without splitting up, so that worker processes of
+        # ManifestManager.load_manifests() never load the rosdep view
+        state = {}
+        for slot in Manifest.__slots__ + _CatkinManifest.__slots__:
+            try:
+                state[slot] = object.__getattribute__(self, slot)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+
+class LazyManifest(Manifest):
+    """
+    :class:`Manifest` which only extracts ``depends`` and ``rosdeps``
+    when created.  The manifest contents are still parsed as XML and
+    the root element, dependencies and rosdeps are validated up
+    front, and the contents are kept.  The first access of any other
+    field parses the contents again to extract all remaining fields,
+    which raises :exc:`InvalidManifest` if they are invalid.  This
+    saves time and memory when most manifests are only loaded for
+    their dependencies.
+    """
+    __slots__ = ['_string']
+
+    def __init__(self, type_, filename, string, depends, rosdeps, is_catkin):
+        """
+        :param type_: `'package'` or `'stack'`
+        :param filename: location of manifest file, ``str``
+        :param string: manifest contents, ``str``
+        :param depends: parsed dependencies, ``[Depend]``
+        :param rosdeps: parsed rosdeps, ``[RosDep]``
+        :param is_catkin: ``True`` if the manifest is a catkin manifest
+        """
+        self.type = type_
+        self.filename = filename
+        self.depends = depends
+        self.rosdeps = rosdeps
+        self.is_catkin = is_catkin
+        self._string = string
+
+    def __getattr__(self, name):
+        # only called for fields which are not set yet
+        if name not in Manifest.__slots__ or self._string is None:
+            raise AttributeError(name)
+        manifest_name = MANIFEST_FILE if self.type == 'package' else STACK_FILE
+        m = parse_manifest(manifest_name, self._string, self.filename)
+        for slot in Manifest.__slots__:
+            # keep the dependencies, which may be compacted
+            if slot not in ('depends', 'rosdeps'):
+                setattr(self, slot, getattr(m, slot))
+        self._string = None
+        return getattr(self, name)
+
+    def __getstate__(self):
+        # pickle without parsing the fields which were not accessed yet
+        state = {}
+        for slot in Manifest.__slots__ + LazyManifest.__slots__:
+            try:
+                state[slot] = object.__getattribute__(self, slot)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
 
 
 _static_rosdep_view = None
+_rosdep_view_lock = Lock()
+
+# dependency name -> (is_ros_package, is_system_dependency) in _static_rosdep_view
+_rosdep_classes = {}
+# identifies the rosdep database, if the rosdep cache file was read
+_rosdep_stamp = None
+_rosdep_classes_modified = False
+
+
+def _get_rosdep_view():
+    """
+    :returns: rosdep view, initialized once, or ``False`` if it is empty
+    :raises: :exc:`ImportError` if rosdep is not installed
+    """
+    global _static_rosdep_view
+    from rosdep2.rospack import init_rospack_interface, is_view_empty
+    with _rosdep_view_lock:
+        if _static_rosdep_view is None:
+            view = init_rospack_interface()
+            if is_view_empty(view):
+                sys.stderr.write("the rosdep view is empty: call 'sudo rosdep init' and 'rosdep update'\n")
+                view = False
+            _static_rosdep_view = view
+    return _static_rosdep_view
+
+
+def _prewarm_rosdep_view():
+    try:
+        _get_rosdep_view()
+    except Exception:
+        # raised again on first use
+        pass
+
+
+def prewarm_rosdep_view():
+    """
+    Start loading the rosdep database, which is needed to split the
+    dependencies of catkin packages into ROS and system dependencies,
+    on a background thread.
+
+    :returns: the started thread, or ``None`` if the rosdep view is
+      already initialized, ``threading.Thread``
+    """
+    if _static_rosdep_view is not None:
+        return None
+    thread = Thread(target=_prewarm_rosdep_view, name='rospkg-rosdep-view')
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def _get_rosdep_stamp():
+    """
+    :returns: identifies the state of the rosdep database, which
+      changes with ``rosdep update`` or :envvar:`ROS_DISTRO`, ``str``
+    """
+    from rosdep2.sources_list import CACHE_INDEX, get_sources_cache_dir
+    index = os.path.join(get_sources_cache_dir(), CACHE_INDEX)
+    return '%r %s' % (get_mtime(index), os.environ.get('ROS_DISTRO', ''))
+
+
+def _read_rosdep_classes():
+    """
+    Add the classifications stored in the rosdep cache file in
+    :envvar:`ROS_HOME` to ``_rosdep_classes``, once.
+    """
+    global _rosdep_stamp
+    if _rosdep_stamp is None:
+        _rosdep_stamp = _get_rosdep_stamp()
+        for name, classes in read_rosdep_cache(get_rosdep_cache_file(), _rosdep_stamp).items():
+            _rosdep_classes.setdefault(name, classes)
+
+
+@atexit.register
+def _write_rosdep_classes():
+    if _rosdep_stamp is not None and _rosdep_classes_modified:
+        write_rosdep_cache(get_rosdep_cache_file(), _rosdep_stamp, dict(_rosdep_classes))
+
 
+# fields of Manifest stored in records of manifest caches
+_RECORD_FIELDS = [
+    'type', 'filename', 'is_catkin', 'name', 'description', 'brief', 'author',
+    'license', 'licenses', 'license_url', 'url', 'version', 'status', 'notes']
 
-def parse_manifest_file(dirpath, manifest_name, rospack=None):
+
+def _to_record(manifest, depend_names=None):
+    """
+    :param depend_names: unclassified dependencies of a catkin manifest, ``[str]``
+    :returns: record of *manifest* for a
+      :class:`rospkg.cache.ManifestCache`, consisting of builtin types
+      only, ``tuple``
+    """
+    depends = [(d.name, d.type) for d in manifest.depends]
+    rosdeps = [d.name for d in manifest.rosdeps]
+    if isinstance(manifest, LazyManifest) and manifest._string is not None:
+        fields = (manifest.type, manifest.filename, manifest.is_catkin)
+        return ('lazy', fields, depends, rosdeps, [], [], manifest._string)
+    fields = [getattr(manifest, f, None) for f in _RECORD_FIELDS]
+    # catkin_pkg may return subclasses of str
+    fields[_RECORD_FIELDS.index('licenses')] = ['%s' % license_ for license_ in manifest.licenses]
+    platforms = [(p.os, p.version, p.notes) for p in manifest.platforms]
+    exports = [(e.tag, dict(e.attrs), e.str) for e in manifest.exports]
+    kind = 'manifest' if depend_names is None else 'catkin'
+    return (kind, tuple(fields), depends, rosdeps, platforms, exports, depend_names)
+
+
+def _from_record(record):
+    """
+    :returns: :class:`Manifest` of a record created by
+      :func:`_to_record`, and its unclassified dependencies for catkin
+      manifests, ``(Manifest, [str])``
+    """
+    kind, fields, depends, rosdeps, platforms, exports, extra = record
+    depends = [Depend(name, type_) for name, type_ in depends]
+    rosdeps = [RosDep(name) for name in rosdeps]
+    if kind == 'lazy':
+        type_, filename, is_catkin = fields
+        return LazyManifest(type_, filename, extra, depends, rosdeps, is_catkin), None
+    manifest = Manifest()
+    for field, value in zip(_RECORD_FIELDS, fields):
+        if value is not None:
+            setattr(manifest, field, value)
+    manifest.depends = depends
+    manifest.rosdeps = rosdeps
+    manifest.platforms = [Platform(*p) for p in platforms]
+    manifest.exports = [Export(*e) for e in exports]
+    return manifest, extra
+
+
+def _parse_package_xml(package_filename, filename):
+    """
+    :returns: :class:`Manifest` of a ``package.xml`` file, without
+      dependencies, and the names of its dependencies, ``(Manifest, [str])``
+    """
+    manifest = Manifest(filename=filename, is_catkin=True)
+
+    # extract all information from package.xml
+    from catkin_pkg.package import parse_package
+    p = parse_package(package_filename)
+    # put these into manifest
+    manifest.description = p.description
+    manifest.name = p.name
+    manifest.author = ', '.join([('Maintainer: %s' % str(m)) for m in p.maintainers] + [str(a) for a in p.authors])
+    manifest.license = ', '.join(p.licenses)
+    manifest.licenses = p.licenses
+    if p.urls:
+        manifest.url = str(p.urls[0])
+    manifest.version = p.version
+    for export in p.exports:
+        manifest.exports.append(Export(export.tagname, export.attributes, export.content))
+    depend_names = [d.name for d in (p.buildtool_depends + p.build_depends + p.run_depends + p.test_depends)]
+    return manifest, depend_names
+
+
+def _get_local_names(depend_names, rospack):
+    """
+    :param rospack: a RosPack instance, or ``None``
+    :returns: names of *depend_names* which are resources of *rospack*, ``frozenset``
+    """
+    if not rospack or not depend_names:
+        return frozenset()
+    local = rospack.list()
+    if not isinstance(local, Set):
+        local = set(local)
+    return frozenset(name for name in depend_names if name in local)
+
+
+def _split_depends(manifest, depend_names, rospack, persist=False):
+    """
+    Split dependencies of a catkin manifest into ROS and system
+    dependencies (using rosdep).  The rosdep classification of each
+    name is only computed once.
+
+    :param rospack: a RosPack instance to identify local packages as ROS packages
+    :param persist: share the classifications with other processes
+      through the rosdep cache file in :envvar:`ROS_HOME`
+    """
+    _classify_depends(manifest, depend_names, _get_local_names(depend_names, rospack), persist)
+
+
+def _classify_depends(manifest, depend_names, local, persist):
+    """
+    Like :func:`_split_depends`, with *local* names of local packages, ``frozenset``
+    """
+    try:
+        from rosdep2.rospack import is_ros_package, is_system_dependency
+        global _rosdep_classes_modified
+        if _get_rosdep_view():
+            if persist:
+                _read_rosdep_classes()
+            depends = set([])
+            rosdeps = set([])
+            for name in depend_names:
+                classes = _rosdep_classes.get(name)
+                if classes is None:
+                    classes = _rosdep_classes[name] = (
+                        bool(is_ros_package(_static_rosdep_view, name)),
+                        bool(is_system_dependency(_static_rosdep_view, name)))
+                    _rosdep_classes_modified = True
+                if name in local or classes[0]:
+                    depends.add(name)
+                if classes[1]:
+                    rosdeps.add(name)
+            for name in depends:
+                manifest.depends.append(Depend(name, 'package'))
+            for name in rosdeps:
+                manifest.rosdeps.append(RosDep(name))
+    except ImportError:
+        pass
+
+
+def parse_manifest_file(dirpath, manifest_name, rospack=None, lazy=False, cache=None):
     """
     Parse manifest file (package, stack).  Type will be inferred from manifest_name.
 
     :param dirpath: directory of manifest file, ``str``
     :param manifest_name: ``MANIFEST_FILE`` or ``STACK_FILE``, ``str``
     :param rospack: a RosPack instance to identify local packages as ROS packages
+    :param lazy: return a :class:`LazyManifest` for ``manifest.xml``
+      and ``stack.xml`` files, see :func:`parse_manifest`
+    :param cache: (optional) :class:`rospkg.cache.ManifestCache` to
+      take the manifest from, as long as the file is unchanged, and
+      to store it in otherwise.  The dependencies of catkin manifests
+      are stored unclassified and split up using rosdep again.
 
     :returns: return :class:`Manifest` instance, populated with parsed fields
     :raises: :exc:`InvalidManifest`
@@ -390,64 +915,41 @@ def parse_manifest_file(dirpath, manifest_name, rospack=None):
         package_filename = os.path.join(dirpath, PACKAGE_FILE)
         if not os.path.isfile(package_filename):
             raise IOError("Invalid/non-existent manifest file: %s" % filename)
-        manifest = Manifest(filename=filename, is_catkin=True)
-
-        # extract all information from package.xml
-        from catkin_pkg.package import parse_package
-        p = parse_package(package_filename)
-        # put these into manifest
-        manifest.description = p.description
-        manifest.name = p.name
-        manifest.author = ', '.join([('Maintainer: %s' % str(m)) for m in p.maintainers] + [str(a) for a in p.authors])
-        manifest.license = ', '.join(p.licenses)
-        manifest.licenses = p.licenses
-        if p.urls:
-            manifest.url = str(p.urls[0])
-        manifest.version = p.version
-        for export in p.exports:
-            manifest.exports.append(Export(export.tagname, export.attributes, export.content))
-
-        # split ros and system dependencies (using rosdep)
-        try:
-            from rosdep2.rospack import init_rospack_interface, is_ros_package, is_system_dependency, is_view_empty
-            global _static_rosdep_view
-            # initialize rosdep view once
-            if _static_rosdep_view is None:
-                _static_rosdep_view = init_rospack_interface()
-                if is_view_empty(_static_rosdep_view):
-                    sys.stderr.write("the rosdep view is empty: call 'sudo rosdep init' and 'rosdep update'\n")
-                    _static_rosdep_view = False
-            if _static_rosdep_view:
-                depends = set([])
-                rosdeps = set([])
-                for d in (p.buildtool_depends + p.build_depends + p.run_depends + p.test_depends):
-                    if (rospack and d.name in rospack.list()) or is_ros_package(_static_rosdep_view, d.name):
-                        depends.add(d.name)
-                    if is_system_dependency(_static_rosdep_view, d.name):
-                        rosdeps.add(d.name)
-                for name in depends:
-                    manifest.depends.append(Depend(name, 'package'))
-                for name in rosdeps:
-                    manifest.rosdeps.append(RosDep(name))
-        except ImportError:
-            pass
-
-        return manifest
-
+        key, record = cache.get(package_filename) if cache is not None else (None, None)
+        if record is not None:
+            manifest, depend_names = _from_record(record)
+        else:
+            manifest, depend_names = _parse_package_xml(package_filename, filename)
+            if cache is not None:
+                cache.put(package_filename, key, _to_record(manifest, depend_names))
+        # the dependencies are split up using rosdep on first access
+        return _CatkinManifest(manifest, depend_names, rospack, cache is not None)
+
+    key, record = cache.get(filename) if cache is not None else (None, None)
+    # eagerly parsed manifests must not defer errors
+    if record is not None and (lazy or record[0] != 'lazy'):
+        return _from_record(record)[0]
     with open(filename, 'rb') as f:
         data = f.read()
     if sys.version_info[0] >= 3:
         data = data.decode('utf-8')
-    return parse_manifest(manifest_name, data, filename)
+    manifest = parse_manifest(manifest_name, data, filename, lazy=lazy)
+    # unrecognized tags are DOM elements, which cannot be stored
+    if cache is not None and (lazy or not manifest.unknown_tags):
+        cache.put(filename, key, _to_record(manifest))
+    return manifest
 
 
-def parse_manifest(manifest_name, string, filename='string'):
+def parse_manifest(manifest_name, string, filename='string', lazy=False):
     """
     Parse manifest string contents.
 
     :param manifest_name: ``MANIFEST_FILE`` or ``STACK_FILE``, ``str``
     :param string: manifest.xml contents, ``str``
     :param filename: full file path for debugging, ``str``
+    :param lazy: parse the XML, but only extract ``depends`` and
+      ``rosdeps`` now and return a :class:`LazyManifest`, which
+      parses *string* again on first access of another field
     :returns: return parsed :class:`Manifest`
     """
     if manifest_name == MANIFEST_FILE:
@@ -456,7 +958,7 @@ def parse_manifest(manifest_name, string, filename='string'):
         type_ = 'stack'
 
     try:
-        d = dom.parseString(string)
+        d = _parse_xml(string)
     except Exception as e:
         raise InvalidManifest("[%s] invalid XML: %s" % (filename, e))
 
@@ -465,11 +967,21 @@ def parse_manifest(manifest_name, string, filename='string'):
     if len(p) != 1:
         raise InvalidManifest("manifest [%s] must have a single '%s' element" % (filename, type_))
     p = p[0]
+    if lazy:
+        depends = _check_depends(type_, p, filename)
+        rosdeps = _check_rosdeps(p, filename)
+        if type_ == 'stack' and rosdeps:
+            raise InvalidManifest("stack manifests are not allowed to have rosdeps")
+        is_catkin = bool(_get_nodes_by_name(p, 'catkin')) or bool(_get_nodes_by_name(p, 'name'))
+        return LazyManifest(type_, filename, string, depends, rosdeps, is_catkin)
+    if not isinstance(p, dom.Node) and [e for e in _get_elements(p) if e.tag not in VALID]:
+        # unrecognized tags are stored as DOM elements
+        p = _get_nodes_by_name(dom.parseString(string), type_)[0]
     m.description = _check('description')(p, filename)
     m.brief = ''
     try:
         tag = _get_nodes_by_name(p, 'description')[0]
-        m.brief = tag.getAttribute('brief') or ''
+        m.brief = _get_attrs(tag).get('brief') or ''
     except:
         # means that 'description' tag is missing
         pass
@@ -482,21 +994,21 @@ def parse_manifest(manifest_name, string, filename='string'):
     m.license_url = ''
     try:
         tag = _get_nodes_by_name(p, 'license')[0]
-        m.license_url = tag.getAttribute('url') or ''
+        m.license_url = _get_attrs(tag).get('url') or ''
     except:
         pass  # manifest is missing required 'license' tag
 
     m.status = 'unreviewed'
     try:
         tag = _get_nodes_by_name(p, 'review')[0]
-        m.status = tag.getAttribute('status') or ''
+        m.status = _get_attrs(tag).get('status') or ''
     except:
         pass  # manifest is missing optional 'review status' tag
 
     m.notes = ''
     try:
         tag = _get_nodes_by_name(p, 'review')[0]
-        m.notes = tag.getAttribute('notes') or ''
+        m.notes = _get_attrs(tag).get('notes') or ''
     except:
         pass  # manifest is missing optional 'review notes' tag
 
@@ -515,5 +1027,5 @@ def parse_manifest(manifest_name, string, filename='string'):
     m.is_catkin = bool(_get_nodes_by_name(p, 'catkin')) or bool(_get_nodes_by_name(p, 'name'))
 
     # store unrecognized tags
-    m.unknown_tags = [e for e in p.childNodes if e.nodeType == e.ELEMENT_NODE and e.tagName not in VALID]
+    m.unknown_tags = [e for e in _get_elements(p) if _get_tag(e) not in VALID]
     return m
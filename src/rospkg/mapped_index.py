@@ -0,0 +1,267 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Resource index published into a memory-mapped file in
+:envvar:`ROS_HOME`, so that many processes on one host can share a
+single crawl instead of each building its own location cache.
+
+File layout (little-endian)::
+
+  magic 'RPKIDX02'
+  uint32 header length, header
+  uint32 record count
+  records of eight uint32: name, path, dependencies and manifest key
+    as offset and length into the string pool, sorted by name
+  string pool (UTF-8)
+
+The header holds ``KEY=value`` lines and ``MTIME <mtime> <path>``
+lines, like the location cache, so that the index can be
+revalidated.  Dependencies are newline-separated names; a length of
+``NO_DEPENDS`` means they are not known, e.g. for invalid manifests.
+Editing a manifest in place does not change the modification time
+of any crawled directory, so dependencies are stored with a key of
+the manifest files they were read from, which readers compare with
+the files on disk.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from .cache import _remove_temp_file, is_location_cache_valid
+from .environment import get_ros_home
+
+MAPPED_INDEX_PREFIX = 'rospkg_index_'
+MAGIC = b'RPKIDX02'
+NO_DEPENDS = 0xffffffff
+
+_UINT32 = struct.Struct('<I')
+_RECORD = struct.Struct('<IIIIIIII')
+
+
+def get_mapped_index_file(manifest_name, ros_paths, env=None):
+    """
+    :param manifest_name: MANIFEST_FILE, STACK_FILE or PACKAGE_FILE, ``str``
+    :param ros_paths: Ordered list of paths the index is for, ``[str]``
+    :param env: override ``os.environ`` dictionary, ``dict``
+    :returns: path of the index file in :envvar:`ROS_HOME`, ``str``
+    """
+    key = '%s\n%s' % (manifest_name, os.pathsep.join(ros_paths))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(get_ros_home(env), MAPPED_INDEX_PREFIX + digest)
+
+
+def write_mapped_index(filename, header, locations, depends, mtimes, manifest_keys=None):
+    """
+    Atomically write an index file.  Processes which mapped a
+    previous version of the file keep their mapping.  Errors are not
+    raised as the index is only an optimization.
+
+    :param filename: path of index file, ``str``
+    :param header: header keys and values, ``{str: str}``
+    :param locations: resource name to directory path, ``{str: str}``
+    :param depends: resource name to names of direct dependencies,
+      ``{str: [str]}``.  Resources without an entry are written with
+      unknown dependencies.
+    :param mtimes: crawled path to modification time, ``{str: float}``
+    :param manifest_keys: resource name to key of the manifest files
+      its dependencies were read from, ``{str: str}``
+    :returns: ``True`` if the index was written, ``bool``
+    """
+    lines = ['%s=%s' % (key, header[key]) for key in sorted(header)]
+    lines.extend('MTIME %r %s' % (mtimes[path], path) for path in sorted(mtimes))
+    header_data = '\n'.join(lines).encode('utf-8')
+
+    names = sorted(locations, key=lambda name: name.encode('utf-8'))
+    pool_start = len(MAGIC) + 2 * _UINT32.size + len(header_data) + len(names) * _RECORD.size
+    pool = []
+    pool_size = [0]
+
+    def add(data):
+        offset = pool_start + pool_size[0]
+        pool.append(data)
+        pool_size[0] += len(data)
+        return offset, len(data)
+
+    if manifest_keys is None:
+        manifest_keys = {}
+    records = []
+    for name in names:
+        name_ref = add(name.encode('utf-8'))
+        path_ref = add(locations[name].encode('utf-8'))
+        if name in depends:
+            deps_ref = add('\n'.join(depends[name]).encode('utf-8'))
+        else:
+            deps_ref = (0, NO_DEPENDS)
+        key_ref = add(manifest_keys.get(name, '').encode('utf-8'))
+        records.append(_RECORD.pack(*(name_ref + path_ref + deps_ref + key_ref)))
+
+    dirname = os.path.dirname(filename)
+    tmp = None
+    try:
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(filename), dir=dirname)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(_UINT32.pack(len(header_data)))
+            f.write(header_data)
+            f.write(_UINT32.pack(len(records)))
+            f.write(b''.join(records))
+            f.write(b''.join(pool))
+        os.rename(tmp, filename)
+    except (IOError, OSError):
+        _remove_temp_file(tmp)
+        return False
+    return True
+
+
+class MappedIndex(Mapping):
+    """
+    Read-only view of an index file, mapping resource names to
+    directory paths.  Lookups binary search the mapped records, so the
+    index is never loaded into the memory of the process and its pages
+    are shared with all other processes using it.
+    """
+
+    def __init__(self, filename):
+        """
+        :param filename: path of index file, ``str``
+        :raises: :exc:`IOError`
+        :raises: :exc:`ValueError` If the file is malformed
+        """
+        with open(filename, 'rb') as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (mmap.error, ValueError):
+                # e.g. empty file
+                raise ValueError('cannot map index file %s' % filename)
+        try:
+            self._parse_header(filename)
+        except Exception:
+            self._mm.close()
+            raise
+
+    def _parse_header(self, filename):
+        mm = self._mm
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError('invalid index file %s' % filename)
+        offset = len(MAGIC)
+        header_len, = _UINT32.unpack_from(mm, offset)
+        offset += _UINT32.size
+        self.header = {}
+        self.mtimes = {}
+        for line in mm[offset:offset + header_len].decode('utf-8').split('\n'):
+            if line.startswith('MTIME '):
+                _, mtime, path = line.split(' ', 2)
+                self.mtimes[path] = float(mtime)
+            elif '=' in line:
+                key, value = line.split('=', 1)
+                self.header[key] = value
+        offset += header_len
+        self._count, = _UINT32.unpack_from(mm, offset)
+        self._records = offset + _UINT32.size
+        if self._records + self._count * _RECORD.size > len(mm):
+            raise ValueError('truncated index file %s' % filename)
+
+    def is_valid(self):
+        """
+        :returns: ``True`` if none of the crawled paths changed since
+          the index was written, ``bool``
+        """
+        return is_location_cache_valid(self.mtimes)
+
+    def close(self):
+        self._mm.close()
+
+    def _record(self, i):
+        return _RECORD.unpack_from(self._mm, self._records + i * _RECORD.size)
+
+    def _string(self, offset, length):
+        return self._mm[offset:offset + length].decode('utf-8')
+
+    def _find(self, name):
+        key = name.encode('utf-8')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            value = self._mm[record[0]:record[0] + record[1]]
+            if value < key:
+                lo = mid + 1
+            elif value > key:
+                hi = mid
+            else:
+                return record
+        return None
+
+    def __getitem__(self, name):
+        record = self._find(name)
+        if record is None:
+            raise KeyError(name)
+        return self._string(record[2], record[3])
+
+    def __contains__(self, name):
+        return self._find(name) is not None
+
+    def __iter__(self):
+        for i in range(self._count):
+            record = self._record(i)
+            yield self._string(record[0], record[1])
+
+    def __len__(self):
+        return self._count
+
+    def get_depends(self, name, manifest_key=None):
+        """
+        :param manifest_key: if set, current key of the manifest files
+          of *name*, ``str``
+        :returns: names of direct dependencies of *name*, or ``None``
+          if *name* or its dependencies are not in the index, or if
+          they were read from manifest files with a different key, ``[str]``
+        """
+        record = self._find(name)
+        if record is None or record[5] == NO_DEPENDS:
+            return None
+        if manifest_key is not None and self._string(record[6], record[7]) != manifest_key:
+            return None
+        if not record[5]:
+            return []
+        return self._string(record[4], record[5]).split('\n')
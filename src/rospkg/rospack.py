@@ -35,22 +35,109 @@ import os
 import platform
 import shutil
 import subprocess
-from threading import Lock
+import sys
+from multiprocessing import cpu_count
+from multiprocessing.pool import Pool, ThreadPool
+from threading import Event, local, Lock, RLock
+import time
+import weakref
 
 try:
     from xml.etree.cElementTree import ElementTree
 except ImportError:
     from xml.etree.ElementTree import ElementTree
 
-from .common import MANIFEST_FILE, PACKAGE_FILE, ResourceNotFound, STACK_FILE
-from .environment import get_ros_paths
-from .manifest import InvalidManifest, Manifest, parse_manifest_file
+from .cache import get_file_key, get_location_cache_file, get_manifest_cache, get_mtime, \
+    has_racy_mtimes, is_location_cache_valid, read_location_cache, write_location_cache
+from .common import _normalize_path, MANIFEST_FILE, PACKAGE_FILE, ResourceNotFound, STACK_FILE
+from .crawler import Crawler, CrawlStats, CrawlTree, VisitClaims
+from .environment import get_prune_patterns, get_ros_paths, ROSPKG_DISK_CACHE
+from .index import WorkspaceIndex
+from .mapped_index import get_mapped_index_file, MappedIndex, write_mapped_index
+from .manifest import compact_manifest, InvalidManifest, Manifest, parse_manifest_file, prewarm_rosdep_view
 from .stack import InvalidStack, parse_stack_file
 
-_cache_lock = Lock()
+# guards the instances of ManifestManager.get_instance()
+_instances_lock = Lock()
 
 
-def list_by_path(manifest_name, path, cache):
+class _EntryIndex(object):
+    """
+    Resource locations found by crawling a single ROS path entry.
+    """
+    __slots__ = ['path', 'locations', 'mtimes', '__weakref__']
+
+    def __init__(self, path, locations, mtimes):
+        # spelling of the path entry which was crawled
+        self.path = path
+        self.locations = locations
+        self.mtimes = mtimes
+
+    def get_locations(self, path):
+        """
+        :param path: spelling of the same path entry, ``str``
+        :returns: resource locations below *path*, ``{str: str}``
+        """
+        if path == self.path:
+            return self.locations
+        # parallel crawls return absolute locations
+        prefixes = [(self.path, path), (os.path.abspath(self.path), os.path.abspath(path))]
+        locations = {}
+        for resource_name, d in self.locations.items():
+            for old, new in prefixes:
+                if d == old or d.startswith(old.rstrip(os.sep) + os.sep):
+                    d = new + d[len(old):]
+                    break
+            locations[resource_name] = d
+        return locations
+
+
+# (manifest name, normalized path, prune patterns) -> _EntryIndex of
+# managers with share_entries, as long as any of them uses it
+_entry_indexes = weakref.WeakValueDictionary()
+_entry_indexes_lock = Lock()
+
+
+class _Flight(object):
+    """
+    Result of a computation which is shared with all threads
+    requesting it while it is in progress.
+    """
+    __slots__ = ['_done', '_result', '_error']
+
+    def __init__(self):
+        self._done = Event()
+        self._result = None
+        self._error = None
+
+    def set(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class CacheStats(object):
+    """
+    Hit and miss counters of a cache.
+    """
+    __slots__ = ['hits', 'misses']
+
+    def __init__(self, hits=0, misses=0):
+        self.hits = hits
+        self.misses = misses
+
+    def __repr__(self):
+        return 'CacheStats(hits=%r, misses=%r)' % (self.hits, self.misses)
+
+
+def list_by_path(manifest_name, path, cache, mtimes=None, tree=None, stats=None, prune=None,
+                 found=None, claims=None, owner=0):
     """
     List ROS stacks or packages within the specified path.
 
@@ -61,62 +148,215 @@ def list_by_path(manifest_name, path, cache):
     :param manifest_name: MANIFEST_FILE or STACK_FILE, ``str``
     :param path: path to list resources in, ``str``
     :param cache: path cache to update. Maps resource name to directory path, ``{str: str}``
+    :param mtimes: (optional) updated with the modification times
+      of all crawled directories and parsed ``package.xml`` files,
+      ``{str: float}``
+    :param tree: (optional) records the crawled directories and skips
+      listing directories which did not change since the crawl of a
+      previous tree, :class:`rospkg.crawler.CrawlTree`
+    :param stats: (optional) crawl counters to update, :class:`rospkg.crawler.CrawlStats`
+    :param prune: (optional) glob patterns of directories to skip.
+      Patterns containing a path separator are matched against the
+      directory path, others against its name, ``[str]``
+    :param found: (optional) called with the name and directory of
+      each resource as soon as it is found, ``fn(str, str)``
+    :param claims: (optional) see :class:`rospkg.crawler.Crawler`,
+      :class:`rospkg.crawler.VisitClaims`
+    :param owner: (optional) see :class:`rospkg.crawler.Crawler`, ``int``
     :returns: complete list of resources in ROS environment, ``[str]``
     """
     resources = []
-    path = os.path.abspath(path)
-    basename = os.path.basename
-    for d, dirs, files in os.walk(path, topdown=True, followlinks=True):
-        if 'CATKIN_IGNORE' in files:
-            del dirs[:]
-            continue  # leaf
-        if PACKAGE_FILE in files:
-            # parse package.xml and decide if it matches the search criteria
-            root = ElementTree(None, os.path.join(d, PACKAGE_FILE))
-            is_metapackage = root.find('./export/metapackage') is not None
-            if (
-                (manifest_name == STACK_FILE and is_metapackage) or
-                (manifest_name == MANIFEST_FILE and not is_metapackage) or
-                manifest_name == PACKAGE_FILE
-            ):
-                resource_name = root.findtext('name').strip(' \n\r\t')
-                if resource_name not in resources:
-                    resources.append(resource_name)
-                    if cache is not None:
-                        cache[resource_name] = d
-                del dirs[:]
-                continue  # leaf
-        if manifest_name in files:
-            resource_name = basename(d)
-            if resource_name not in resources:
-                resources.append(resource_name)
-                if cache is not None:
-                    cache[resource_name] = d
-            del dirs[:]
-            continue  # leaf
-        elif MANIFEST_FILE in files or PACKAGE_FILE in files:
-            # noop if manifest_name==MANIFEST_FILE, but a good
-            # optimization for stacks.
-            del dirs[:]
-            continue  # leaf
-        elif 'rospack_nosubdirs' in files:
-            del dirs[:]
-            continue   # leaf
-        # remove hidden dirs (esp. .svn/.git)
-        [dirs.remove(di) for di in dirs if di[0] == '.']
+    seen = set()
+    start = time.time()
+    crawler = Crawler(manifest_name, mtimes, tree, stats, prune, claims, owner)
+    for resource_name, d in crawler.crawl(path):
+        if resource_name not in seen:
+            seen.add(resource_name)
+            resources.append(resource_name)
+            if cache is not None:
+                cache[resource_name] = d
+            if found is not None:
+                found(resource_name, d)
+    crawler.stats.wall_time += time.time() - start
     return resources
 
 
+def _reverse_closure(names, dependents):
+    """
+    :param names: resource names, ``[str]``
+    :param dependents: resource names of the direct dependents of
+      each resource, ``{str: [str]}``
+    :returns: *names* and all resources depending on them directly or
+      indirectly, ``set``
+    """
+    closure = set(names)
+    stack = list(closure)
+    while stack:
+        for r in dependents.get(stack.pop(), ()):
+            if r not in closure:
+                closure.add(r)
+                stack.append(r)
+    return closure
+
+
+def _list_subtree(args):
+    manifest_name, path, record_mtimes, tree, prune, claims, owner = args
+    cache = {}
+    mtimes = {} if record_mtimes else None
+    stats = CrawlStats()
+    resources = list_by_path(manifest_name, path, cache, mtimes, tree, stats, prune, claims=claims,
+                             owner=owner)
+    return [(r, cache[r]) for r in resources], mtimes, stats
+
+
+def list_by_paths_parallel(manifest_name, paths, cache, mtimes=None, workers=4, tree=None, stats=None,
+                           prune=None):
+    """
+    Crawl *paths* concurrently and update *cache* with the same
+    precedence as calling :func:`list_by_path` on each path in reverse
+    order, i.e. resources in earlier paths shadow those in later
+    paths.  Each path as well as each top-level subdirectory of a path
+    is crawled on a thread pool.
+
+    :param manifest_name: MANIFEST_FILE or STACK_FILE, ``str``
+    :param paths: Ordered list of paths to list resources in, ``[str]``
+    :param cache: path cache to update. Maps resource name to directory path, ``{str: str}``
+    :param mtimes: (optional) updated with the modification times
+      of all crawled directories and parsed ``package.xml`` files,
+      ``{str: float}``
+    :param workers: number of threads, ``int``
+    :param tree: (optional) see :func:`list_by_path`, :class:`rospkg.crawler.CrawlTree`
+    :param stats: (optional) updated with the crawl counters of each
+      path, ``{str: rospkg.crawler.CrawlStats}``
+    :param prune: (optional) see :func:`list_by_path`, ``[str]``
+    """
+    # check the root of each path serially and split the remaining
+    # crawl into one unit per subtree.  The units of a path share the
+    # visited directories, which already include the root, so that
+    # symlinked aliases are only crawled through the first subtree
+    # which reaches them
+    entries = []
+    units = []
+    for path in paths:
+        start = time.time()
+        claims = VisitClaims()
+        crawler = Crawler(manifest_name, mtimes, tree, prune=prune, claims=claims, owner=-1)
+        abspath = os.path.abspath(path)
+        if crawler.find_install_space(abspath) is not None:
+            # not crawled recursively, so a single unit
+            resource_name, subtrees = None, [abspath]
+        else:
+            resource_name, subtrees = crawler.visit(abspath)
+        crawler.stats.wall_time += time.time() - start
+        root = [(resource_name, abspath)] if resource_name is not None else []
+        entries.append((path, root, len(units), len(subtrees), crawler.stats))
+        units.extend([(manifest_name, s, mtimes is not None, tree, prune, claims, i)
+                      for i, s in enumerate(subtrees)])
+
+    pool = ThreadPool(workers)
+    try:
+        results = pool.map(_list_subtree, units)
+    finally:
+        pool.close()
+        pool.join()
+
+    # merge in reverse order to get correct precedence
+    for path, root, start, count, path_stats in reversed(entries):
+        seen = set()
+        found = root + [r for found, _, _ in results[start:start + count] for r in found]
+        for resource_name, d in found:
+            if resource_name not in seen:
+                seen.add(resource_name)
+                cache[resource_name] = d
+        if stats is not None:
+            for _, _, unit_stats in results[start:start + count]:
+                path_stats.update(unit_stats)
+            stats.setdefault(path, CrawlStats()).update(path_stats)
+    if mtimes is not None:
+        for _, unit_mtimes, _ in results:
+            mtimes.update(unit_mtimes)
+
+
+class _ResourceList(object):
+    """
+    Stands in for the manager in worker processes of
+    :meth:`ManifestManager.load_manifests`, which cannot be pickled.
+    """
+
+    def __init__(self, names):
+        self._names = frozenset(names)
+
+    def list(self):
+        return self._names
+
+
+# _ResourceList of the worker process
+_worker_resources = None
+
+
+def _init_worker(names):
+    global _worker_resources
+    _worker_resources = _ResourceList(names)
+
+
+class _RecordCollector(object):
+    """
+    Stands in for the :class:`rospkg.cache.ManifestCache` in worker
+    processes of :meth:`ManifestManager.load_manifests`, collecting
+    the records to store in it.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def get(self, path):
+        return get_file_key(path), None
+
+    def put(self, path, key, record):
+        self.records.append((path, key, record))
+
+
+def _parse_manifests(args):
+    """
+    Parse a chunk of manifests in a worker process.
+
+    :returns: ``(name, manifest, seconds)`` for each parsed manifest
+      and ``(name, None, error)`` for each manifest which could not be
+      parsed, ``[(str, Manifest, float)]``, and the records to store
+      in the manifest cache, if used, ``[(str, (float, int), tuple)]``
+    """
+    manifest_name, lazy, use_cache, chunk = args
+    cache = _RecordCollector() if use_cache else None
+    results = []
+    for name, path in chunk:
+        start = time.time()
+        try:
+            manifest = parse_manifest_file(path, manifest_name, rospack=_worker_resources, lazy=lazy, cache=cache)
+        except Exception as e:
+            results.append((name, None, e))
+        else:
+            results.append((name, manifest, time.time() - start))
+    return results, cache.records if cache is not None else []
+
+
 class ManifestManager(object):
     """
     Base class implementation for :class:`RosPack` and
     :class:`RosStack`.  This class indexes resources on paths with
     where manifests denote the precense of the resource.  NOTE: for
     performance reasons, instances cache information and will not
-    reflect changes made on disk or to environment configuration.
+    reflect changes made on disk or to environment configuration,
+    unless *watch* is enabled.
+
+    If the disk cache is enabled, the resource locations are also
+    stored in :envvar:`ROS_HOME` and reused by later instances for the
+    same paths as long as none of the crawled directories changed.
     """
 
-    def __init__(self, manifest_name, ros_paths=None):
+    def __init__(self, manifest_name, ros_paths=None, disk_cache=None, crawl_workers=1,
+                 watch=False, lazy=False, shared_index=False, mapped_index=False, trace=None,
+                 prune=None, share_entries=False, lazy_manifests=False, prewarm_rosdep=False,
+                 compact_manifests=False):
         """
         ctor. subclasses are expected to use *manifest_name*
         to customize behavior of ManifestManager.
@@ -124,7 +364,79 @@ class ManifestManager(object):
         :param manifest_name: MANIFEST_FILE or STACK_FILE
         :param ros_paths: Ordered list of paths to search for
           resources. If `None` (default), use environment ROS path.
+        :param disk_cache: store resource locations and parsed
+          manifests in :envvar:`ROS_HOME`.  If `None` (default), enabled when
+          :envvar:`ROSPKG_DISK_CACHE` is set to ``1``.
+        :param crawl_workers: number of threads used to crawl
+          ``ros_paths``.  Crawling concurrently helps on networked
+          filesystems, where the crawl is bound by latency.
+        :param watch: keep resource locations and manifests current
+          using inotify (Linux only).  Changes on disk only cause the
+          affected subtrees to be crawled again.  If inotify is
+          not available or its watch limit is reached, a warning is
+          printed and changes are only picked up by :meth:`refresh`.
+        :param lazy: look up single resources in :meth:`get_path` by
+          crawling path entries one at a time, and each only up to
+          the resource, instead of crawling all ROS paths up front.
+        :param shared_index: take resource locations from the
+          :class:`rospkg.index.WorkspaceIndex` of ``ros_paths``, which
+          is crawled once for packages, stacks and catkin packages
+          alike and shared with other managers using it.
+        :param mapped_index: use the index published by
+          :meth:`publish_index` for ``ros_paths`` in :envvar:`ROS_HOME`,
+          if it is still valid.  Locations and direct dependencies are
+          then looked up in the memory-mapped index file, which is
+          shared by all processes on the host, instead of crawling.
+        :param trace: (optional) called as ``trace(event, key, value)``
+          with event ``'crawl'``, each crawled path and its
+          :class:`rospkg.crawler.CrawlStats`, ``'parse'``, each loaded
+          resource and the seconds spent parsing its manifest, and
+          ``'cache_hit'`` or ``'cache_miss'``, the cache
+          (``'manifests'``, ``'depends'`` or ``'rosdeps'``) and the
+          resource name.
+        :param prune: glob patterns of directories which are not
+          crawled, e.g. ``build`` or ``log`` trees.  Patterns
+          containing a path separator are matched against the
+          directory path, others against its name.  If `None`
+          (default), use :envvar:`ROSPKG_PRUNE`.
+        :param share_entries: reuse the crawl results of ROS path
+          entries which another manager created with *share_entries*
+          has crawled, e.g. an underlay shared by several overlays.
+          Only the remaining entries are crawled.
+        :param lazy_manifests: only extract the dependencies of
+          ``manifest.xml`` and ``stack.xml`` files when loading them.
+          The files are still parsed and their dependencies
+          validated, but the other fields of the returned
+          :class:`rospkg.manifest.LazyManifest` are extracted on
+          first access, by parsing the kept contents again.  This
+          saves time and memory when computing dependencies of many
+          resources.
+        :param prewarm_rosdep: start loading the rosdep database on a
+          background thread.  It is needed to split the dependencies
+          of catkin packages into ROS and system dependencies, which
+          otherwise happens on first access of ``depends`` or
+          ``rosdeps`` of such a manifest.
+        :param compact_manifests: reduce the memory used by loaded
+          manifests with :func:`rospkg.manifest.compact_manifest`.
+          Their ``depends`` and ``rosdeps`` are then tuples of shared
+          objects.
+
+        *watch* and *shared_index* replace the crawl, so they cannot
+        be combined with each other, nor with *crawl_workers*, *lazy*,
+        *mapped_index* or *share_entries*.  The disk cache then only
+        stores parsed manifests.
+
+        :raises: :exc:`ValueError` if options which cannot be combined
+          are given
         """
+        exclusive = [option for option, value in [('watch', watch), ('shared_index', shared_index)] if value]
+        if exclusive:
+            others = exclusive[1:] + [option for option, value in [
+                ('crawl_workers', crawl_workers > 1), ('lazy', lazy), ('mapped_index', mapped_index),
+                ('share_entries', share_entries)] if value]
+            if others:
+                raise ValueError('%s cannot be combined with %s' % (exclusive[0], ', '.join(others)))
+
         self._manifest_name = manifest_name
 
         if ros_paths is None:
@@ -132,53 +444,156 @@ class ManifestManager(object):
         else:
             self._ros_paths = ros_paths
 
+        if disk_cache is None:
+            disk_cache = os.environ.get(ROSPKG_DISK_CACHE, '') == '1'
+        self._disk_cache = disk_cache
+        self._manifest_cache = get_manifest_cache(manifest_name, self._ros_paths) if disk_cache else None
+        self._crawl_workers = crawl_workers
+        self._share_entries = share_entries
+        # path -> _EntryIndex used by the last crawl
+        self._shared_entries = {}
+        if prune is None:
+            prune = get_prune_patterns()
+        self._prune = list(prune)
+
         self._manifests = {}
         self._depends_cache = {}
         self._rosdeps_cache = {}
         self._location_cache = None
+        self._crawl_tree = None
+        self._crawl_stats = {}
         self._custom_cache = {}
+        self._watch = watch
+        self._watcher = None
+        self._lazy = lazy
+        self._lazy_manifests = lazy_manifests
+        if prewarm_rosdep:
+            prewarm_rosdep_view()
+        self._compact_manifests = compact_manifests
+        # resource locations of the path entries crawled by lazy lookups
+        self._entry_locations = {}
+        # unfinished crawls of those path entries
+        self._entry_crawls = {}
+        self._index = None
+        if shared_index:
+            self._index = WorkspaceIndex.get_instance(self._ros_paths, self._prune)
+        self._use_mapped_index = mapped_index
+        self._mapped_index = None
+        self._trace = trace
+        self._cache_stats = dict((cache, CacheStats()) for cache in ('manifests', 'depends', 'rosdeps'))
+        self._parse_times = {}
+        # guards the location cache, the watcher and manifest loading
+        self._lock = RLock()
+        # resource name -> _Flight of manifests being loaded
+        self._loading = {}
+        # names whose dependencies the current thread is computing
+        self._local = local()
+        # resource name -> (directory, mtimes of its manifest files)
+        self._manifest_mtimes = {}
+        # incremented whenever cached information is dropped
+        self._generation = 0
+        # (export tag, attribute) -> [(resource name, value)], built by get_exports()
+        self._export_index = None
+
+    # number of instances kept by get_instance() per class
+    max_instances = 16
 
     @classmethod
-    def get_instance(cls, ros_paths=None):
+    def get_instance(cls, ros_paths=None, **kwargs):
         """
         Reuse an existing instance for the specified ros_paths instead of creating a new one.
         Only works for subclasses, as the ManifestManager itself expects two args for the ctor.
 
+        Paths are compared after expanding ``~`` and resolving symlinks.  At most
+        :attr:`max_instances` instances are kept per class, dropping the least
+        recently used one.
+
         :param ros_paths: Ordered list of paths to search for
           resources. If `None` (default), use environment ROS path.
-        """
-        if not hasattr(cls, '_instances'):
-            # add class variable _instances to cls
-            cls._instances = {}
 
-        # generate instance_key from ros_paths variable
+        Additional keyword arguments, e.g. ``mapped_index=True`` and
+        ``share_entries=True``, are passed to the constructor of new
+        instances, which subclasses must accept then.  Instances
+        created with different keyword arguments are not shared.  Their
+        values must be hashable, except for lists.
+        """
         if ros_paths is None:
             ros_paths = get_ros_paths()
-        instance_key = str(tuple(ros_paths))
-
-        if instance_key not in cls._instances:
-            # create and cache new instance
-            cls._instances[instance_key] = cls(ros_paths)
-        return cls._instances[instance_key]
+        prune = get_prune_patterns()
+        options = tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in kwargs.items()))
+        instance_key = (tuple(_normalize_path(p) for p in ros_paths), tuple(prune), options)
+
+        with _instances_lock:
+            # not inherited from base classes
+            instances = cls.__dict__.get('_instances')
+            if instances is None:
+                instances = cls._instances = OrderedDict()
+            instance = instances.pop(instance_key, None)
+            if instance is None:
+                # nothing is crawled before first use
+                instance = cls(ros_paths, **kwargs)
+            # most recently used last
+            instances[instance_key] = instance
+            while len(instances) > cls.max_instances:
+                instances.popitem(last=False)
+        return instance
 
     def get_ros_paths(self):
         return self._ros_paths[:]
     ros_paths = property(get_ros_paths, doc="Get ROS paths of this instance")
 
+    def get_generation(self):
+        return self._generation
+    generation = property(get_generation, doc="Counter incremented whenever cached information is dropped")
+
     def get_manifest(self, name):
         """
         :raises: :exc:`InvalidManifest`
         """
-        if name in self._manifests:
-            return self._manifests[name]
-        else:
-            return self._load_manifest(name)
+        self._poll_watcher()
+        manifest = self._manifests.get(name)
+        if manifest is not None:
+            self._count('manifests', name, True)
+            return manifest
+        self._count('manifests', name, False)
+        return self._load_manifest(name)
+
+    def _poll_watcher(self):
+        """
+        :returns: names of resources whose cached information was dropped, ``set``
+        """
+        if self._watcher is None:
+            return set()
+        with self._lock:
+            if self._watcher is None:
+                return set()
+            try:
+                return self._watcher.poll()
+            except OSError as e:
+                self._stop_watching(e)
+                # changes may have been applied partially, crawl again
+                old = self._location_cache
+                self._location_cache = None
+                return self._invalidate_manifests(set(old or ()) | set(self._manifests))
+
+    def _stop_watching(self, e):
+        """
+        Fall back to a location cache which is not watched, e.g. when
+        the inotify watch limit is reached.  Changes are then only
+        picked up by :meth:`refresh`.
+        """
+        sys.stderr.write('cannot watch ROS paths (%s), call refresh() to pick up changes\n' % e)
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+        self._watch = False
 
-    def _update_location_cache(self):
-        global _cache_lock
+    def _update_location_cache(self, found=None):
         # ensure self._location_cache is not checked while it is being updated
         # (i.e. while it is not None, but also not completely populated)
-        with _cache_lock:
+        with self._lock:
+            if self._location_cache is not None:
+                self._poll_watcher()
             if self._location_cache is not None:
                 return
             # initialize cache
@@ -186,10 +601,325 @@ class ManifestManager(object):
             # nothing to search, #3680
             if not self._ros_paths:
                 return
+            if self._index is not None:
+                cache.update(self._index.get_locations(self._manifest_name))
+                self._crawl_stats = self._index.get_crawl_stats()
+                self._trace_crawl()
+                return
+            if self._use_mapped_index and not self._watch and self._open_mapped_index():
+                self._location_cache = self._mapped_index
+                return
+            if self._watch:
+                from .watch import LocationWatcher
+                try:
+                    self._watcher = LocationWatcher(self)
+                    self._watcher.start(cache)
+                    return
+                except OSError as e:
+                    self._stop_watching(e)
+                    cache.clear()
+            if self._disk_cache and self._read_disk_cache(cache):
+                return
+            self._crawl(cache, found=found)
+
+    def _crawl(self, cache, mtimes=None, found=None, force=False):
+        """
+        Crawl the ROS paths into *cache*, reusing the results of the
+        previous crawl for directories which did not change.
+
+        :param mtimes: if not ``None``, record modification times of
+          crawled paths, ``{str: float}``
+        :param found: (optional) see :func:`list_by_path`.  Only
+          called by serial crawls.
+        :param force: crawl path entries even if their results are
+          shared by other managers, ``bool``
+        """
+        crawl_time = time.time()
+        if mtimes is None and self._disk_cache:
+            mtimes = {}
+        tree = self._crawl_tree = CrawlTree(self._crawl_tree)
+        stats = self._crawl_stats = {}
+        if self._share_entries:
+            self._crawl_entries(cache, mtimes, tree, stats, found, force)
+        elif self._crawl_workers > 1:
+            list_by_paths_parallel(
+                self._manifest_name, self._ros_paths, cache, mtimes,
+                workers=self._crawl_workers, tree=tree, stats=stats, prune=self._prune)
+        else:
             # crawl paths using our own logic, in reverse order to get
             # correct precedence
             for path in reversed(self._ros_paths):
-                list_by_path(self._manifest_name, path, cache)
+                list_by_path(self._manifest_name, path, cache, mtimes, tree,
+                             stats.setdefault(path, CrawlStats()), self._prune, found)
+        self._trace_crawl()
+        if self._disk_cache and not has_racy_mtimes(mtimes, crawl_time):
+            write_location_cache(
+                get_location_cache_file(self._manifest_name, self._ros_paths),
+                self._get_disk_cache_header(), cache, mtimes)
+
+    def _crawl_entries(self, cache, mtimes, tree, stats, found, force):
+        """
+        Crawl the ROS paths into *cache* one entry at a time, reusing
+        the results of entries crawled by other managers with
+        *share_entries*.
+        """
+        shared = {}
+        # in reverse order to get correct precedence
+        for path in reversed(self._ros_paths):
+            key = (self._manifest_name, _normalize_path(path), tuple(self._prune))
+            with _entry_indexes_lock:
+                entry = _entry_indexes.get(key)
+            crawled = force or entry is None or (mtimes is not None and entry.mtimes is None)
+            if crawled:
+                entry = _EntryIndex(path, {}, {} if mtimes is not None else None)
+                if self._crawl_workers > 1:
+                    list_by_paths_parallel(
+                        self._manifest_name, [path], entry.locations, entry.mtimes,
+                        workers=self._crawl_workers, tree=tree, stats=stats, prune=self._prune)
+                else:
+                    list_by_path(self._manifest_name, path, entry.locations, entry.mtimes, tree,
+                                 stats.setdefault(path, CrawlStats()), self._prune, found)
+                with _entry_indexes_lock:
+                    _entry_indexes[key] = entry
+            locations = entry.get_locations(path)
+            if found is not None and not crawled:
+                for resource_name, d in locations.items():
+                    found(resource_name, d)
+            shared[path] = entry
+            cache.update(locations)
+            if mtimes is not None:
+                mtimes.update(entry.mtimes)
+        self._shared_entries = shared
+
+    def _open_mapped_index(self):
+        """
+        :returns: ``True`` if a valid published index was opened, ``bool``
+        """
+        try:
+            index = MappedIndex(get_mapped_index_file(self._manifest_name, self._ros_paths))
+        except (IOError, OSError, ValueError):
+            return False
+        if index.header != self._get_disk_cache_header() or not index.is_valid():
+            index.close()
+            return False
+        self._mapped_index = index
+        return True
+
+    def publish_index(self):
+        """
+        Crawl the ROS paths and publish resource locations and direct
+        dependencies into a memory-mapped index file in
+        :envvar:`ROS_HOME`.  Instances created with *mapped_index*
+        use the index until one of the crawled directories changes.  The
+        dependencies of a resource are used until its manifest changes.
+
+        :returns: ``True`` if the index was written.  The index is not
+          written if directories changed during the crawl, ``bool``
+        """
+        with self._lock:
+            crawl_time = time.time()
+            cache = {}
+            mtimes = {}
+            if self._ros_paths:
+                self._crawl(cache, mtimes, force=True)
+            self._location_cache = cache
+            self._mapped_index = None
+        if has_racy_mtimes(mtimes, crawl_time):
+            return False
+        depends = {}
+        manifest_keys = {}
+        for name, path in cache.items():
+            file_keys = self._get_manifest_file_keys(path)
+            # edits within the same timestamp tick would go unnoticed
+            if has_racy_mtimes(dict((i, key[0]) for i, key in enumerate(file_keys) if key), crawl_time):
+                continue
+            try:
+                depends[name] = [d.name for d in self.get_manifest(name).depends]
+            except (InvalidManifest, ResourceNotFound, IOError):
+                continue
+            manifest_keys[name] = repr(file_keys)
+        return write_mapped_index(
+            get_mapped_index_file(self._manifest_name, self._ros_paths),
+            self._get_disk_cache_header(), cache, depends, mtimes, manifest_keys)
+
+    def get_crawl_stats(self):
+        """
+        :returns: counters of the last crawl of each ROS path, e.g. how
+          many directories were visited and how many symlinked aliases
+          were skipped, ``{str: rospkg.crawler.CrawlStats}``
+        """
+        return dict(self._crawl_stats)
+
+    def get_cache_stats(self):
+        """
+        :returns: hit and miss counters of the ``'manifests'``,
+          ``'depends'`` and ``'rosdeps'`` caches, ``{str: CacheStats}``
+        """
+        return dict((cache, CacheStats(stats.hits, stats.misses))
+                    for cache, stats in self._cache_stats.items())
+
+    def get_parse_times(self):
+        """
+        :returns: seconds spent parsing the manifest of each loaded
+          resource, ``{str: float}``
+        """
+        return dict(self._parse_times)
+
+    def _trace_crawl(self):
+        if self._trace is not None:
+            for path in self._ros_paths:
+                if path in self._crawl_stats:
+                    self._trace('crawl', path, self._crawl_stats[path])
+
+    def _count(self, cache, name, hit):
+        stats = self._cache_stats[cache]
+        if hit:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+        if self._trace is not None:
+            self._trace('cache_hit' if hit else 'cache_miss', cache, name)
+
+    def refresh(self):
+        """
+        Pick up resources which were added, removed or moved on disk
+        since the last crawl.  Only directories whose modification
+        time changed are listed again; the results of the last crawl
+        are reused for all other directories.  Cached information is
+        only dropped for resources which moved or whose manifest was
+        modified, and for the resources depending on them.
+
+        :returns: names of resources whose cached information was dropped, ``set``
+        """
+        modified = self._modified_manifests()
+        with self._lock:
+            if self._location_cache is None:
+                # nothing crawled yet, except for path entries of lazy
+                # lookups, which will be crawled again using the tree
+                self._entry_locations = {}
+                self._entry_crawls = {}
+                return self._invalidate_manifests(modified)
+            if self._watcher is not None:
+                return self._poll_watcher() | self._invalidate_manifests(modified)
+            old = self._location_cache
+            cache = {}
+            self._mapped_index = None
+            if self._index is not None:
+                self._index.refresh()
+                cache.update(self._index.get_locations(self._manifest_name))
+                self._crawl_stats = self._index.get_crawl_stats()
+                self._trace_crawl()
+            elif self._ros_paths:
+                self._crawl(cache, force=True)
+            self._location_cache = cache
+        changed = set(name for name in set(old) | set(cache) if old.get(name) != cache.get(name))
+        return self._invalidate_manifests(changed | modified)
+
+    def _get_disk_cache_header(self):
+        header = {
+            'ROS_PACKAGE_PATH': os.pathsep.join(self._ros_paths),
+            'MANIFEST': self._manifest_name,
+        }
+        if self._prune:
+            header['PRUNE'] = os.pathsep.join(self._prune)
+        return header
+
+    def _read_disk_cache(self, cache):
+        """
+        Populate *cache* from the disk cache if it is still valid.
+
+        :returns: ``True`` if *cache* was populated, ``bool``
+        """
+        filename = get_location_cache_file(self._manifest_name, self._ros_paths)
+        try:
+            header, locations, mtimes = read_location_cache(filename)
+        except (IOError, OSError, ValueError):
+            return False
+        if header != self._get_disk_cache_header() or not is_location_cache_valid(mtimes):
+            return False
+        cache.update(locations)
+        return True
+
+    def _invalidate_manifests(self, names):
+        """
+        Drop cached manifests of *names*, and the cached dependency
+        closures and rosdeps of *names* and of all resources whose
+        closure includes any of them.
+
+        :returns: names of resources whose cached information was dropped, ``set``
+        """
+        names = set(names)
+        if not names:
+            return set()
+        with self._lock:
+            self._generation += 1
+            self._export_index = None
+            for name in names:
+                self._manifests.pop(name, None)
+                self._manifest_mtimes.pop(name, None)
+            stale = set(names)
+            for name, depends in list(self._depends_cache.items()):
+                if name in names or not names.isdisjoint(depends):
+                    del self._depends_cache[name]
+                    stale.add(name)
+            for name in list(self._rosdeps_cache):
+                # rosdeps are computed from the dependency closure
+                if name in stale or name not in self._depends_cache:
+                    del self._rosdeps_cache[name]
+                    stale.add(name)
+        return stale
+
+    def invalidate(self, name):
+        """
+        Drop the cached manifest of a resource, e.g. after it was
+        edited, along with the cached dependencies of all resources
+        depending on it.  Other cached manifests are kept.  Use
+        :meth:`refresh` to pick up resources which were added,
+        removed or moved.
+
+        :param name: resource name, ``str``
+        :returns: names of resources whose cached information was dropped, ``set``
+        """
+        return self._invalidate_manifests([name])
+
+    def invalidate_path(self, prefix):
+        """
+        Like :meth:`invalidate`, for all resources located below *prefix*.
+
+        :param prefix: directory path, ``str``
+        :returns: names of resources whose cached information was dropped, ``set``
+        """
+        prefix = os.path.abspath(prefix)
+        with self._lock:
+            locations = [(name, d) for name, (d, _) in self._manifest_mtimes.items()]
+            if self._location_cache is not None:
+                locations.extend(self._location_cache.items())
+            for entry_locations in self._entry_locations.values():
+                locations.extend(entry_locations.items())
+        names = set(name for name, d in locations
+                    if d == prefix or d.startswith(prefix.rstrip(os.sep) + os.sep))
+        return self._invalidate_manifests(names)
+
+    def _get_manifest_file_keys(self, d):
+        return tuple(get_file_key(os.path.join(d, f)) for f in (self._manifest_name, PACKAGE_FILE))
+
+    def _get_manifest_mtimes(self, d):
+        return tuple(get_mtime(os.path.join(d, f)) for f in (self._manifest_name, PACKAGE_FILE))
+
+    def _modified_manifests(self):
+        """
+        :returns: names of loaded resources whose manifest changed on disk, ``set``
+        """
+        return set(name for name, (d, mtimes) in list(self._manifest_mtimes.items())
+                   if self._get_manifest_mtimes(d) != mtimes)
+
+    def close(self):
+        """
+        Stop watching the filesystem, if enabled.
+        """
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
 
     def list(self):
         """
@@ -200,12 +930,56 @@ class ManifestManager(object):
         self._update_location_cache()
         return self._location_cache.keys()
 
+    def _lookup(self, name):
+        """
+        Locate a single resource without crawling all ROS paths.  Path
+        entries are crawled in order of precedence, each only up to
+        the first resource with that name.  The crawl of an entry is
+        resumed by later lookups, so every entry is crawled at most
+        once.
+
+        :returns: directory of resource, or ``None``, ``str``
+        """
+        with self._lock:
+            if self._location_cache is not None:
+                return self._location_cache.get(name)
+            if self._crawl_tree is None:
+                self._crawl_tree = CrawlTree()
+            for i, path in enumerate(self._ros_paths):
+                locations = self._entry_locations.get(i)
+                if locations is None:
+                    locations = self._entry_locations[i] = {}
+                    crawler = Crawler(self._manifest_name, tree=self._crawl_tree, prune=self._prune)
+                    self._entry_crawls[i] = crawler.crawl(path)
+                if name in locations:
+                    return locations[name]
+                crawl = self._entry_crawls.get(i)
+                if crawl is not None:
+                    for resource_name, d in crawl:
+                        # the first resource found in crawl order wins
+                        if resource_name not in locations:
+                            locations[resource_name] = d
+                            if resource_name == name:
+                                return d
+                    del self._entry_crawls[i]
+            # all path entries have been crawled now
+            cache = self._location_cache = {}
+            for i in reversed(range(len(self._ros_paths))):
+                cache.update(self._entry_locations[i])
+            self._entry_locations = {}
+            return None
+
     def get_path(self, name):
         """
         :param name: package name, ``str``
         :returns: filesystem path of package
         :raises: :exc:`ResourceNotFound`
         """
+        if self._lazy and self._location_cache is None and not self._watch and self._index is None:
+            d = self._lookup(name)
+            if d is None:
+                raise ResourceNotFound(name, ros_paths=self._ros_paths)
+            return d
         self._update_location_cache()
         if name not in self._location_cache:
             raise ResourceNotFound(name, ros_paths=self._ros_paths)
@@ -214,11 +988,215 @@ class ManifestManager(object):
 
     def _load_manifest(self, name):
         """
+        Load a manifest, once for all threads requesting it at the
+        same time.
+
         :raises: :exc:`ResourceNotFound`
         """
-        retval = self._manifests[name] = parse_manifest_file(self.get_path(name), self._manifest_name, rospack=self)
+        with self._lock:
+            manifest = self._manifests.get(name)
+            if manifest is not None:
+                return manifest
+            flight = self._loading.get(name)
+            if flight is not None:
+                loading = False
+            else:
+                flight = self._loading[name] = _Flight()
+                loading = True
+        if not loading:
+            return flight.wait()
+        generation = self._generation
+        try:
+            path = self.get_path(name)
+            mtimes = self._get_manifest_mtimes(path)
+            start = time.time()
+            retval = parse_manifest_file(path, self._manifest_name, rospack=self, lazy=self._lazy_manifests,
+                                         cache=self._manifest_cache)
+            if self._compact_manifests:
+                compact_manifest(retval)
+        except Exception as e:
+            flight.set(error=e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(name, None)
+        with self._lock:
+            # not cached if invalidated while loading
+            if self._generation == generation:
+                self._manifests[name] = retval
+                self._manifest_mtimes[name] = (path, mtimes)
+        flight.set(retval)
+        elapsed = self._parse_times[name] = time.time() - start
+        if self._trace is not None:
+            self._trace('parse', name, elapsed)
         return retval
 
+    def load_manifests(self, names=None, workers=None):
+        """
+        Load the manifests of many resources at once, parsing them in
+        *workers* processes, e.g. before computing the reverse
+        dependencies of all resources.  Manifests which are already
+        loaded are kept.  Errors are not raised but returned, and
+        raised again by :meth:`get_manifest`.
+
+        :param names: resource names.  If `None` (default), all resources, ``[str]``
+        :param workers: number of processes.  If `None` (default), the
+          number of CPUs.  With ``1``, manifests are loaded in this process.
+        :returns: errors of resources whose manifest could not be loaded, ``{str: Exception}``
+        """
+        if names is None:
+            names = self.list()
+        if workers is None:
+            workers = cpu_count()
+        errors = {}
+        todo = []
+        for name in names:
+            if name in self._manifests:
+                continue
+            try:
+                path = self.get_path(name)
+            except ResourceNotFound as e:
+                errors[name] = e
+                continue
+            todo.append((name, path, self._get_manifest_mtimes(path)))
+        if workers <= 1 or len(todo) < 2:
+            serial, todo = todo, []
+        elif self._manifest_cache is not None:
+            # manifests in the cache are not worth sending to workers
+            cached = [self._is_manifest_cached(path) for _, path, _ in todo]
+            serial = [t for t, c in zip(todo, cached) if c]
+            todo = [t for t, c in zip(todo, cached) if not c]
+        else:
+            serial = []
+        for name, _, _ in serial:
+            try:
+                self._load_manifest(name)
+            except Exception as e:
+                errors[name] = e
+        if not todo:
+            return errors
+
+        # a few chunks per worker to balance the load
+        size = max(1, len(todo) // (workers * 4))
+        chunks = [[(name, path) for name, path, _ in todo[i:i + size]] for i in range(0, len(todo), size)]
+        generation = self._generation
+        pool = Pool(min(workers, len(chunks)), _init_worker, (list(self.list()),))
+        try:
+            use_cache = self._manifest_cache is not None
+            results = pool.map(_parse_manifests, [(self._manifest_name, self._lazy_manifests, use_cache, c)
+                                                  for c in chunks])
+        finally:
+            pool.close()
+            pool.join()
+        for _, records in results:
+            for path, key, record in records:
+                self._manifest_cache.put(path, key, record)
+        results = [r for r, _ in results]
+
+        mtimes = dict((name, (path, m)) for name, path, m in todo)
+        parsed = []
+        with self._lock:
+            for name, manifest, value in [r for chunk in results for r in chunk]:
+                if manifest is None:
+                    errors[name] = value
+                # not cached if invalidated while loading
+                elif self._generation == generation and name not in self._manifests:
+                    if self._compact_manifests:
+                        # flyweights are shared within this process
+                        compact_manifest(manifest)
+                    self._manifests[name] = manifest
+                    self._manifest_mtimes[name] = mtimes[name]
+                    self._parse_times[name] = value
+                    parsed.append((name, value))
+        if self._trace is not None:
+            for name, elapsed in parsed:
+                self._trace('parse', name, elapsed)
+        return errors
+
+    def get_exports(self, tag, attr, depends_on=None, workers=1):
+        """
+        Get the values of an export attribute of all resources, e.g.
+        ``get_exports('nodelet', 'plugin')``.  ``${prefix}`` in values
+        is replaced with the directory of the resource.  On first use
+        the exports of all resources are indexed in one pass, which is
+        kept until manifests are invalidated.
+
+        NOTE: this does *not* raise :exc:`rospkg.InvalidManifest` if
+        there are invalid manifests found.
+
+        :param tag: name of the export tag, ``str``
+        :param attr: name of the attribute of the export tag, ``str``
+        :param depends_on: if set, only include this resource and the
+          resources which directly depend on it, ``str``
+        :param workers: number of processes loading the manifests
+          when building the index, see :meth:`load_manifests`
+        :returns: resource names and values, sorted by resource name, ``[(str, str)]``
+        """
+        self._poll_watcher()
+        index = self._export_index
+        if index is None:
+            index = self._index_exports(workers)
+        exports = index.get((tag, attr), [])
+        if depends_on is not None:
+            names = set(self.get_depends_on(depends_on, implicit=False))
+            names.add(depends_on)
+            exports = [(name, value) for name, value in exports if name in names]
+        return list(exports)
+
+    def _index_exports(self, workers):
+        """
+        Index the exports of all resources in self._export_index.
+
+        :returns: index, ``{(str, str): [(str, str)]}``
+        """
+        generation = self._generation
+        self.load_manifests(workers=workers)
+        index = {}
+        for name in sorted(self.list()):
+            try:
+                manifest = self.get_manifest(name)
+                # lazy manifests parse their exports on first access
+                exports = manifest.exports
+            except (InvalidManifest, ResourceNotFound):
+                # robust to bad packages
+                continue
+            prefix = os.path.dirname(manifest.filename)
+            for export in exports:
+                for attr, value in export.attrs.items():
+                    index.setdefault((export.tag, attr), []).append((name, value.replace('${prefix}', prefix)))
+        with self._lock:
+            # not cached if invalidated while indexing
+            if self._generation == generation:
+                self._export_index = index
+        return index
+
+    def _is_manifest_cached(self, path):
+        for manifest_name in (self._manifest_name, PACKAGE_FILE):
+            filename = os.path.join(path, manifest_name)
+            if os.path.isfile(filename):
+                return self._manifest_cache.get(filename)[1] is not None
+        return False
+
+    def _get_in_progress(self, cache):
+        """
+        :returns: names whose entry in *cache* the current thread is
+          computing, ``set``
+        """
+        in_progress = getattr(self._local, cache, None)
+        if in_progress is None:
+            in_progress = set()
+            setattr(self._local, cache, in_progress)
+        return in_progress
+
+    def _get_direct_depends(self, name):
+        if self._mapped_index is not None and name in self._mapped_index:
+            # manifests may have been edited since the index was published
+            manifest_key = repr(self._get_manifest_file_keys(self._mapped_index[name]))
+            names = self._mapped_index.get_depends(name, manifest_key)
+            if names is not None:
+                return names
+        return [d.name for d in self.get_manifest(name).depends]
+
     def get_depends(self, name, implicit=True):
         """
         Get dependencies of a resource.  If implicit is ``True``, this
@@ -232,40 +1210,52 @@ class ManifestManager(object):
           dependencies have an invalid manifest.
         """
         if not implicit:
-            m = self.get_manifest(name)
-            return [d.name for d in m.depends]
+            return self._get_direct_depends(name)
         else:
-            if name in self._depends_cache:
-                return self._depends_cache[name]
-
-            # assign key before recursive call to prevent infinite case
-            self._depends_cache[name] = s = set()
-
-            depends_unavailable = set()
-
-            # take the union of all dependencies
-            names = None
+            self._poll_watcher()
+            s = self._depends_cache.get(name)
+            if s is not None:
+                self._count('depends', name, True)
+                return s
+
+            # mark name before recursive call to prevent infinite case.
+            # Only complete results are cached, so that other threads
+            # never see a partial result.
+            in_progress = self._get_in_progress('depends')
+            if name in in_progress:
+                return []
+            self._count('depends', name, False)
+            generation = self._generation
+            in_progress.add(name)
             try:
-                names = [p.name for p in self.get_manifest(name).depends]
-            except ResourceNotFound as e:
-                del self._depends_cache[name]
-                e.deps_unavailable.add(name)
-                raise e
+                s = set()
+                depends_unavailable = set()
 
-            for p in names:
-                deps = None
+                # take the union of all dependencies
+                names = None
                 try:
-                    deps = self.get_depends(p, implicit)
+                    names = self._get_direct_depends(name)
                 except ResourceNotFound as e:
-                    deps = e.get_depends()
-                    depends_unavailable.update(e.deps_unavailable)
-                if deps:
-                    s.update(deps)
+                    e.deps_unavailable.add(name)
+                    raise e
+
+                for p in names:
+                    deps = None
+                    try:
+                        deps = self.get_depends(p, implicit)
+                    except ResourceNotFound as e:
+                        deps = e.get_depends()
+                        depends_unavailable.update(e.deps_unavailable)
+                    if deps:
+                        s.update(deps)
+            finally:
+                in_progress.discard(name)
             # add in our own deps
             s.update(names)
-            # cache the return value as a list
+            # cache the return value as a list, unless invalidated meanwhile
             s = list(s)
-            self._depends_cache[name] = s
+            if self._generation == generation:
+                self._depends_cache[name] = s
             if 0 < len(depends_unavailable) or 0 == len(s):
                 raise ResourceNotFound(
                     "Pkg(s) {0} not available on your environment.\n"
@@ -297,8 +1287,7 @@ class ManifestManager(object):
                 if r == name:
                     continue
                 try:
-                    m = self.get_manifest(r)
-                    if any(d for d in m.depends if d.name == name):
+                    if name in self._get_direct_depends(r):
                         depends_on.append(r)
                 except InvalidManifest:
                     # robust to bad packages
@@ -308,24 +1297,33 @@ class ManifestManager(object):
                     pass
         else:
             # Computing implicit dependencies requires examining the
-            # dependencies of all packages.  As we already implement
-            # this logic in get_depends(), we simply reuse it here for
-            # the reverse calculation.  This enables us to use the
-            # same dependency cache that get_depends() uses.  The
-            # efficiency is roughly the same due to the caching.
-            for r in self.list():
-                if r == name:
-                    continue
+            # dependencies of all packages.  Instead of computing the
+            # implicit dependencies of each package, the direct
+            # dependencies are collected once and walked in reverse.
+            # Like get_depends() raises for them, packages depending
+            # on missing packages or invalid manifests are skipped.
+            resources = list(self.list())
+            known = set(resources)
+            dependents = {}
+            bad = []
+            for r in resources:
                 try:
-                    depends = self.get_depends(r, implicit=True)
-                    if name in depends:
-                        depends_on.append(r)
+                    names = self._get_direct_depends(r)
                 except InvalidManifest:
                     # robust to bad packages
-                    pass
+                    bad.append(r)
+                    continue
                 except ResourceNotFound:
                     # robust to bad packages
-                    pass
+                    bad.append(r)
+                    continue
+                for p in names:
+                    dependents.setdefault(p, []).append(r)
+                    if p not in known:
+                        bad.append(p)
+            skipped = _reverse_closure(bad, dependents)
+            found = _reverse_closure([name], dependents)
+            depends_on = [r for r in resources if r != name and r in found and r not in skipped]
         return depends_on
 
     def get_custom_cache(self, key, default=None):
@@ -344,7 +1342,8 @@ class RosPack(ManifestManager):
     NOTE 1: for performance reasons, RosPack caches information about
     packages.
 
-    NOTE 2: RosPack is not thread-safe.
+    NOTE 2: RosPack is thread-safe. Threads requesting the same
+    manifest at the same time share a single parse.
 
     Example::
       from rospkg import RosPack
@@ -357,13 +1356,15 @@ class RosPack(ManifestManager):
 
     LICENSE_NOT_FOUND= "license_not_found"
 
-    def __init__(self, ros_paths=None):
+    def __init__(self, ros_paths=None, **kwargs):
         """
         :param ros_paths: Ordered list of paths to search for
           resources. If `None` (default), use environment ROS path.
+
+        Additional keyword arguments are passed to :class:`ManifestManager`.
         """
         super(RosPack, self).__init__(MANIFEST_FILE,
-                                      ros_paths)
+                                      ros_paths, **kwargs)
         self._rosdeps_cache = {}
 
     def get_rosdeps(self, package, implicit=True):
@@ -389,18 +1390,20 @@ class RosPack(ManifestManager):
         :param package: package name, ``str``
         :returns: list of rosdeps, ``[str]``
         """
-        if package in self._rosdeps_cache:
-            return self._rosdeps_cache[package]
-
-        # set the key before recursive call to prevent infinite case
-        self._rosdeps_cache[package] = s = set()
+        self._poll_watcher()
+        s = self._rosdeps_cache.get(package)
+        if s is not None:
+            self._count('rosdeps', package, True)
+            return s
+        self._count('rosdeps', package, False)
+        generation = self._generation
+        s = set()
 
         # take the union of all dependencies
         packages = []
         try:
             packages = self.get_depends(package, implicit=True)
         except ResourceNotFound as e:
-            del self._rosdeps_cache[package]
             packages = e.get_depends()
         if packages:
             for p in packages:
@@ -411,9 +1414,10 @@ class RosPack(ManifestManager):
         # add in our own deps
         m = self.get_manifest(package)
         s.update([d.name for d in m.rosdeps])
-        # cache the return value as a list
+        # cache the return value as a list, unless invalidated meanwhile
         s = list(s)
-        self._rosdeps_cache[package] = s
+        if self._generation == generation:
+            self._rosdeps_cache[package] = s
         return s
 
     def stack_of(self, package):
@@ -535,22 +1539,25 @@ class RosStack(ManifestManager):
     NOTE 1: for performance reasons, RosStack caches information about
     stacks.
 
-    NOTE 2: RosStack is not thread-safe.
+    NOTE 2: RosStack is thread-safe. Threads requesting the same
+    manifest at the same time share a single parse.
     """
 
-    def __init__(self, ros_paths=None):
+    def __init__(self, ros_paths=None, **kwargs):
         """
         :param ros_paths: Ordered list of paths to search for
           resources. If `None` (default), use environment ROS path.
+
+        Additional keyword arguments are passed to :class:`ManifestManager`.
         """
-        super(RosStack, self).__init__(STACK_FILE, ros_paths)
+        super(RosStack, self).__init__(STACK_FILE, ros_paths, **kwargs)
 
     def packages_of(self, stack):
         """
         :returns: name of packages that are part of stack, ``[str]``
         :raises: :exc:`ResourceNotFound` If stack cannot be located
         """
-        return list_by_path(MANIFEST_FILE, self.get_path(stack), {})
+        return list_by_path(MANIFEST_FILE, self.get_path(stack), None, prune=self._prune)
 
     def get_stack_version(self, stack):
         """
@@ -43,7 +43,7 @@ def get_distro_name_from_roscore():
     For any newer ROS distro the information is provided
     in the ROS_DISTRO environment variable.
     '''
-    rospack = RosPack()
+    rospack = RosPack(lazy=True)
     # there's some chance that the location of this file changes in the future
     try:
         roslaunch_dir = rospack.get_path('roslaunch')
@@ -99,13 +99,13 @@ def main():
         printer(distro_name)
         sys.exit(0)
 
-    rosstack = RosStack()
+    rosstack = RosStack(lazy=True)
     try:
         version = rosstack.get_stack_version(args.package)
     except ResourceNotFound as e:
         try:
             # hack to make it work with wet packages
-            mm = ManifestManager(PACKAGE_FILE)
+            mm = ManifestManager(PACKAGE_FILE, lazy=True)
             path = mm.get_path(args.package)
             package_manifest = os.path.join(path, 'package.xml')
             if os.path.exists(package_manifest):
@@ -36,7 +36,8 @@ Library for processing stack.xml created post-catkin
 
 import collections
 import os
-import xml.dom.minidom as dom
+
+from .manifest import _get_attrs, _get_elements, _get_nodes_by_name, _get_tag, _get_text, _get_xml, _parse_xml
 
 # as defined on http://ros.org/doc/fuerte/api/catkin/html/stack_xml.html
 REQUIRED = ['name', 'version', 'description', 'author', 'maintainer', 'license', 'copyright']
@@ -52,10 +53,6 @@ class InvalidStack(Exception):
     pass
 
 
-def _get_nodes_by_name(n, name):
-    return [t for t in n.childNodes if t.nodeType == t.ELEMENT_NODE and t.tagName == name]
-
-
 def _check_optional(name, allowXHTML=False):
     """
     Validator for optional elements.
@@ -68,8 +65,8 @@ def _check_optional(name, allowXHTML=False):
             raise InvalidStack("Invalid stack.xml file [%s]: must have at most one '%s' element" % (filename, name))
         if n:
             if allowXHTML:
-                return ''.join([x.toxml() for x in n[0].childNodes])
-            return _get_text(n[0].childNodes).strip()
+                return _get_xml(n[0])
+            return _get_text(n[0]).strip()
     return check
 
 
@@ -84,8 +81,8 @@ def _check_required(name, allowXHTML=False):
         if len(n) != 1:
             raise InvalidStack("Invalid stack.xml file [%s]: must have exactly one '%s' element" % (filename, name))
         if allowXHTML:
-            return ''.join([x.toxml() for x in n[0].childNodes])
-        return _get_text(n[0].childNodes).strip()
+            return _get_xml(n[0])
+        return _get_text(n[0]).strip()
     return check
 
 
@@ -95,7 +92,7 @@ def _check_depends(n, key, filename):
     :raise: :exc:`InvalidStack` If validation fails
     """
     nodes = _get_nodes_by_name(n, key)
-    return set([_get_text(n.childNodes).strip() for n in nodes])
+    return set([_get_text(n).strip() for n in nodes])
 
 
 def _build_listed_attributes(n, key, object_type):
@@ -106,24 +103,15 @@ def _build_listed_attributes(n, key, object_type):
     members = set()
     for node in _get_nodes_by_name(n, key):
         # The first field is always supposed to be the value
+        attrs = _get_attrs(node)
         attribute_dict = {}
         for field in object_type._fields:
-            try:
-                attribute_dict[field] = node.getAttribute(field)
-            except:
-                pass
-        attribute_dict[object_type._fields[0]] = _get_text(node.childNodes).strip()
+            attribute_dict[field] = attrs.get(field, '')
+        attribute_dict[object_type._fields[0]] = _get_text(node).strip()
         members.add(object_type(**attribute_dict))
     return members
 
 
-def _attrs(node):
-    attrs = {}
-    for k in node.attributes.keys():
-        attrs[k] = node.attributes.get(k).value
-    return attrs
-
-
 def _check(name):
     """
     Generic validator for text-based tags.
@@ -166,13 +154,6 @@ class Stack(object):
         self.unknown_tags = []
 
 
-def _get_text(nodes):
-    """
-    DOM utility routine for getting contents of text nodes
-    """
-    return "".join([n.data for n in nodes if n.nodeType == n.TEXT_NODE])
-
-
 def parse_stack_file(stack_path):
     """
     Parse stack file.
@@ -204,7 +185,7 @@ def parse_stack(string, filename):
         new_tuples[key] = collections.namedtuple(key, members)
 
     try:
-        d = dom.parseString(string)
+        d = _parse_xml(string)
     except Exception as e:
         raise InvalidStack("[%s] invalid XML: %s" % (filename, e))
 
@@ -223,7 +204,7 @@ def parse_stack(string, filename):
 
     try:
         tag = _get_nodes_by_name(p, 'description')[0]
-        s.description_brief = tag.getAttribute('brief') or ''
+        s.description_brief = _get_attrs(tag).get('brief') or ''
     except:
         # means that 'description' tag is missing
         pass
@@ -235,24 +216,24 @@ def parse_stack(string, filename):
 
     try:
         tag = _get_nodes_by_name(p, 'review')[0]
-        s.review_status = tag.getAttribute('status') or ''
+        s.review_status = _get_attrs(tag).get('status') or ''
     except:
         pass  # stack.xml is missing optional 'review status' tag
 
     try:
         tag = _get_nodes_by_name(p, 'review')[0]
-        s.review_notes = tag.getAttribute('notes') or ''
+        s.review_notes = _get_attrs(tag).get('notes') or ''
     except:
         pass  # stack.xml is missing optional 'review notes' tag
 
     try:
         tag = _get_nodes_by_name(p, 'build_type')[0]
-        s.build_type_file = tag.getAttribute('file') or ''
+        s.build_type_file = _get_attrs(tag).get('file') or ''
     except:
         pass  # stack.xml is missing optional 'build_type file' tag
 
     # store unrecognized tags
-    s.unknown_tags = [e.nodeName for e in p.childNodes if e.nodeType == e.ELEMENT_NODE and e.tagName not in VALID]
+    s.unknown_tags = [_get_tag(e) for e in _get_elements(p) if _get_tag(e) not in VALID]
     if s.unknown_tags:
         raise InvalidStack("stack.xml [%s] must be cleaned up from %s" % (filename, str(s.unknown_tags)))
     return s
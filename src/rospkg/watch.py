@@ -0,0 +1,366 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Keep the resource locations of a :class:`rospkg.rospack.ManifestManager`
+current using Linux inotify.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+
+from .crawler import _MARKERS, _scandir, Crawler
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | \
+    IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _first_in_crawl_order(dirs):
+    """
+    :param dirs: directories below the same path entry, ``[str]``
+    :returns: the directory in *dirs* which a crawl of the path entry
+      reaches first, ``str``
+    """
+    first = dirs[0]
+    for d in dirs[1:]:
+        if _crawls_before(d, first):
+            first = d
+    return first
+
+
+def _crawls_before(a, b):
+    """
+    The crawl is depth-first, visiting subdirectories in listing
+    order, so the order of two directories is the listing order of
+    their branches below the deepest common ancestor.
+
+    :returns: ``True`` if a crawl reaches directory *a* before *b*, ``bool``
+    """
+    parts_a = a.split(os.sep)
+    parts_b = b.split(os.sep)
+    i = 0
+    while i < len(parts_a) and i < len(parts_b) and parts_a[i] == parts_b[i]:
+        i += 1
+    if i == len(parts_a) or i == len(parts_b):
+        # ancestors are reached first
+        return len(parts_a) < len(parts_b)
+    try:
+        names = [entry.name for entry in _scandir(os.sep.join(parts_a[:i]) or os.sep)]
+    except OSError:
+        return a < b
+    if parts_a[i] not in names or parts_b[i] not in names:
+        return a < b
+    return names.index(parts_a[i]) < names.index(parts_b[i])
+
+
+class Inotify(object):
+    """
+    Minimal non-blocking inotify binding using :mod:`ctypes`.
+    """
+
+    def __init__(self):
+        """
+        :raises: :exc:`OSError` If inotify is not available
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, 'inotify_init1: %s' % os.strerror(e))
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        """
+        :returns: watch descriptor, ``int``
+        :raises: :exc:`OSError`
+        """
+        if not isinstance(path, bytes):
+            path = path.encode(sys.getfilesystemencoding())
+        wd = self._libc.inotify_add_watch(self.fd, path, mask)
+        if wd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, 'inotify_add_watch(%s): %s' % (path, os.strerror(e)))
+        return wd
+
+    def rm_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """
+        Read all pending events without blocking.
+
+        :returns: list of watch descriptor, mask and name, ``[(int, int, str)]``
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return events
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                events.append((wd, mask, name.decode(sys.getfilesystemencoding())))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _WatchingCrawler(Crawler):
+
+    def __init__(self, manifest_name, watcher, entry, prune=None):
+        super(_WatchingCrawler, self).__init__(manifest_name, prune=prune)
+        self._watcher = watcher
+        self._entry = entry
+
+    def visit(self, d):
+        # watch before listing, so that no change goes unnoticed
+        self._watcher._watch(d, self._entry)
+        return super(_WatchingCrawler, self).visit(d)
+
+
+class LocationWatcher(object):
+    """
+    Crawls the ROS paths of a manager, watches every crawled directory
+    and applies changes to the manager's location cache when
+    :meth:`poll` is called.  Only the subtrees affected by an event are
+    crawled again, and only the manifests of the affected resources are
+    dropped from the manager's caches.
+    """
+
+    def __init__(self, manager):
+        """
+        :param manager: :class:`rospkg.rospack.ManifestManager` to keep current
+        :raises: :exc:`OSError` If inotify is not available
+        """
+        self._manager = manager
+        self._inotify = Inotify()
+        self._wd_dirs = {}
+        self._dir_wds = {}
+        # path entry indices through which a directory was crawled
+        self._dir_entries = {}
+        # resource name -> set of (path entry index, directory)
+        self._candidates = {}
+
+    def close(self):
+        self._inotify.close()
+
+    def _watch(self, d, entry):
+        self._dir_entries.setdefault(d, set()).add(entry)
+        if d in self._dir_wds:
+            return
+        try:
+            wd = self._inotify.add_watch(d)
+        except OSError as e:
+            if e.errno in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return
+            raise
+        self._dir_wds[d] = wd
+        self._wd_dirs.setdefault(wd, set()).add(d)
+
+    def _unwatch(self, d):
+        self._dir_entries.pop(d, None)
+        wd = self._dir_wds.pop(d, None)
+        if wd is None:
+            return
+        dirs = self._wd_dirs.get(wd)
+        dirs.discard(d)
+        if not dirs:
+            del self._wd_dirs[wd]
+            self._inotify.rm_watch(wd)
+
+    def _crawl(self, entry, path):
+        """
+        :returns: resources found below *path*, ``[(str, str)]``
+        """
+        crawler = _WatchingCrawler(self._manager._manifest_name, self, entry, self._manager._prune)
+        found = list(crawler.crawl(path))
+        for resource_name, d in found:
+            self._candidates.setdefault(resource_name, set()).add((entry, d))
+        return found
+
+    def start(self, cache):
+        """
+        Crawl all ROS paths of the manager and populate *cache*.
+
+        :param cache: location cache to populate, ``{str: str}``
+        """
+        ros_paths = self._manager._ros_paths
+        # crawl in reverse order to get correct precedence
+        for entry in reversed(range(len(ros_paths))):
+            seen = set()
+            for resource_name, d in self._crawl(entry, ros_paths[entry]):
+                if resource_name not in seen:
+                    seen.add(resource_name)
+                    cache[resource_name] = d
+
+    def _remove_subtree(self, path, keep_root=False):
+        """
+        Forget all watches and resources at or below *path*.
+
+        :returns: names of removed resources, ``set``
+        """
+        prefix = path + os.sep
+        for d in [d for d in self._dir_wds if d.startswith(prefix) or d == path]:
+            if not (keep_root and d == path):
+                self._unwatch(d)
+        removed = set()
+        for resource_name, candidates in self._candidates.items():
+            gone = set(c for c in candidates if c[1] == path or c[1].startswith(prefix))
+            if gone:
+                candidates.difference_update(gone)
+                removed.add(resource_name)
+        return removed
+
+    def _recrawl(self, path):
+        """
+        Crawl *path* again for every path entry it was crawled through.
+
+        :returns: names of affected resources, ``set``
+        """
+        entries = self._dir_entries.get(path, set()).copy()
+        affected = self._remove_subtree(path, keep_root=True)
+        for entry in entries:
+            affected.update(resource_name for resource_name, _ in self._crawl(entry, path))
+        return affected
+
+    def _crawl_new_dir(self, d, path):
+        """
+        Crawl *path*, which appeared in the crawled directory *d*,
+        unless *d* is a leaf of the crawl.
+
+        :returns: names of affected resources, ``set``
+        """
+        _, subdirs = Crawler(self._manager._manifest_name, prune=self._manager._prune).visit(d)
+        if path not in subdirs:
+            return set()
+        affected = set()
+        for entry in self._dir_entries.get(d, set()).copy():
+            affected.update(resource_name for resource_name, _ in self._crawl(entry, path))
+        return affected
+
+    def _update_cache(self, names):
+        cache = self._manager._location_cache
+        for resource_name in names:
+            candidates = self._candidates.get(resource_name)
+            if not candidates:
+                self._candidates.pop(resource_name, None)
+                cache.pop(resource_name, None)
+                continue
+            # earlier path entries have precedence, and within a path
+            # entry the first candidate a crawl reaches
+            best = min(entry for entry, _ in candidates)
+            cache[resource_name] = _first_in_crawl_order([d for entry, d in candidates if entry == best])
+
+    def poll(self):
+        """
+        Apply pending filesystem changes.
+
+        :returns: names of resources whose location or manifest may
+          have changed, and of resources depending on them, ``set``
+        """
+        events = self._inotify.read_events()
+        if not events:
+            return set()
+        affected = set()
+        recrawl = set()
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # events were lost, start over
+                return self._restart()
+            dirs = self._wd_dirs.get(wd, ())
+            if mask & IN_IGNORED:
+                for d in list(dirs):
+                    affected.update(self._remove_subtree(d))
+                continue
+            for d in list(dirs):
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    affected.update(self._remove_subtree(d))
+                elif mask & IN_ISDIR:
+                    if name[0] == '.':
+                        continue
+                    path = os.path.join(d, name)
+                    affected.update(self._remove_subtree(path))
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        affected.update(self._crawl_new_dir(d, path))
+                elif name in _MARKERS:
+                    recrawl.add(d)
+        # crawl each changed directory once, parents first
+        done = []
+        for d in sorted(recrawl):
+            if d in self._dir_entries and not any(d.startswith(p + os.sep) for p in done):
+                affected.update(self._recrawl(d))
+                done.append(d)
+        self._update_cache(affected)
+        return self._manager._invalidate_manifests(affected)
+
+    def _restart(self):
+        affected = set(self._candidates)
+        for d in list(self._dir_wds):
+            self._unwatch(d)
+        self._dir_entries.clear()
+        self._candidates.clear()
+        cache = self._manager._location_cache
+        cache.clear()
+        self.start(cache)
+        affected.update(self._candidates)
+        return self._manager._invalidate_manifests(affected)
@@ -0,0 +1,134 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Benchmark crawling a synthetic workspace of catkin packages.
+
+Usage: python bench_crawl.py [number of packages]
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+try:
+    from xml.etree.cElementTree import ElementTree
+except ImportError:
+    from xml.etree.ElementTree import ElementTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from rospkg.crawler import Crawler, CrawlTree, sniff_package_xml  # noqa: E402
+
+PACKAGE_XML = """<?xml version="1.0"?>
+%(xml_model)s<package format="2">
+  <name>%(name)s</name>
+  <version>1.0.0</version>
+  <description>
+    Synthetic package %(name)s used to benchmark crawling.
+  </description>
+  <!-- One maintainer tag required, multiple allowed, one person per tag -->
+  <maintainer email="someone@example.com">Someone</maintainer>
+  <license>BSD</license>
+  <buildtool_depend>catkin</buildtool_depend>
+%(depends)s
+  <export>
+%(export)s
+  </export>
+</package>
+"""
+
+# emitted by catkin_create_pkg and the ROS 2 package templates
+XML_MODEL = ('<?xml-model href="http://download.ros.org/schema/package_format2.xsd" '
+             'schematypens="http://www.w3.org/2001/XMLSchema"?>\n')
+
+
+def make_workspace(root, count):
+    for i in range(count):
+        name = 'pkg_%d' % i
+        d = os.path.join(root, 'repo_%d' % (i // 10), name)
+        os.makedirs(os.path.join(d, 'src'))
+        depends = '\n'.join('  <depend>dep_%d</depend>' % j for j in range(20))
+        export = '    <metapackage/>' if i % 50 == 0 else '    <rosdoc config="rosdoc.yaml"/>'
+        with open(os.path.join(d, 'package.xml'), 'w') as f:
+            f.write(PACKAGE_XML % {'name': name, 'depends': depends, 'export': export,
+                                   'xml_model': XML_MODEL if i % 2 else ''})
+
+
+def parse_package_xml(filename):
+    root = ElementTree(None, filename)
+    return root.findtext('name').strip(' \n\r\t'), root.find('./export/metapackage') is not None
+
+
+def bench(label, fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        fn()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print('%-40s %8.2f ms' % (label, best * 1000.0))
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    root = tempfile.mkdtemp()
+    try:
+        make_workspace(root, count)
+        files = [os.path.join(d, 'package.xml') for _, d in Crawler('package.xml').crawl(root)]
+        assert len(files) == count
+        assert [parse_package_xml(f) for f in files] == [sniff_package_xml(f) for f in files]
+        print('%d packages' % count)
+        full = bench('ElementTree parse', lambda: [parse_package_xml(f) for f in files])
+        sniff = bench('sniff_package_xml', lambda: [sniff_package_xml(f) for f in files])
+        print('speedup: %.1fx' % (full / sniff))
+        bench('crawl (manifest.xml)', lambda: list(Crawler('manifest.xml').crawl(root)))
+
+        # directories modified just now are never trusted by CrawlTree
+        for d, dirs, _ in os.walk(root):
+            for p in [d] + [os.path.join(d, n, 'package.xml') for n in dirs if n.startswith('pkg_')]:
+                st = os.stat(p)
+                os.utime(p, (st.st_atime - 60, st.st_mtime - 60))
+        tree = CrawlTree()
+        list(Crawler('manifest.xml', tree=tree).crawl(root))
+        bench('refresh without changes', lambda: list(Crawler('manifest.xml', tree=CrawlTree(tree)).crawl(root)))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
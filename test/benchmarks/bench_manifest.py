@@ -0,0 +1,142 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Benchmark parsing manifest.xml files with xml.etree, eagerly and lazily,
+against xml.dom.minidom, and a reverse dependency query with and without
+loading manifests in worker processes first.
+
+Usage: python bench_manifest.py [number of manifests] [number of workers]
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing import cpu_count
+import xml.dom.minidom as dom
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import rospkg.manifest  # noqa: E402
+from rospkg import RosPack  # noqa: E402
+from rospkg.manifest import MANIFEST_FILE, parse_manifest  # noqa: E402
+
+MANIFEST_XML = """<package>
+  <description brief="Synthetic package %(name)s">
+    Synthetic package <b>%(name)s</b> used to benchmark parsing.
+  </description>
+  <author>Someone</author>
+  <license>BSD</license>
+  <review status="unreviewed" notes=""/>
+  <url>http://wiki.ros.org/%(name)s</url>
+%(depends)s
+  <rosdep name="boost"/>
+  <rosdep name="python"/>
+  <export>
+    <cpp cflags="-I${prefix}/include" lflags="-L${prefix}/lib -l%(name)s"/>
+    <rosdoc config="rosdoc.yaml"/>
+  </export>
+  <platform os="ubuntu" version="20.04"/>
+</package>
+"""
+
+
+def make_manifests(count):
+    manifests = []
+    for i in range(count):
+        name = 'pkg_%d' % i
+        # layers of 100 packages, each depending on the layer below
+        layer = i // 100 - 1
+        depends = '\n'.join('  <depend package="pkg_%d"/>' % (layer * 100 + (i + j) % 100)
+                             for j in range(20) if layer >= 0)
+        manifests.append(MANIFEST_XML % {'name': name, 'depends': depends})
+    return manifests
+
+
+def bench(label, fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        fn()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print('%-40s %8.2f ms' % (label, best * 1000.0))
+    return best
+
+
+def parse_all(manifests, lazy=False):
+    return [parse_manifest(MANIFEST_FILE, m, 'manifest.xml', lazy=lazy) for m in manifests]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    manifests = make_manifests(count)
+    print('%d manifests' % count)
+    parse_xml = rospkg.manifest._parse_xml
+    etree = bench('xml.etree', lambda: parse_all(manifests))
+    bench('xml.etree, lazy', lambda: parse_all(manifests, lazy=True))
+    rospkg.manifest._parse_xml = dom.parseString
+    try:
+        minidom = bench('xml.dom.minidom', lambda: parse_all(manifests))
+    finally:
+        rospkg.manifest._parse_xml = parse_xml
+    print('speedup: %.1fx' % (minidom / etree))
+
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else cpu_count()
+    print('%d workers' % workers)
+    root = tempfile.mkdtemp()
+    try:
+        for i, contents in enumerate(manifests):
+            d = os.path.join(root, 'pkg_%d' % i)
+            os.makedirs(d)
+            with open(os.path.join(d, MANIFEST_FILE), 'w') as f:
+                f.write(contents)
+        serial = bench('get_depends_on', lambda: RosPack(ros_paths=[root]).get_depends_on('pkg_0'), repeat=1)
+        bench('load_manifests', lambda: RosPack(ros_paths=[root]).load_manifests(workers=workers), repeat=1)
+
+        def parallel():
+            r = RosPack(ros_paths=[root])
+            r.load_manifests(workers=workers)
+            return r.get_depends_on('pkg_0')
+        parallel = bench('load_manifests, get_depends_on', parallel, repeat=1)
+        print('speedup: %.1fx' % (serial / parallel))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
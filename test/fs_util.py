@@ -0,0 +1,70 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Helpers creating package trees in temporary directories for tests.
+"""
+
+import os
+
+
+def write_manifest(d, depends=()):
+    """
+    Write a ``manifest.xml`` depending on *depends* into *d*, which is
+    created if needed.
+    """
+    if not os.path.isdir(d):
+        os.makedirs(d)
+    with open(os.path.join(d, 'manifest.xml'), 'w') as f:
+        f.write('<package><license>BSD</license>%s</package>' % ''.join(
+            '<depend package="%s"/>' % p for p in depends))
+
+
+def make_package_tree(root, names):
+    """
+    Create a package without dependencies for each relative path in *names*.
+    """
+    for name in names:
+        write_manifest(os.path.join(root, name))
+
+
+def age_tree(root, seconds=60):
+    """
+    Move the modification times below *root* into the past, as caches
+    are not written for directories modified just now.  Whole seconds
+    are used, so that times restored with :func:`os.utime` compare
+    equal on Python 2, which stores them with microsecond precision.
+    """
+    for d, dirs, files in os.walk(root):
+        for p in [d] + [os.path.join(d, f) for f in files]:
+            st = os.stat(p)
+            os.utime(p, (int(st.st_atime) - seconds, int(st.st_mtime) - seconds))
@@ -0,0 +1,125 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from .fs_util import write_manifest
+
+
+def test_AsyncRosPack():
+    if sys.version_info < (3, 5):
+        return
+    import asyncio
+    from rospkg import ResourceNotFound
+    from rospkg.aio import AsyncRosPack
+    tmp = tempfile.mkdtemp()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        overlay = os.path.join(tmp, 'overlay')
+        underlay = os.path.join(tmp, 'underlay')
+        write_manifest(os.path.join(underlay, 'foo'))
+        write_manifest(os.path.join(underlay, 'bar'), ['foo'])
+        write_manifest(os.path.join(overlay, 'foo'))
+        rp = AsyncRosPack([overlay, underlay])
+        run = loop.run_until_complete
+
+        def iterate(iterator):
+            names = []
+            while True:
+                try:
+                    names.append(run(iterator.__anext__()))
+                except StopAsyncIteration:
+                    return names
+        # names are yielded once, as they are found
+        names = iterate(rp.iter_list())
+        assert sorted(names) == ['bar', 'foo'], names
+        assert run(rp.get_path('foo')) == os.path.join(overlay, 'foo')
+        assert sorted(run(rp.list())) == ['bar', 'foo']
+        assert run(rp.get_depends('bar')) == ['foo']
+        assert run(rp.get_depends_on('foo', implicit=False)) == ['bar']
+        manifest = run(rp.get_manifest('bar'))
+        assert manifest is rp.manager.get_manifest('bar')
+        try:
+            run(rp.get_path('missing'))
+            assert False, 'should have raised'
+        except ResourceNotFound:
+            pass
+        # a populated cache is iterated as well
+        assert sorted(iterate(rp.iter_list())) == ['bar', 'foo']
+
+        # concurrent requests share a single call
+        calls = []
+        get_depends_on = rp.manager.get_depends_on
+
+        def slow_get_depends_on(*args):
+            calls.append(threading.current_thread())
+            time.sleep(0.05)
+            return get_depends_on(*args)
+        rp.manager.get_depends_on = slow_get_depends_on
+        results = run(asyncio.gather(*[rp.get_depends_on('foo') for _ in range(5)]))
+        assert results == [['bar']] * 5, results
+        assert len(calls) == 1
+        # and run off the event loop thread
+        assert calls[0] is not threading.current_thread()
+        assert rp._in_flight == {}
+
+        # a location cache which is being filled is not used
+        crawling = threading.Event()
+        done = threading.Event()
+
+        def crawl():
+            with rp.manager._lock:
+                cache = rp.manager._location_cache
+                rp.manager._location_cache = {'foo': os.path.join(underlay, 'foo')}
+                crawling.set()
+                done.wait()
+                rp.manager._location_cache = cache
+        thread = threading.Thread(target=crawl)
+        thread.start()
+        crawling.wait()
+        loop.call_later(0.05, done.set)
+        try:
+            assert run(rp.get_path('foo')) == os.path.join(overlay, 'foo')
+        finally:
+            done.set()
+            thread.join()
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+        shutil.rmtree(tmp)
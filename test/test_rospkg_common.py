@@ -50,3 +50,18 @@ def test_ResourceNotFound():
     assert 'blah' in s
     assert 'ros_root' in s
     assert 'ros_package_path' in s
+
+
+def test_import_modules():
+    # in a new interpreter, as other tests already imported rospkg
+    import os
+    import subprocess
+    import sys
+    modules = ['rospkg', 'rospkg.cache', 'rospkg.crawler', 'rospkg.index', 'rospkg.mapped_index',
+               'rospkg.manifest', 'rospkg.rospack', 'rospkg.stack', 'rospkg.watch']
+    if sys.version_info >= (3, 5):
+        modules.append('rospkg.aio')
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join([src] + [p for p in [env.get('PYTHONPATH')] if p])
+    subprocess.check_call([sys.executable, '-c', 'import %s' % ', '.join(modules)], env=env)
@@ -0,0 +1,285 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import shutil
+import tempfile
+
+
+def get_package_test_path():
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), 'package_tests'))
+
+
+def get_stack_test_path():
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), 'stack_tests'))
+
+
+def _touch(*args):
+    p = os.path.join(*args)
+    if not os.path.isdir(os.path.dirname(p)):
+        os.makedirs(os.path.dirname(p))
+    with open(p, 'w') as f:
+        f.write('<package><license>BSD</license></package>')
+
+
+def test_Crawler_crawl():
+    from rospkg.crawler import Crawler
+    path = get_package_test_path()
+    found = list(Crawler('manifest.xml').crawl(path))
+    assert set(found) == set([
+        ('foo', os.path.join(path, 'p1', 'foo')),
+        ('bar', os.path.join(path, 'p1', 'bar')),
+        ('invalid', os.path.join(path, 'p1', 'invalid')),
+        ('baz', os.path.join(path, 'p2', 'baz')),
+        ('foo', os.path.join(path, 'p2', 'foo'))]), found
+
+    # stacks are crawled for the packages they contain
+    path = os.path.join(get_stack_test_path(), 's1')
+    found = set(name for name, _ in Crawler('manifest.xml').crawl(path))
+    assert found == set(['foo_pkg', 'foo_pkg_2', 'bar_pkg']), found
+    found = set(name for name, _ in Crawler('stack.xml').crawl(path))
+    assert found == set(['foo', 'bar']), found
+
+    # missing paths and files are not an error
+    assert [] == list(Crawler('manifest.xml').crawl(os.path.join(path, 'fake')))
+    assert [] == list(Crawler('manifest.xml').crawl(os.path.join(path, 'foo', 'stack.xml')))
+
+
+def test_Crawler_prune():
+    from rospkg.crawler import Crawler
+    tmp = tempfile.mkdtemp()
+    try:
+        _touch(tmp, 'a', 'manifest.xml')
+        _touch(tmp, '.hidden1', 'h1', 'manifest.xml')
+        _touch(tmp, '.hidden2', 'h2', 'manifest.xml')
+        _touch(tmp, 'ignored', 'CATKIN_IGNORE')
+        _touch(tmp, 'ignored', 'i', 'manifest.xml')
+        _touch(tmp, 'nosubdirs', 'rospack_nosubdirs')
+        _touch(tmp, 'nosubdirs', 'n', 'manifest.xml')
+        _touch(tmp, 'a', 'nested', 'manifest.xml')
+        _touch(tmp, 'colcon', 'COLCON_IGNORE')
+        _touch(tmp, 'colcon', 'c', 'manifest.xml')
+        _touch(tmp, 'ament', 'AMENT_IGNORE')
+        _touch(tmp, 'ament', 'm', 'manifest.xml')
+        found = list(Crawler('manifest.xml').crawl(tmp))
+        assert found == [('a', os.path.join(tmp, 'a'))], found
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_Crawler_prune_patterns():
+    from rospkg.crawler import Crawler
+    tmp = tempfile.mkdtemp()
+    try:
+        _touch(tmp, 'src', 'foo', 'manifest.xml')
+        _touch(tmp, 'build', 'bar', 'manifest.xml')
+        _touch(tmp, 'src', 'foo_build', 'manifest.xml')
+        _touch(tmp, 'install', 'lib', 'python3', 'site-packages', 'baz', 'manifest.xml')
+        _touch(tmp, 'src', 'log', 'manifest.xml')
+        assert len(list(Crawler('manifest.xml').crawl(tmp))) == 5
+
+        prune = ['build', os.path.join('*', 'install', 'lib'), 'log']
+        crawler = Crawler('manifest.xml', prune=prune)
+        found = list(crawler.crawl(tmp))
+        assert sorted(found) == [('foo', os.path.join(tmp, 'src', 'foo')),
+                                 ('foo_build', os.path.join(tmp, 'src', 'foo_build'))], found
+        assert crawler.stats.pruned == 3, crawler.stats
+        # pruned directories are never stat'ed, only the root is
+        # checked for an install space
+        assert crawler.stats.stat_calls == crawler.stats.directories + 2, crawler.stats
+
+        from rospkg import RosPack
+        assert set(RosPack([tmp], prune=prune).list()) == set(['foo', 'foo_build'])
+        environ_copy = os.environ.copy()
+        try:
+            os.environ['ROSPKG_PRUNE'] = os.pathsep.join(prune)
+            assert set(RosPack([tmp]).list()) == set(['foo', 'foo_build'])
+            assert len(RosPack([tmp], prune=[]).list()) == 5
+        finally:
+            os.environ.clear()
+            os.environ.update(environ_copy)
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_Crawler_mtimes():
+    from rospkg.crawler import Crawler
+    path = get_package_test_path()
+    mtimes = {}
+    list(Crawler('manifest.xml', mtimes).crawl(path))
+    assert path in mtimes
+    assert os.path.join(path, 'p1', 'foo') in mtimes
+    assert mtimes[path] == os.stat(path).st_mtime
+
+
+_XML_MODEL_PACKAGE = '''<?xml version="1.0"?>
+<?xml-model href="http://download.ros.org/schema/package_format2.xsd" schematypens="http://www.w3.org/2001/XMLSchema"?>
+<package format="2">
+  <name>foo</name>
+</package>'''
+
+
+def test_sniff_package_xml():
+    from rospkg.crawler import _sniff_package_xml, sniff_package_xml
+    # processing instructions in the prolog do not need a full parse
+    assert _sniff_package_xml(_XML_MODEL_PACKAGE.encode('utf-8')) == ('foo', False)
+    assert _sniff_package_xml(b'<?xml version="1.0"?><!-- c --><?pi?>\n<package><name>foo</name></package>') == ('foo', False)
+    # only direct children of the export tag count
+    assert _sniff_package_xml(b'<package><name>foo</name><export><x><metapackage/></x></export></package>') == \
+        ('foo', False)
+    try:
+        from xml.etree.cElementTree import ElementTree
+    except ImportError:
+        from xml.etree.ElementTree import ElementTree
+    tmp = tempfile.mkdtemp()
+    try:
+        cases = {
+            'plain': ('<package><name> foo </name></package>', ('foo', False)),
+            'declaration': ('<?xml version="1.0"?>\n<package format="2">\n  <name>foo</name>\n</package>', ('foo', False)),
+            'xml_model': (_XML_MODEL_PACKAGE, ('foo', False)),
+            'meta': ('<package><name>foo</name><export><metapackage/></export></package>', ('foo', True)),
+            'commented_meta': ('<package><name>foo</name><export><!-- <metapackage/> --></export></package>', ('foo', False)),
+            'commented_name': ('<package><!-- <name>bar</name> --><name>foo</name></package>', ('foo', False)),
+            'meta_outside_export': ('<package><name>foo</name><metapackage/><export/></package>', ('foo', False)),
+            'nested_meta': ('<package><name>foo</name><export><build_type><metapackage/></build_type></export></package>',
+                            ('foo', False)),
+            'meta_after_nested': ('<package><name>foo</name><export><build_type>catkin</build_type>'
+                                  '<metapackage/></export></package>', ('foo', True)),
+            'entity': ('<package><name>foo&amp;bar</name></package>', ('foo&bar', False)),
+            'nested_name': ('<package><name>foo</name><export><x><name>bar</name></x></export></package>', ('foo', False)),
+        }
+        for key, (content, expected) in cases.items():
+            filename = os.path.join(tmp, key + '.xml')
+            with open(filename, 'w') as f:
+                f.write(content)
+            assert expected == sniff_package_xml(filename), key
+            root = ElementTree(None, filename)
+            full = (root.findtext('name').strip(), root.find('./export/metapackage') is not None)
+            assert full == expected, key
+
+        filename = os.path.join(tmp, 'bad.xml')
+        with open(filename, 'w') as f:
+            f.write('<package><name>foo</name>')
+        try:
+            sniff_package_xml(filename)
+            assert False, 'should have raised'
+        except SyntaxError:
+            pass
+    finally:
+        shutil.rmtree(tmp)
+
+    catkin_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'catkin_package_tests', 'p1'))
+    for name in os.listdir(catkin_path):
+        filename = os.path.join(catkin_path, name, 'package.xml')
+        root = ElementTree(None, filename)
+        assert sniff_package_xml(filename) == (root.findtext('name').strip(), root.find('./export/metapackage') is not None)
+
+
+def test_Crawler_symlinks():
+    from rospkg.crawler import Crawler
+    tmp = tempfile.mkdtemp()
+    try:
+        _touch(tmp, 'repo', 'foo', 'manifest.xml')
+        # alias of a subtree and a loop back to the root
+        os.symlink(os.path.join(tmp, 'repo'), os.path.join(tmp, 'alias'))
+        os.symlink(tmp, os.path.join(tmp, 'repo', 'loop'))
+        crawler = Crawler('manifest.xml')
+        found = list(crawler.crawl(tmp))
+        assert len(found) == 1, found
+        assert found[0][0] == 'foo'
+        assert crawler.stats.aliases == 2, crawler.stats
+        assert crawler.stats.directories == 3, crawler.stats
+
+        from rospkg import RosPack
+        r = RosPack(ros_paths=[tmp])
+        assert list(r.list()) == ['foo']
+        stats = r.get_crawl_stats()
+        assert stats[tmp].aliases == 2, stats
+    finally:
+        shutil.rmtree(tmp)
+
+
+def _write_package_xml(*args):
+    p = os.path.join(*args)
+    os.makedirs(p)
+    with open(os.path.join(p, 'package.xml'), 'w') as f:
+        f.write('<package><name>%s</name></package>' % os.path.basename(p))
+
+
+def test_Crawler_install_space():
+    from rospkg.crawler import Crawler
+    tmp = tempfile.mkdtemp()
+    try:
+        # ament prefix
+        ament = os.path.join(tmp, 'ament')
+        for name in ['foo', 'bar']:
+            _touch(ament, 'share', 'ament_index', 'resource_index', 'packages', name)
+            _write_package_xml(ament, 'share', name)
+        _write_package_xml(ament, 'share', 'not_indexed')
+        _write_package_xml(ament, 'share', 'cmake', 'nested')
+        _write_package_xml(ament, 'lib', 'python3', 'site-packages', 'lib_pkg')
+        crawler = Crawler('package.xml')
+        found = list(crawler.crawl(ament))
+        assert sorted(found) == [('bar', os.path.join(ament, 'share', 'bar')),
+                                 ('foo', os.path.join(ament, 'share', 'foo'))], found
+        # package index, share and the two packages
+        assert crawler.stats.directories == 4, crawler.stats
+
+        # catkin install space, also as share directory
+        catkin = os.path.join(tmp, 'catkin')
+        _touch(catkin, '.catkin')
+        with open(os.path.join(catkin, '.catkin'), 'w'):
+            pass
+        _write_package_xml(catkin, 'share', 'foo')
+        _write_package_xml(catkin, 'share', 'cmake', 'nested')
+        for path in [catkin, os.path.join(catkin, 'share')]:
+            found = list(Crawler('package.xml').crawl(path))
+            assert found == [('foo', os.path.join(catkin, 'share', 'foo'))], found
+
+        # devel spaces are crawled recursively
+        with open(os.path.join(catkin, '.catkin'), 'w') as f:
+            f.write(os.path.join(tmp, 'src'))
+        found = list(Crawler('package.xml').crawl(catkin))
+        assert sorted(name for name, _ in found) == ['foo', 'nested'], found
+
+        from rospkg.rospack import list_by_path, list_by_paths_parallel
+        paths = [ament, os.path.join(tmp, 'catkin')]
+        serial = {}
+        for path in reversed(paths):
+            list_by_path('package.xml', path, serial)
+        parallel = {}
+        list_by_paths_parallel('package.xml', paths, parallel, workers=2)
+        assert serial == parallel, (serial, parallel)
+        assert 'not_indexed' not in serial
+    finally:
+        shutil.rmtree(tmp)
@@ -0,0 +1,131 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import shutil
+import tempfile
+
+METAPACKAGE_XML = """<package>
+  <name>%s</name>
+  <export><metapackage/></export>
+</package>"""
+
+
+def _write(content, *args):
+    p = os.path.join(*args)
+    if not os.path.isdir(os.path.dirname(p)):
+        os.makedirs(os.path.dirname(p))
+    with open(p, 'w') as f:
+        f.write(content)
+
+
+def _make_workspace(root):
+    _write('<package><name>wet</name></package>', root, 'src', 'wet_dir', 'package.xml')
+    _write(METAPACKAGE_XML % 'meta', root, 'src', 'meta_dir', 'package.xml')
+    _write('<stack/>', root, 'stacks', 'st', 'stack.xml')
+    _write('<package/>', root, 'stacks', 'st', 'dry', 'manifest.xml')
+    # not visible as a stack within another stack
+    _write('<stack/>', root, 'stacks', 'st', 'nested', 'stack.xml')
+    _write('<package/>', root, 'stacks', 'st', 'nested', 'dry2', 'manifest.xml')
+    _write('<stack/>', root, 'both', 'stack.xml')
+    _write('<package/>', root, 'both', 'manifest.xml')
+    _write('', root, 'ignored', 'CATKIN_IGNORE')
+    _write('<package/>', root, 'ignored', 'dry3', 'manifest.xml')
+
+
+def _test_paths():
+    d = os.path.abspath(os.path.dirname(__file__))
+    return [os.path.join(d, p) for p in ['package_tests', 'stack_tests', 'catkin_package_tests']]
+
+
+def test_WorkspaceIndex_locations():
+    from rospkg.index import WorkspaceIndex
+    from rospkg.rospack import list_by_path
+    tmp = tempfile.mkdtemp()
+    try:
+        _make_workspace(tmp)
+        for paths in [[tmp]] + [[p] for p in _test_paths()] + [_test_paths()]:
+            index = WorkspaceIndex(paths)
+            for manifest_name in ['manifest.xml', 'stack.xml', 'package.xml']:
+                expected = {}
+                for path in reversed(paths):
+                    list_by_path(manifest_name, path, expected)
+                assert index.get_locations(manifest_name) == expected, (paths, manifest_name)
+        # all resource types from a single crawl
+        index = WorkspaceIndex([tmp])
+        assert index.list() == [
+            ('both', 'dry_package'), ('both', 'stack'), ('dry', 'dry_package'),
+            ('dry2', 'dry_package'), ('meta', 'metapackage'), ('st', 'stack'),
+            ('wet', 'wet_package')], index.list()
+        assert index.list('stack') == [('both', 'stack'), ('st', 'stack')]
+        stats = index.get_crawl_stats()
+        assert stats[tmp].directories == 11, stats
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_WorkspaceIndex_shared():
+    from rospkg.rospack import ManifestManager, RosPack, RosStack
+    from rospkg.index import WorkspaceIndex
+    tmp = tempfile.mkdtemp()
+    try:
+        _make_workspace(tmp)
+        assert WorkspaceIndex.get_instance([tmp]) is WorkspaceIndex.get_instance([tmp])
+        assert WorkspaceIndex.get_instance([tmp + os.sep]) is WorkspaceIndex.get_instance([tmp])
+
+        class Index(WorkspaceIndex):
+            max_instances = 2
+        index = Index.get_instance([tmp])
+        assert index is not WorkspaceIndex.get_instance([tmp])
+        Index.get_instance([tmp, os.path.join(tmp, 'stacks')])
+        assert Index.get_instance([tmp]) is index
+        Index.get_instance([os.path.join(tmp, 'stacks')])
+        assert len(Index._instances) == 2
+        assert Index.get_instance([tmp]) is index
+        r = RosPack([tmp], shared_index=True)
+        s = RosStack([tmp], shared_index=True)
+        c = ManifestManager('package.xml', [tmp], shared_index=True)
+        assert r._index is s._index is c._index
+        assert set(r.list()) == set(['dry', 'dry2', 'both', 'wet'])
+        assert set(s.list()) == set(['st', 'both', 'meta'])
+        assert set(c.list()) == set(['wet', 'meta'])
+        assert r.get_crawl_stats()[tmp].directories == 11
+        # crawled only once
+        assert s.get_crawl_stats()[tmp] is r.get_crawl_stats()[tmp]
+
+        _write('<package/>', tmp, 'stacks', 'st', 'dry4', 'manifest.xml')
+        assert r.refresh() == set(['dry4'])
+        assert r.get_path('dry4') == os.path.join(tmp, 'stacks', 'st', 'dry4')
+        assert s.refresh() == set()
+    finally:
+        shutil.rmtree(tmp)
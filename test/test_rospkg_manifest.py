@@ -33,7 +33,11 @@
 
 from __future__ import print_function
 
+import gc
 import os
+import shutil
+import sys
+import tempfile
 
 
 def test_InvalidManifest():
@@ -214,6 +218,134 @@ def test_parse_bad_file():
             assert p in str(e), "file name [%s] should be in error message [%s]" % (p, str(e))
 
 
+def _manifest_fields(m):
+    from rospkg.manifest import Manifest
+    fields = {}
+    for slot in Manifest.__slots__:
+        fields[slot] = getattr(m, slot)
+    fields['depends'] = [(d.name, d.type) for d in m.depends]
+    fields['rosdeps'] = [d.name for d in m.rosdeps]
+    fields['exports'] = [(e.tag, e.attrs, e.str) for e in m.exports]
+    fields['unknown_tags'] = [e.toxml() for e in m.unknown_tags]
+    return fields
+
+
+def _parse_with_dom(parse, *args):
+    import xml.dom.minidom as dom
+    import rospkg.manifest
+    parse_xml = rospkg.manifest._parse_xml
+    rospkg.manifest._parse_xml = dom.parseString
+    try:
+        return parse(*args)
+    except Exception as e:
+        return e
+    finally:
+        rospkg.manifest._parse_xml = parse_xml
+
+
+def test_parse_manifest_etree():
+    # the xml.etree parser must produce the same results and errors as minidom
+    from rospkg.manifest import parse_manifest, MANIFEST_FILE, STACK_FILE
+    test_dir = os.path.join(get_test_dir(), '..')
+    examples = []
+    for d, dirs, files in os.walk(test_dir):
+        for f in files:
+            if f in [MANIFEST_FILE, STACK_FILE] or f.startswith('bad'):
+                with open(os.path.join(d, f), 'rb') as fh:
+                    examples.append((STACK_FILE if f == STACK_FILE else MANIFEST_FILE, fh.read().decode('utf-8')))
+    examples.append((MANIFEST_FILE, _EXAMPLE1_DATA))
+    examples.extend([(MANIFEST_FILE, m) for m in [
+        '',
+        '<package>',
+        '<package></stack>',
+        '<stack/>',
+        '<package/><package/>',
+        '<package><description>a &amp; &lt;b&gt; "c"</description><license/></package>',
+        '<package><description brief="x">A <b class="c" id="d">bold</b><br/> <!-- note -->'
+        '<?pi data?> <i></i>move</description><license>BSD</license></package>',
+        '<package><description>a</description><description>b</description></package>',
+        '<package><author>a</author><!-- c --><author>b</author><license>BSD</license></package>',
+        '<package><license>BSD</license><unknown a="1">x<b/></unknown><name>n</name></package>',
+        '<package><license>BSD</license><platform os="ubuntu"/></package>',
+        '<package><license>BSD</license><depend stack="foo"/></package>',
+        '<package><license>BSD</license><rosdep/></package>',
+        '<package><license>BSD</license><export><cpp a="b">x<!-- c -->y</cpp><!-- c --></export></package>',
+        '<package><license><![CDATA[B<S>D]]>x</license></package>',
+        '<package xmlns:x="http://x"><license>BSD</license><export><x:foo/></export></package>',
+    ]])
+    examples.append((STACK_FILE, '<stack><license>BSD</license><depend stack="foo"/><rosdep name="bar"/></stack>'))
+    # minidom also accepts encoded contents
+    examples.extend([(manifest_name, contents.encode('utf-8')) for manifest_name, contents in examples])
+    for manifest_name, contents in examples:
+        expected = _parse_with_dom(parse_manifest, manifest_name, contents, 'f')
+        try:
+            m = parse_manifest(manifest_name, contents, 'f')
+        except Exception as e:
+            assert type(e) is type(expected), contents
+            assert str(e) == str(expected), contents
+            continue
+        assert _manifest_fields(m) == _manifest_fields(expected), contents
+
+
+def test_parse_manifest_lazy():
+    from rospkg.manifest import parse_manifest, InvalidManifest, LazyManifest, MANIFEST_FILE, STACK_FILE
+    m = parse_manifest(MANIFEST_FILE, _EXAMPLE1_DATA, 'f', lazy=True)
+    assert isinstance(m, LazyManifest)
+    assert m._string is not None
+    assert [d.name for d in m.depends] == ['pkgname', 'common']
+    assert [d.name for d in m.rosdeps] == ['python', 'bar', 'baz']
+    assert m._string is not None
+    # other fields are parsed on first access
+    assert m.license == 'Public Domain\nwith other stuff'
+    assert m._string is None
+    assert _manifest_fields(m) == _manifest_fields(parse_manifest(MANIFEST_FILE, _EXAMPLE1_DATA, 'f'))
+
+    # invalid dependencies are reported right away, other errors on access
+    for contents in ['<package><depend/></package>', '<stack><rosdep name="foo"/></stack>']:
+        try:
+            parse_manifest(STACK_FILE if 'stack' in contents else MANIFEST_FILE, contents, 'f', lazy=True)
+            assert False, 'should have raised'
+        except InvalidManifest:
+            pass
+    m = parse_manifest(MANIFEST_FILE, '<package><license>a</license><license>b</license></package>', 'f', lazy=True)
+    assert m.depends == []
+    try:
+        m.license
+        assert False, 'should have raised'
+    except InvalidManifest:
+        pass
+
+
+def test_compact_manifest():
+    from rospkg.manifest import compact_manifest, parse_manifest, MANIFEST_FILE
+    expected = _manifest_fields(parse_manifest(MANIFEST_FILE, _EXAMPLE1_DATA, 'f'))
+    m1 = compact_manifest(parse_manifest(MANIFEST_FILE, _EXAMPLE1_DATA, 'f'))
+    m2 = compact_manifest(parse_manifest(MANIFEST_FILE, _EXAMPLE1_DATA, 'f'))
+    assert _manifest_fields(m1) == expected
+    assert isinstance(m1.depends, tuple)
+    assert isinstance(m1.rosdeps, tuple)
+    # dependencies are shared
+    assert all(d1 is d2 for d1, d2 in zip(m1.depends, m2.depends))
+    assert all(d1 is d2 for d1, d2 in zip(m1.rosdeps, m2.rosdeps))
+    if sys.version_info[0] >= 3:
+        # unicode strings cannot be interned in Python 2
+        assert m1.exports[0].tag is m2.exports[0].tag
+    assert m1.get_export('cpp', 'cflags', convert=False) == ['-I${prefix}/include'] * 2
+
+    # lazy manifests keep compacted dependencies
+    m = compact_manifest(parse_manifest(MANIFEST_FILE, _EXAMPLE1_DATA, 'f', lazy=True))
+    assert m.depends[0] is m1.depends[0]
+    assert m.license == m1.license
+    assert m.depends[0] is m1.depends[0]
+
+    # unused flyweights are dropped
+    from rospkg.manifest import _depend_flyweights
+    name = m.depends[0].name
+    del m, m1, m2
+    gc.collect()
+    assert (name, 'package') not in _depend_flyweights
+
+
 EXAMPLE1 = u"""<package>
   <description brief="a brief description">Line 1
 Line 2
@@ -240,6 +372,9 @@ with other stuff</license>
   </rosbuild2>
 </package>"""
 
+# manifest files are parsed as bytes in Python 2
+_EXAMPLE1_DATA = EXAMPLE1.encode('utf-8') if sys.version_info[0] == 2 else EXAMPLE1
+
 STACK_EXAMPLE1 = """<stack>
   <description brief="a brief description">Line 1
 Line 2
@@ -270,3 +405,141 @@ STACK_INVALID2 = """<stack>
     <cpp os="osx" cflags="-I${prefix}/include" lflags="-L${prefix}/lib -lrosthread -framework CoreServices"/>
   </export>
 </stack>"""
+
+
+def _fake_rosdep(tmp, calls):
+    # installs stand-ins for the rosdep2 modules used by rospkg.manifest
+    import sys
+    import types
+    import rospkg.manifest
+
+    def init_rospack_interface():
+        calls.append('init')
+        return 'view'
+
+    def is_ros_package(view, name):
+        calls.append(name)
+        return name.startswith('ros')
+
+    rosdep2 = types.ModuleType('rosdep2')
+    rospack = types.ModuleType('rosdep2.rospack')
+    rospack.init_rospack_interface = init_rospack_interface
+    rospack.is_view_empty = lambda view: False
+    rospack.is_ros_package = is_ros_package
+    rospack.is_system_dependency = lambda view, name: name == 'boost'
+    sources_list = types.ModuleType('rosdep2.sources_list')
+    sources_list.CACHE_INDEX = 'index'
+    sources_list.get_sources_cache_dir = lambda: tmp
+
+    modules = dict((m, sys.modules.get(m)) for m in ['rosdep2', 'rosdep2.rospack', 'rosdep2.sources_list'])
+    sys.modules.update({'rosdep2': rosdep2, 'rosdep2.rospack': rospack, 'rosdep2.sources_list': sources_list})
+    state = dict((k, getattr(rospkg.manifest, k)) for k in
+                 ['_static_rosdep_view', '_rosdep_classes', '_rosdep_stamp', '_rosdep_classes_modified'])
+    environ_copy = os.environ.copy()
+    os.environ['ROS_HOME'] = tmp
+    rospkg.manifest._static_rosdep_view = None
+    rospkg.manifest._rosdep_classes = {}
+    rospkg.manifest._rosdep_stamp = None
+
+    def restore():
+        os.environ.clear()
+        os.environ.update(environ_copy)
+        for k, v in state.items():
+            setattr(rospkg.manifest, k, v)
+        for m, module in modules.items():
+            if module is None:
+                sys.modules.pop(m, None)
+            else:
+                sys.modules[m] = module
+    return restore
+
+
+class _Local(object):
+    def list(self):
+        return ['mine']
+
+
+def test_split_depends():
+    import rospkg.manifest
+    from rospkg.manifest import Manifest, _split_depends
+
+    calls = []
+    tmp = tempfile.mkdtemp()
+    restore = _fake_rosdep(tmp, calls)
+    try:
+        for persist in [False, True]:
+            m = Manifest()
+            _split_depends(m, ['roscpp', 'boost', 'mine', 'roscpp'], _Local(), persist=persist)
+            assert sorted(d.name for d in m.depends) == ['mine', 'roscpp']
+            assert [d.name for d in m.rosdeps] == ['boost']
+        # each name is classified once
+        assert sorted(calls) == ['boost', 'init', 'mine', 'roscpp']
+
+        # and shared with other processes
+        rospkg.manifest._write_rosdep_classes()
+        rospkg.manifest._rosdep_classes = {}
+        rospkg.manifest._rosdep_stamp = None
+        m = Manifest()
+        _split_depends(m, ['roscpp', 'boost'], None, persist=True)
+        assert [d.name for d in m.depends] == ['roscpp']
+        assert len(calls) == 4
+
+        # until the rosdep database is updated
+        with open(os.path.join(tmp, 'index'), 'w') as f:
+            f.write('updated')
+        rospkg.manifest._rosdep_classes = {}
+        rospkg.manifest._rosdep_stamp = None
+        _split_depends(Manifest(), ['roscpp'], None, persist=True)
+        assert len(calls) == 5
+    finally:
+        restore()
+        shutil.rmtree(tmp)
+
+
+def test_CatkinManifest():
+    import pickle
+    import rospkg.manifest
+    from rospkg.manifest import Manifest, _CatkinManifest, prewarm_rosdep_view
+
+    calls = []
+    tmp = tempfile.mkdtemp()
+    restore = _fake_rosdep(tmp, calls)
+    try:
+        parsed = Manifest(filename='manifest.xml', is_catkin=True)
+        parsed.name = 'foo'
+        local = _Local()
+        m = _CatkinManifest(parsed, ['roscpp', 'boost', 'mine'], local, False)
+        assert m.name == 'foo'
+        assert m.is_catkin
+        # rosdep is only loaded when the dependencies are needed
+        assert calls == []
+        assert sorted(d.name for d in m.depends) == ['mine', 'roscpp']
+        assert calls[0] == 'init'
+        assert [d.name for d in m.rosdeps] == ['boost']
+
+        # local packages are known after the manager is gone
+        m = _CatkinManifest(parsed, ['roscpp', 'mine'], _Local(), False)
+        import gc
+        gc.collect()
+        assert sorted(d.name for d in m.depends) == ['mine', 'roscpp']
+
+        # pickled without loading the rosdep view, e.g. while it is
+        # being loaded by another thread when worker processes fork
+        del calls[:]
+        with rospkg.manifest._rosdep_view_lock:
+            data = pickle.dumps(_CatkinManifest(parsed, ['mine', 'boost'], local, False))
+        assert calls == []
+        m = pickle.loads(data)
+        assert [d.name for d in m.depends] == ['mine']
+        assert [d.name for d in m.rosdeps] == ['boost']
+        assert m.name == 'foo'
+
+        # the rosdep view can be loaded in the background
+        rospkg.manifest._static_rosdep_view = None
+        thread = prewarm_rosdep_view()
+        thread.join()
+        assert rospkg.manifest._static_rosdep_view == 'view'
+        assert prewarm_rosdep_view() is None
+    finally:
+        restore()
+        shutil.rmtree(tmp)
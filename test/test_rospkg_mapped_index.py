@@ -0,0 +1,149 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import shutil
+import tempfile
+
+from .fs_util import age_tree, write_manifest
+
+
+def _write_manifest(root, name, depends=()):
+    write_manifest(os.path.join(root, name), depends)
+    # the index is not written for directories modified just now
+    age_tree(root)
+
+
+def test_MappedIndex():
+    from rospkg.mapped_index import MappedIndex, write_mapped_index
+    tmp = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(tmp, 'ros_home'))
+        filename = os.path.join(tmp, 'ros_home', 'index')
+        locations = {'foo': '/ws/foo', 'bar': '/ws/bar', u'b\u00e4z': u'/ws/b\u00e4z'}
+        depends = {'foo': ['bar', u'b\u00e4z'], 'bar': []}
+        mtimes = {tmp: os.stat(tmp).st_mtime}
+        assert write_mapped_index(filename, {'KEY': 'value'}, locations, depends, mtimes, {'bar': 'key'})
+        index = MappedIndex(filename)
+        assert index.header == {'KEY': 'value'}
+        assert index.mtimes == mtimes
+        assert index.is_valid()
+        assert dict(index) == locations
+        assert len(index) == 3
+        assert 'foo' in index and 'missing' not in index
+        assert index['bar'] == '/ws/bar'
+        try:
+            index['missing']
+            assert False, "should have raised"
+        except KeyError:
+            pass
+        assert index.get_depends('foo') == ['bar', u'b\u00e4z']
+        assert index.get_depends('foo', 'key') is None
+        assert index.get_depends('bar') == []
+        assert index.get_depends('bar', 'key') == []
+        assert index.get_depends('bar', 'other') is None
+        assert index.get_depends(u'b\u00e4z') is None
+        assert index.get_depends('missing') is None
+        index.close()
+
+        with open(filename, 'wb') as f:
+            f.write(b'garbage')
+        try:
+            MappedIndex(filename)
+            assert False, "should have raised"
+        except ValueError:
+            pass
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_publish_index():
+    from rospkg import RosPack
+    from rospkg.mapped_index import get_mapped_index_file
+    tmp = tempfile.mkdtemp()
+    environ_copy = os.environ.copy()
+    try:
+        os.environ['ROS_HOME'] = os.path.join(tmp, 'ros_home')
+        path = os.path.join(tmp, 'ws')
+        os.makedirs(path)
+        _write_manifest(path, 'bar')
+        _write_manifest(path, 'foo', ['bar'])
+        assert RosPack(ros_paths=[path]).publish_index()
+        index_file = get_mapped_index_file('manifest.xml', [path])
+        assert os.path.isfile(index_file)
+
+        r = RosPack(ros_paths=[path], mapped_index=True)
+        assert set(r.list()) == set(['foo', 'bar'])
+        assert r._mapped_index is not None
+        assert r.get_depends('foo') == ['bar']
+        assert r.get_depends_on('bar', implicit=False) == ['foo']
+        # dependencies come from the index, not from parsed manifests
+        assert r._manifests == {}
+        assert r.get_path('foo') == os.path.join(path, 'foo')
+
+        class Pack(RosPack):
+            def __init__(self, ros_paths=None, mapped_index=False):
+                super(Pack, self).__init__(ros_paths, mapped_index=mapped_index)
+        r = Pack.get_instance([path], mapped_index=True)
+        assert set(r.list()) == set(['foo', 'bar'])
+        assert r._mapped_index is not None
+        # the index is only used when asked for
+        r = Pack.get_instance([path])
+        assert set(r.list()) == set(['foo', 'bar'])
+        assert r._mapped_index is None
+
+        # manifests edited in place are read again
+        manifest = os.path.join(path, 'foo', 'manifest.xml')
+        st = os.stat(manifest)
+        with open(manifest, 'w') as f:
+            f.write('<package><license>BSD</license></package>')
+        os.utime(manifest, (st.st_atime, st.st_mtime))
+        for r in [RosPack(ros_paths=[path], mapped_index=True), Pack.get_instance([path], mapped_index=True)]:
+            r.list()
+            assert r._mapped_index is not None
+            assert r.get_depends('foo', implicit=False) == []
+            assert r.get_depends_on('bar', implicit=False) == []
+            assert r.get_depends('bar', implicit=False) == []
+        Pack._instances.clear()
+
+        # changes on disk invalidate the index
+        os.makedirs(os.path.join(path, 'baz'))
+        with open(os.path.join(path, 'baz', 'manifest.xml'), 'w') as f:
+            f.write('<package/>')
+        r = RosPack(ros_paths=[path], mapped_index=True)
+        assert set(r.list()) == set(['foo', 'bar', 'baz'])
+        assert r._mapped_index is None
+    finally:
+        os.environ.clear()
+        os.environ.update(environ_copy)
+        shutil.rmtree(tmp)
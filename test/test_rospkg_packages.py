@@ -33,9 +33,12 @@
 from __future__ import print_function
 
 import os
+import shutil
 import subprocess
 import tempfile
 
+from .fs_util import age_tree, make_package_tree
+
 
 def get_package_test_path():
     return os.path.abspath(os.path.join(os.path.dirname(__file__), 'package_tests'))
@@ -60,6 +63,17 @@ def test_ManifestManager_constructor():
         r.ros_paths.append('foo')
         assert r.ros_paths == [tmp]
 
+    # options which replace the crawl cannot be combined with others
+    for kwargs in [dict(watch=True, crawl_workers=2), dict(watch=True, lazy=True),
+                   dict(watch=True, shared_index=True), dict(shared_index=True, mapped_index=True),
+                   dict(shared_index=True, share_entries=True)]:
+        try:
+            RosPack(ros_paths=[], **kwargs)
+            assert False, 'should have raised: %s' % kwargs
+        except ValueError:
+            pass
+    RosPack(ros_paths=[], watch=True, disk_cache=True, crawl_workers=1)
+
 
 def test_ManifestManager_get_instance():
     from rospkg import RosPack, RosStack, get_ros_paths
@@ -82,6 +96,58 @@ def test_ManifestManager_get_instance():
         assert r1 is not r3
 
 
+def test_ManifestManager_get_instance_registry():
+    from rospkg import RosPack
+    tmp = tempfile.mkdtemp()
+
+    class Pack(RosPack):
+        max_instances = 2
+    try:
+        overlay = os.path.join(tmp, 'overlay')
+        underlay = os.path.join(tmp, 'underlay')
+        make_package_tree(overlay, ['foo'])
+        make_package_tree(underlay, ['foo', 'bar'])
+        os.symlink(underlay, os.path.join(tmp, 'link'))
+
+        # equivalent paths share an instance
+        r = Pack.get_instance([underlay], share_entries=True)
+        assert Pack.get_instance([underlay + os.sep], share_entries=True) is r
+        assert Pack.get_instance([os.path.join(tmp, 'link')], share_entries=True) is r
+        assert Pack.get_instance([os.path.join(tmp, '.', 'underlay')], share_entries=True) is r
+        assert RosPack.get_instance([underlay], share_entries=True) is not r
+
+        # an overlay only crawls its new entry
+        assert set(r.list()) == set(['foo', 'bar'])
+        r2 = Pack.get_instance([overlay, underlay], share_entries=True)
+        assert set(r2.list()) == set(['foo', 'bar'])
+        assert r2.get_path('foo') == os.path.join(overlay, 'foo')
+        assert list(r2.get_crawl_stats()) == [overlay], r2.get_crawl_stats()
+        # unless refreshed
+        r2.refresh()
+        assert set(r2.get_crawl_stats()) == set([overlay, underlay])
+
+        # shared entries keep the spelling of the ROS path
+        link = os.path.join(tmp, 'link')
+        r3 = RosPack(ros_paths=[link], share_entries=True)
+        assert r3.get_path('bar') == os.path.join(link, 'bar')
+        assert r.get_path('bar') == os.path.join(underlay, 'bar')
+
+        # least recently used instances are dropped
+        assert Pack.get_instance([underlay], share_entries=True) is r
+        Pack.get_instance([overlay], share_entries=True)
+        assert Pack.get_instance([underlay], share_entries=True) is r
+        assert Pack.get_instance([overlay, underlay], share_entries=True) is not r2
+        assert len(Pack._instances) == 2
+
+        # instances are only shared if created with the same arguments
+        default = Pack.get_instance([underlay])
+        assert default is not r
+        assert not default._share_entries and not default._use_mapped_index
+        assert Pack.get_instance([underlay], prune=['build']) is not default
+    finally:
+        shutil.rmtree(tmp)
+
+
 def rospackexec(args):
     rospack_bin = 'rospack'
     val = (subprocess.Popen([rospack_bin] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE).communicate()[0] or '').strip()
@@ -238,6 +304,47 @@ def test_RosPackage_get_depends():
             assert retval == rospackval, "[%s]: %s vs. %s" % (p, retval, rospackval)
 
 
+def test_RosPack_lazy_manifests():
+    from rospkg import RosPack
+    from rospkg.manifest import LazyManifest
+    path = get_package_test_path()
+    r = RosPack(ros_paths=[path], lazy_manifests=True)
+    assert set(r.get_depends('baz')) == set(['foo', 'bar'])
+    m = r.get_manifest('bar')
+    assert isinstance(m, LazyManifest)
+    assert m.license == RosPack(ros_paths=[path]).get_manifest('bar').license
+
+
+def test_RosPack_compact_manifests():
+    from rospkg import RosPack
+    path = get_package_test_path()
+    r = RosPack(ros_paths=[path], compact_manifests=True)
+    assert set(r.get_depends('baz')) == set(['foo', 'bar'])
+    assert isinstance(r.get_manifest('baz').depends, tuple)
+    assert r.get_depends_on('foo', implicit=False) == RosPack(ros_paths=[path]).get_depends_on('foo', implicit=False)
+
+
+def test_RosPack_load_manifests():
+    from rospkg import InvalidManifest, RosPack
+    path = get_package_test_path()
+    for workers in [1, 2]:
+        for lazy_manifests in [False, True]:
+            r = RosPack(ros_paths=[path], lazy_manifests=lazy_manifests)
+            errors = r.load_manifests(workers=workers)
+            assert list(errors) == ['invalid']
+            assert isinstance(errors['invalid'], InvalidManifest)
+            assert set(r._manifests) == set(['foo', 'bar', 'baz'])
+            assert set(r.get_parse_times()) == set(['foo', 'bar', 'baz'])
+            assert r.get_manifest('bar').license == 'BSD'
+            assert set(r.get_depends_on('foo')) == set(['bar', 'baz'])
+
+    r = RosPack(ros_paths=[path])
+    bar = r.get_manifest('bar')
+    assert list(r.load_manifests(['bar', 'baz', 'missing'], workers=2)) == ['missing']
+    assert r.get_manifest('bar') is bar
+    assert 'baz' in r._manifests
+
+
 def get_stack_test_path():
     return os.path.abspath(os.path.join(os.path.dirname(__file__), 'stack_tests'))
 
@@ -356,3 +463,464 @@ def test_get_depends_on():
             retval = set(r.get_depends_on(p, True))
             rospackval = set(rospack_depends_on(p))
             assert retval == rospackval, "[%s]: %s vs. %s" % (p, retval, rospackval)
+
+
+def test_get_depends_on_skips_bad_packages():
+    from rospkg import RosPack
+    from .fs_util import write_manifest
+    tmp = tempfile.mkdtemp()
+    try:
+        write_manifest(os.path.join(tmp, 'foo'))
+        write_manifest(os.path.join(tmp, 'bar'), ['foo'])
+        write_manifest(os.path.join(tmp, 'baz'), ['bar'])
+        write_manifest(os.path.join(tmp, 'missing_dep'), ['bar', 'fake'])
+        write_manifest(os.path.join(tmp, 'invalid_dep'), ['foo', 'invalid'])
+        write_manifest(os.path.join(tmp, 'indirect'), ['missing_dep'])
+        write_manifest(os.path.join(tmp, 'invalid'))
+        with open(os.path.join(tmp, 'invalid', 'manifest.xml'), 'w') as f:
+            f.write('<package>')
+        # skipped where get_depends() raises on a new manager
+        expected = []
+        for name in RosPack(ros_paths=[tmp]).list():
+            try:
+                if name != 'foo' and 'foo' in RosPack(ros_paths=[tmp]).get_depends(name):
+                    expected.append(name)
+            except Exception:
+                pass
+        assert sorted(expected) == ['bar', 'baz']
+        assert RosPack(ros_paths=[tmp]).get_depends_on('foo') == expected
+        assert RosPack(ros_paths=[tmp]).get_depends_on('invalid') == []
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_read_location_cache_legacy():
+    from rospkg.cache import read_location_cache
+    header, locations, mtimes = read_location_cache(os.path.join(get_package_test_path(), 'rospack_cache'))
+    assert header['ROS_ROOT'] == '/home/kwc/ros'
+    assert header['ROS_PACKAGE_PATH'] == '/home/kwc/workspace:/u/kwc/workspace'
+    assert locations['rospack'] == '/home/kwc/ros/tools/rospack'
+    assert mtimes == {}
+
+
+def test_write_location_cache_failure():
+    from rospkg.cache import write_location_cache
+    tmp = tempfile.mkdtemp()
+    try:
+        # cannot replace a directory with the cache file
+        filename = os.path.join(tmp, 'cache')
+        os.makedirs(filename)
+        assert not write_location_cache(filename, {}, {'foo': tmp}, {})
+        assert os.listdir(tmp) == ['cache']
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_disk_cache():
+    from rospkg import RosPack
+    from rospkg.cache import get_location_cache_file
+    tmp = tempfile.mkdtemp()
+    try:
+        ros_home = os.path.join(tmp, 'ros_home')
+        path = os.path.join(tmp, 'ws')
+        make_package_tree(path, ['foo', 'bar'])
+        age_tree(path)
+        environ_copy = os.environ.copy()
+        os.environ['ROS_HOME'] = ros_home
+        try:
+            r = RosPack(ros_paths=[path], disk_cache=True)
+            assert set(r.list()) == set(['foo', 'bar'])
+            cache_file = get_location_cache_file('manifest.xml', [path])
+            assert os.path.isfile(cache_file)
+
+            # warm start reads the cache instead of crawling
+            with open(cache_file, 'a') as f:
+                f.write('cached %s\n' % os.path.join(path, 'foo'))
+            r = RosPack(ros_paths=[path], disk_cache=True)
+            assert set(r.list()) == set(['foo', 'bar', 'cached'])
+
+            # adding a package invalidates the cache
+            make_package_tree(path, ['baz'])
+            r = RosPack(ros_paths=[path], disk_cache=True)
+            assert set(r.list()) == set(['foo', 'bar', 'baz'])
+            assert r.get_path('baz') == os.path.join(path, 'baz')
+        finally:
+            os.environ.clear()
+            os.environ.update(environ_copy)
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_manifest_cache():
+    import rospkg.manifest
+    from rospkg import RosPack
+    from rospkg.cache import get_manifest_cache, ManifestCache, read_manifest_cache
+    from rospkg.manifest import LazyManifest, parse_manifest_file
+    tmp = tempfile.mkdtemp()
+    try:
+        ros_home = os.path.join(tmp, 'ros_home')
+        path = os.path.join(tmp, 'ws')
+        make_package_tree(path, ['foo', 'bar'])
+        foo = os.path.join(path, 'foo')
+        with open(os.path.join(foo, 'manifest.xml'), 'w') as f:
+            f.write('<package><license>BSD</license><depend package="bar"/><export><cpp a="b"/></export></package>')
+        age_tree(path)
+        environ_copy = os.environ.copy()
+        os.environ['ROS_HOME'] = ros_home
+        try:
+            r = RosPack(ros_paths=[path], disk_cache=True)
+            assert r.get_depends('foo') == ['bar']
+            cache = get_manifest_cache('manifest.xml', [path])
+            assert cache.save()
+            assert len(read_manifest_cache(cache.filename)) == 2
+            assert get_manifest_cache('manifest.xml', [path, tmp]) is not cache
+        finally:
+            os.environ.clear()
+            os.environ.update(environ_copy)
+
+        # another process parses nothing
+        cache = ManifestCache(cache.filename)
+        parse_manifest = rospkg.manifest.parse_manifest
+        rospkg.manifest.parse_manifest = None
+        try:
+            m = parse_manifest_file(foo, 'manifest.xml', cache=cache)
+        finally:
+            rospkg.manifest.parse_manifest = parse_manifest
+        assert [d.name for d in m.depends] == ['bar']
+        assert m.license == 'BSD'
+        assert m.get_export('cpp', 'a') == ['b']
+
+        # lazy manifests are stored as such, but not returned for eager parsing
+        cache = ManifestCache(os.path.join(tmp, 'lazy_cache'))
+        assert isinstance(parse_manifest_file(foo, 'manifest.xml', lazy=True, cache=cache), LazyManifest)
+        assert isinstance(parse_manifest_file(foo, 'manifest.xml', lazy=True, cache=cache), LazyManifest)
+        assert not isinstance(parse_manifest_file(foo, 'manifest.xml', cache=cache), LazyManifest)
+
+        # modified files are parsed again
+        with open(os.path.join(foo, 'manifest.xml'), 'w') as f:
+            f.write('<package><license>BSD</license></package>')
+        assert cache.get(os.path.join(foo, 'manifest.xml'))[1] is None
+        assert parse_manifest_file(foo, 'manifest.xml', cache=cache).depends == []
+
+        # records of deleted files are dropped when saving
+        bar = os.path.join(path, 'bar')
+        parse_manifest_file(bar, 'manifest.xml', cache=cache)
+        assert cache.save()
+        assert os.path.join(bar, 'manifest.xml') in read_manifest_cache(cache.filename)
+        shutil.rmtree(bar)
+        cache._dirty = True
+        assert cache.save()
+        assert os.path.join(bar, 'manifest.xml') not in read_manifest_cache(cache.filename)
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_list_by_paths_parallel():
+    from rospkg.rospack import list_by_path, list_by_paths_parallel
+    path = get_package_test_path()
+    for paths in [[path], [os.path.join(path, 'p1'), os.path.join(path, 'p2')],
+                  [os.path.join(path, 'p2'), os.path.join(path, 'p1'), os.path.join(path, 'p1', 'foo')]]:
+        serial = {}
+        for p in reversed(paths):
+            list_by_path('manifest.xml', p, serial)
+        parallel = {}
+        list_by_paths_parallel('manifest.xml', paths, parallel, workers=3)
+        if len(paths) > 1:
+            assert serial == parallel, "%s vs %s" % (serial, parallel)
+        else:
+            assert set(serial) == set(parallel)
+
+    from rospkg import RosPack
+    r = RosPack(ros_paths=[os.path.join(path, 'p1'), os.path.join(path, 'p2')], crawl_workers=4)
+    assert os.path.join(path, 'p1', 'foo') == r.get_path('foo')
+    assert os.path.join(path, 'p2', 'baz') == r.get_path('baz')
+
+
+def test_list_by_paths_parallel_aliases():
+    from rospkg.crawler import CrawlStats
+    from rospkg.rospack import list_by_path, list_by_paths_parallel
+    tmp = tempfile.mkdtemp()
+    try:
+        ws = os.path.join(tmp, 'ws')
+        make_package_tree(ws, [os.path.join('d4', 'foo'), os.path.join('b', 'x', 'bar')])
+        # a loop back to the root and an alias of a sibling subtree
+        os.symlink(ws, os.path.join(ws, 'd5'))
+        os.makedirs(os.path.join(ws, 'a'))
+        os.symlink(os.path.join(ws, 'b', 'x'), os.path.join(ws, 'a', 'link'))
+        serial = {}
+        list_by_path('manifest.xml', ws, serial)
+        for _ in range(10):
+            parallel = {}
+            list_by_paths_parallel('manifest.xml', [ws], parallel, workers=4)
+            assert serial == parallel, (serial, parallel)
+        assert serial['foo'] == os.path.join(ws, 'd4', 'foo')
+
+        # without the sibling alias, the counters match too
+        shutil.rmtree(os.path.join(ws, 'a'))
+        serial_stats = CrawlStats()
+        list_by_path('manifest.xml', ws, {}, stats=serial_stats)
+        parallel_stats = {}
+        list_by_paths_parallel('manifest.xml', [ws], {}, workers=4, stats=parallel_stats)
+        assert serial_stats.aliases == parallel_stats[ws].aliases == 1
+        assert serial_stats.directories == parallel_stats[ws].directories
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_refresh():
+    from rospkg import RosPack, ResourceNotFound
+    tmp = tempfile.mkdtemp()
+    try:
+        make_package_tree(tmp, [os.path.join('repo1', 'foo'), os.path.join('repo2', 'bar')])
+        age_tree(tmp)
+        r = RosPack(ros_paths=[tmp])
+        assert set(r.list()) == set(['foo', 'bar'])
+        assert r.refresh() == set()
+
+        # unchanged directories are not listed again
+        repo2 = os.path.join(tmp, 'repo2')
+        st = os.stat(repo2)
+        make_package_tree(repo2, ['hidden'])
+        os.utime(repo2, (st.st_atime, st.st_mtime))
+        assert r.refresh() == set()
+        assert 'hidden' not in r.list()
+
+        # changed directories are
+        make_package_tree(os.path.join(tmp, 'repo1'), ['baz'])
+        shutil.rmtree(os.path.join(tmp, 'repo1', 'foo'))
+        assert r.refresh() == set(['foo', 'baz'])
+        assert r.get_path('baz') == os.path.join(tmp, 'repo1', 'baz')
+        try:
+            r.get_path('foo')
+            assert False, 'should have raised'
+        except ResourceNotFound:
+            pass
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_invalidate():
+    from rospkg import RosPack
+    tmp = tempfile.mkdtemp()
+    try:
+        make_package_tree(tmp, [os.path.join('repo1', 'foo'), os.path.join('repo1', 'bar'),
+                                 os.path.join('repo2', 'baz'), os.path.join('repo2', 'qux')])
+        with open(os.path.join(tmp, 'repo1', 'foo', 'manifest.xml'), 'w') as f:
+            f.write('<package><license>BSD</license><depend package="bar"/></package>')
+        with open(os.path.join(tmp, 'repo2', 'baz', 'manifest.xml'), 'w') as f:
+            f.write('<package><license>BSD</license><depend package="qux"/></package>')
+        age_tree(tmp)
+        r = RosPack(ros_paths=[tmp])
+        assert r.get_depends('foo') == ['bar']
+        assert r.get_depends('baz') == ['qux']
+        generation = r.generation
+
+        # dependents of an invalidated resource are dropped as well
+        assert r.invalidate('bar') == set(['foo', 'bar'])
+        assert r.generation > generation
+        assert 'baz' in r._depends_cache
+        assert 'foo' not in r._depends_cache
+        assert r.get_depends('foo') == ['bar']
+
+        assert r.invalidate_path(os.path.join(tmp, 'repo2')) == set(['baz', 'qux'])
+        assert r.invalidate_path(os.path.join(tmp, 'repo')) == set()
+        assert 'foo' in r._manifests
+
+        # refresh picks up modified manifests
+        assert r.refresh() == set()
+        with open(os.path.join(tmp, 'repo1', 'bar', 'manifest.xml'), 'w') as f:
+            f.write('<package><license>BSD</license><depend package="baz"/></package>')
+        assert r.refresh() == set(['foo', 'bar'])
+        assert sorted(r.get_depends('foo')) == ['bar', 'baz', 'qux']
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_get_exports():
+    for lazy_manifests in (False, True):
+        _test_RosPack_get_exports(lazy_manifests)
+
+
+def _test_RosPack_get_exports(lazy_manifests):
+    from rospkg import RosPack
+    tmp = tempfile.mkdtemp()
+    try:
+        make_package_tree(tmp, ['foo', 'bar', 'baz', 'qux', 'quux'])
+        manifests = {
+            'foo': '<package><license>BSD</license><export><foo plugin="${prefix}/foo.xml"/></export></package>',
+            'bar': '<package><license>BSD</license><depend package="foo"/>'
+                   '<export><foo plugin="${prefix}/bar.xml" other="x"/><cpp cflags="-I${prefix}"/></export></package>',
+            'baz': '<package><license>BSD</license><export><foo plugin="baz.xml"/></export></package>',
+            'qux': '<package><license>BSD</license>',
+            # only invalid once the fields besides the dependencies are parsed
+            'quux': '<package><license>BSD</license><platform os="ubuntu"/>'
+                    '<export><foo plugin="quux.xml"/></export></package>',
+        }
+        for name, manifest in manifests.items():
+            with open(os.path.join(tmp, name, 'manifest.xml'), 'w') as f:
+                f.write(manifest)
+        age_tree(tmp)
+        r = RosPack(ros_paths=[tmp], lazy_manifests=lazy_manifests)
+        # invalid manifests are skipped
+        assert r.get_exports('foo', 'plugin') == [
+            ('bar', os.path.join(tmp, 'bar', 'bar.xml')),
+            ('baz', 'baz.xml'),
+            ('foo', os.path.join(tmp, 'foo', 'foo.xml'))]
+        assert r.get_exports('foo', 'other') == [('bar', 'x')]
+        assert r.get_exports('cpp', 'cflags') == [('bar', '-I' + os.path.join(tmp, 'bar'))]
+        assert r.get_exports('foo', 'fake') == []
+        assert r.get_exports('foo', 'plugin', depends_on='foo') == [
+            ('bar', os.path.join(tmp, 'bar', 'bar.xml')),
+            ('foo', os.path.join(tmp, 'foo', 'foo.xml'))]
+        assert r.get_exports('foo', 'plugin', depends_on='bar') == [('bar', os.path.join(tmp, 'bar', 'bar.xml'))]
+        assert r._export_index is not None
+
+        # the index is dropped with the manifests
+        with open(os.path.join(tmp, 'baz', 'manifest.xml'), 'w') as f:
+            f.write('<package><license>BSD</license></package>')
+        r.invalidate('baz')
+        assert r._export_index is None
+        assert [name for name, _ in r.get_exports('foo', 'plugin')] == ['bar', 'foo']
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_lazy():
+    from rospkg import RosPack, ResourceNotFound
+    tmp = tempfile.mkdtemp()
+    try:
+        overlay = os.path.join(tmp, 'overlay')
+        underlay = os.path.join(tmp, 'underlay')
+        make_package_tree(overlay, [os.path.join('src', 'repo', 'foo')])
+        make_package_tree(underlay, [os.path.join('share', 'foo'), os.path.join('share', 'bar')])
+        r = RosPack(ros_paths=[overlay, underlay], lazy=True)
+        # deep package in the overlay shadows the package in the underlay
+        assert r.get_path('foo') == os.path.join(overlay, 'src', 'repo', 'foo')
+        assert r.get_path('bar') == os.path.join(underlay, 'share', 'bar')
+        assert r._location_cache is None
+        try:
+            r.get_path('fake')
+            assert False, 'should have raised'
+        except ResourceNotFound:
+            pass
+        assert set(r.list()) == set(['foo', 'bar'])
+
+        # hit in first path entry does not crawl the others
+        r = RosPack(ros_paths=[underlay, overlay], lazy=True)
+        assert r.get_path('foo') == os.path.join(underlay, 'share', 'foo')
+        assert list(r._entry_locations) == [0]
+        assert r.get_depends('foo', implicit=False) == []
+
+        # later lookups resume the crawl of an entry instead of repeating it
+        import rospkg.crawler
+        visited = []
+        visit = rospkg.crawler.Crawler.visit
+        rospkg.crawler.Crawler.visit = lambda self, d: visited.append(d) or visit(self, d)
+        try:
+            r = RosPack(ros_paths=[underlay, overlay], lazy=True)
+            assert r.get_path('foo') == os.path.join(underlay, 'share', 'foo')
+            assert r.get_path('bar') == os.path.join(underlay, 'share', 'bar')
+            assert r.get_path('foo') == os.path.join(underlay, 'share', 'foo')
+            try:
+                r.get_path('fake')
+                assert False, 'should have raised'
+            except ResourceNotFound:
+                pass
+        finally:
+            rospkg.crawler.Crawler.visit = visit
+        assert sorted(visited) == sorted(set(visited)), visited
+        assert r._location_cache is not None
+
+        # same name twice in one entry: the first in crawl order wins
+        dup = os.path.join(tmp, 'dup')
+        for d in (os.path.join(dup, 'aa', 'x'), os.path.join(dup, 'foo')):
+            os.makedirs(d)
+            with open(os.path.join(d, 'package.xml'), 'w') as f:
+                f.write('<package><name>foo</name></package>')
+        expected = RosPack(ros_paths=[dup]).get_path('foo')
+        assert RosPack(ros_paths=[dup], lazy=True).get_path('foo') == expected
+        shutil.rmtree(os.path.join(dup, 'aa'))
+        r = RosPack(ros_paths=[dup, underlay], lazy=True)
+        assert r.get_path('foo') == os.path.join(dup, 'foo')
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_stats():
+    from rospkg import RosPack
+    tmp = tempfile.mkdtemp()
+    try:
+        make_package_tree(tmp, [os.path.join('repo', 'foo'), 'bar'])
+        with open(os.path.join(tmp, 'repo', 'foo', 'manifest.xml'), 'w') as f:
+            f.write('<package><license>BSD</license><depend package="bar"/></package>')
+        age_tree(tmp)
+        events = []
+        r = RosPack(ros_paths=[tmp], trace=lambda *args: events.append(args))
+        assert r.get_depends('foo') == ['bar']
+        assert r.get_depends('foo') == ['bar']
+        stats = r.get_crawl_stats()[tmp]
+        assert stats.directories == 4, stats
+        assert stats.listings == 4, stats
+        assert stats.stat_calls == 6, stats
+        assert stats.manifests_sniffed == 0, stats
+        assert stats.wall_time > 0.0, stats
+        cache_stats = r.get_cache_stats()
+        assert (cache_stats['depends'].hits, cache_stats['depends'].misses) == (1, 2), cache_stats
+        assert (cache_stats['manifests'].hits, cache_stats['manifests'].misses) == (0, 2), cache_stats
+        assert set(r.get_parse_times()) == set(['foo', 'bar'])
+        assert ('crawl', tmp, stats) in events
+        assert [e for e in events if e[0] == 'parse'] == [('parse', 'foo', r.get_parse_times()['foo']),
+                                                         ('parse', 'bar', r.get_parse_times()['bar'])]
+        assert ('cache_hit', 'depends', 'foo') in events
+
+        # unchanged directories are not listed again
+        r.refresh()
+        stats = r.get_crawl_stats()[tmp]
+        assert stats.directories == 4, stats
+        assert stats.listings == 0, stats
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_threads():
+    import threading
+    import time
+    import rospkg.rospack
+    from rospkg import RosPack, ResourceNotFound
+    tmp = tempfile.mkdtemp()
+    parse_manifest_file = rospkg.rospack.parse_manifest_file
+    parsed = []
+
+    def slow_parse_manifest_file(*args, **kwargs):
+        parsed.append(args[0])
+        time.sleep(0.05)
+        return parse_manifest_file(*args, **kwargs)
+    try:
+        make_package_tree(tmp, ['foo', 'bar', 'baz'])
+        for name, dep in [('foo', 'bar'), ('bar', 'baz')]:
+            with open(os.path.join(tmp, name, 'manifest.xml'), 'w') as f:
+                f.write('<package><license>BSD</license><depend package="%s"/></package>' % dep)
+        rospkg.rospack.parse_manifest_file = slow_parse_manifest_file
+        r = RosPack(ros_paths=[tmp])
+        results = []
+        errors = []
+
+        def query():
+            try:
+                results.append((r.get_manifest('foo'), sorted(r.get_depends('foo'))))
+                r.get_manifest('missing')
+            except ResourceNotFound as e:
+                errors.append(e)
+        threads = [threading.Thread(target=query) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # each manifest is parsed once
+        assert sorted(parsed) == sorted(os.path.join(tmp, n) for n in ['foo', 'bar', 'baz']), parsed
+        assert len(results) == 8
+        assert all(m is results[0][0] and deps == ['bar', 'baz'] for m, deps in results), results
+        assert len(errors) == 8
+    finally:
+        rospkg.rospack.parse_manifest_file = parse_manifest_file
+        shutil.rmtree(tmp)
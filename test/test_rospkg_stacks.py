@@ -290,3 +290,37 @@ def test_unary():
 
     assert rosstack.packages_of('unary') == ['unary']
     assert rospack.stack_of('unary') == 'unary'
+
+
+def test_parse_stack_etree():
+    # the xml.etree parser must produce the same results and errors as minidom
+    import xml.dom.minidom as dom
+    import rospkg.stack
+    from rospkg.stack import parse_stack
+    examples = [
+        '<stack/>',
+        '<stack><name>foo</name></stack>',
+        '<stack><name>foo</name><version>1.0</version>'
+        '<description brief="b">A <b>bold</b><!-- c --> stack</description>'
+        '<author email="a@b.c">A</author><author>B</author><maintainer email="m@b.c">M</maintainer>'
+        '<license>BSD</license><copyright>c</copyright><url>http://x</url>'
+        '<depends version="1.0">bar</depends><build_depends>baz</build_depends>'
+        '<review status="s" notes="n"/><build_type file="f">make</build_type></stack>',
+        '<stack><name>foo</name><version>1.0</version><description>d</description>'
+        '<author>A</author><maintainer>M</maintainer><license>BSD</license><copyright>c</copyright>'
+        '<unknown/></stack>',
+    ]
+    # minidom also accepts encoded contents
+    examples.extend([contents.encode('utf-8') for contents in examples])
+    for contents in examples:
+        results = []
+        for parse_xml in [rospkg.stack._parse_xml, dom.parseString]:
+            rospkg.stack._parse_xml, orig = parse_xml, rospkg.stack._parse_xml
+            try:
+                s = parse_stack(contents, 'f')
+                results.append(dict((slot, getattr(s, slot)) for slot in s.__slots__))
+            except Exception as e:
+                results.append(str(e))
+            finally:
+                rospkg.stack._parse_xml = orig
+        assert results[0] == results[1], contents
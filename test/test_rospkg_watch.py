@@ -0,0 +1,182 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2026, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import shutil
+import sys
+import tempfile
+
+from .fs_util import write_manifest
+
+
+def test_RosPack_watch():
+    if not sys.platform.startswith('linux'):
+        return
+    from rospkg import RosPack, ResourceNotFound
+    tmp = tempfile.mkdtemp()
+    try:
+        overlay = os.path.join(tmp, 'overlay')
+        underlay = os.path.join(tmp, 'underlay')
+        write_manifest(os.path.join(underlay, 'foo'))
+        write_manifest(os.path.join(underlay, 'bar'), ['foo'])
+        os.makedirs(overlay)
+        r = RosPack(ros_paths=[overlay, underlay], watch=True)
+        try:
+            assert set(r.list()) == set(['foo', 'bar'])
+            assert r.get_depends('bar') == ['foo']
+
+            # new package in overlay shadows underlay
+            write_manifest(os.path.join(overlay, 'repo', 'foo'))
+            assert r.get_path('foo') == os.path.join(overlay, 'repo', 'foo')
+
+            # new package
+            write_manifest(os.path.join(underlay, 'baz'), ['bar'])
+            assert r.get_path('baz') == os.path.join(underlay, 'baz')
+            assert set(r.get_depends('baz')) == set(['foo', 'bar'])
+
+            # edited manifest
+            write_manifest(os.path.join(underlay, 'bar'))
+            assert r.get_depends('bar', implicit=False) == []
+            assert r.get_depends('baz') == ['bar']
+
+            # removing the overlay package exposes the underlay again
+            shutil.rmtree(os.path.join(overlay, 'repo'))
+            assert r.get_path('foo') == os.path.join(underlay, 'foo')
+
+            # ignored directories are pruned
+            for marker in ['CATKIN_IGNORE', 'COLCON_IGNORE', 'AMENT_IGNORE']:
+                with open(os.path.join(underlay, 'baz', marker), 'w'):
+                    pass
+                try:
+                    r.get_path('baz')
+                    assert False, 'should have raised'
+                except ResourceNotFound:
+                    pass
+                os.remove(os.path.join(underlay, 'baz', marker))
+                assert r.get_path('baz') == os.path.join(underlay, 'baz')
+        finally:
+            r.close()
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_watch_crawl_order():
+    if not sys.platform.startswith('linux'):
+        return
+    from rospkg import RosPack
+    tmp = tempfile.mkdtemp()
+
+    def write_package_xml(*args):
+        d = os.path.join(tmp, *args)
+        os.makedirs(d)
+        with open(os.path.join(d, 'package.xml'), 'w') as f:
+            f.write('<package><name>foo</name></package>')
+    try:
+        write_package_xml('zz', 'x')
+        r = RosPack(ros_paths=[tmp], watch=True)
+        try:
+            # same name several times in one path entry: resolved
+            # like a fresh crawl, i.e. the first in crawl order
+            for args in [('aa', 'x'), ('foo',), ('mm', 'deep', 'x')]:
+                write_package_xml(*args)
+                assert r.get_path('foo') == RosPack(ros_paths=[tmp]).get_path('foo'), args
+            for name in ['aa', 'foo', 'mm']:
+                shutil.rmtree(os.path.join(tmp, name))
+                assert r.get_path('foo') == RosPack(ros_paths=[tmp]).get_path('foo'), name
+            assert r.get_path('foo') == os.path.join(tmp, 'zz', 'x')
+        finally:
+            r.close()
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_crawls_before():
+    from rospkg.watch import _crawls_before, _first_in_crawl_order
+    tmp = tempfile.mkdtemp()
+    try:
+        for name in ['b', 'a', 'c']:
+            os.makedirs(os.path.join(tmp, name, 'x'))
+        names = os.listdir(tmp)
+        dirs = [os.path.join(tmp, name, 'x') for name in ['b', 'a', 'c']]
+        assert _first_in_crawl_order(dirs) == os.path.join(tmp, names[0], 'x')
+        assert _crawls_before(os.path.join(tmp, names[0], 'x'), os.path.join(tmp, names[1]))
+        assert not _crawls_before(os.path.join(tmp, names[1]), os.path.join(tmp, names[0], 'x'))
+        assert _crawls_before(tmp, os.path.join(tmp, 'a'))
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_RosPack_watch_limit():
+    if not sys.platform.startswith('linux'):
+        return
+    import errno
+    from rospkg import RosPack
+    from rospkg.watch import Inotify
+    tmp = tempfile.mkdtemp()
+    add_watch = Inotify.add_watch
+    limit = [None]
+
+    def limited_add_watch(self, path, *args):
+        if limit[0] is not None:
+            if limit[0] == 0:
+                raise OSError(errno.ENOSPC, 'inotify_add_watch(%s): No space left on device' % path)
+            limit[0] -= 1
+        return add_watch(self, path, *args)
+    try:
+        Inotify.add_watch = limited_add_watch
+        write_manifest(os.path.join(tmp, 'foo'))
+        write_manifest(os.path.join(tmp, 'bar'), ['foo'])
+
+        # watch limit reached while crawling
+        limit[0] = 1
+        r = RosPack(ros_paths=[tmp], watch=True)
+        assert set(r.list()) == set(['foo', 'bar'])
+        assert r._watcher is None
+        assert r.get_depends('bar') == ['foo']
+        write_manifest(os.path.join(tmp, 'baz'))
+        assert r.refresh() == set(['baz'])
+        assert r.get_path('baz') == os.path.join(tmp, 'baz')
+
+        # and while applying changes
+        limit[0] = None
+        r = RosPack(ros_paths=[tmp], watch=True)
+        assert set(r.list()) == set(['foo', 'bar', 'baz'])
+        assert r._watcher is not None
+        limit[0] = 0
+        write_manifest(os.path.join(tmp, 'qux', 'repo'))
+        assert set(r.list()) == set(['foo', 'bar', 'baz', 'repo'])
+        assert r._watcher is None
+        r.close()
+    finally:
+        Inotify.add_watch = add_watch
+        shutil.rmtree(tmp)